@@ -1,6 +1,9 @@
 import os
 import sys
 
+# Repository root (this file lives in scripts/config)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Voice Recognition Settings
 WAKE_WORD = "totoro"
 RECOGNITION_TIMEOUT = 30
@@ -26,3 +29,49 @@ SYSTEM_VOICE_ID = None  # Will be set automatically if available
 
 # Default voice file for Coqui TTS
 DEFAULT_VOICE_PATH = os.path.join(os.path.dirname(__file__), "assets", "default_voice.wav")
+
+# Local LLM connection pool (shared by all LLM processors)
+LLM_POOL_SIZE = 10            # Max pooled keep-alive connections to Ollama
+LLM_KEEPALIVE_TIMEOUT = 30.0  # Seconds an idle pooled connection stays open
+LLM_CONNECT_TIMEOUT = 5.0     # Seconds to establish a new connection
+LLM_REQUEST_TIMEOUT = 60.0    # Default per-request timeout in seconds
+
+# LLM response cache (repeated low-temperature requests skip generation)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_SIZE = 256              # Max cached completions (LRU)
+LLM_CACHE_TTL = 300.0             # Seconds a cached completion stays valid
+LLM_CACHE_MAX_TEMPERATURE = 0.5   # Completions above this temperature are never cached
+
+# Model residency (avoid cold model loads on the first command after idle)
+OLLAMA_KEEP_ALIVE = "30m"             # How long Ollama keeps the model loaded after a request
+LLM_WARMUP_ON_START = True            # Load the model in the background at startup
+LLM_RESIDENCY_REFRESH_INTERVAL = 240  # Seconds of idle before residency is refreshed
+LLM_ACTIVE_HOURS = (6, 23)            # Only refresh between these hours (None = always)
+
+# Tool result cache (weather and search results reused between turns)
+TOOL_CACHE_TTLS = {"get_weather": 600, "web_search": 3600}  # Seconds per tool; others are not cached
+TOOL_CACHE_NEGATIVE_TTL = 30  # Seconds a failed lookup is remembered
+TOOL_CACHE_DIR = None         # e.g. "cache/tools" to keep results across restarts
+
+# Stream general answers from the LLM and speak them sentence by sentence
+STREAM_RESPONSES = True
+
+# Sentence-pipelined Coqui synthesis: how many synthesised sentences may wait for playback
+TTS_PIPELINE_QUEUE_SIZE = 2
+
+# Cached XTTS speaker latents (set to None to keep them in memory only)
+SPEAKER_LATENT_CACHE_DIR = os.path.join(PROJECT_ROOT, "generated_audio", "speaker_latents")
+
+# Debugging: directory to save a WAV copy of every synthesised utterance (None = in-memory only)
+TTS_DEBUG_DUMP_DIR = None
+
+# Synthesised phrase cache (in-memory LRU plus on-disk tier)
+PHRASE_CACHE_DIR = os.path.join(PROJECT_ROOT, "generated_audio", "phrase_cache")
+PHRASE_CACHE_SIZE = 128  # Sentences kept in memory
+PREWARM_PHRASES = [
+    "Hello! Totoro assistant ready with George's cloned voice.",
+    "Goodbye!",
+    "I didn't catch that. Could you try again?",
+    "Sorry, I encountered an error processing your command.",
+    "I'll help you with that."
+]
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 import threading
 import time
 import sys
@@ -30,6 +30,9 @@ class TotoroAssistant:
         self.wake_session_active = False
         self.session_lock = threading.Lock()
         
+        # Speak general answers sentence by sentence while the LLM is still generating
+        self.stream_responses = getattr(config, 'STREAM_RESPONSES', True)
+        
         # Initialize components
         logger.info("Initializing Totoro Assistant...")
         self.initialize_components()
@@ -42,8 +45,18 @@ class TotoroAssistant:
         else:
             self.tts.speak("Hello! Totoro assistant ready with Coqui neural voice synthesis.")
         
+        # Synthesise canned phrases in the background so they play instantly later
+        threading.Thread(target=self.prewarm_phrases, daemon=True).start()
+        
         self.set_visual_state('idle')
     
+    def prewarm_phrases(self):
+        """Fill the TTS phrase cache with the configured canned phrases"""
+        try:
+            self.tts.prewarm_phrases(config.PREWARM_PHRASES, audio_prompt_path=self.george_voice_path or None)
+        except Exception as e:
+            logger.warning(f"Phrase pre-warm failed: {e}")
+    
     def initialize_components(self):
         """Initialize all assistant components"""
         logger.info("🎭 Initializing Totoro Assistant...")
@@ -105,10 +118,7 @@ class TotoroAssistant:
             time.sleep(0.5)  # Brief awake moment
             
             self.set_visual_state('thinking')
-            response = self.process_command(command)
-            
-            self.set_visual_state('speaking')
-            self.speak(response)
+            self.respond_to_command(command)
             
             self.set_visual_state('idle')
         except Exception as e:
@@ -138,6 +148,34 @@ class TotoroAssistant:
             logger.error(f"Error processing command: {e}")
             return "Sorry, I encountered an error processing your command."
     
+    def respond_to_command(self, command: str) -> str:
+        """Process a command and speak the response, returning the full response text
+        
+        General queries are streamed: each sentence is spoken as soon as the
+        LLM finishes it instead of waiting for the complete answer.
+        """
+        if not self.stream_responses or self.smart_home.can_handle_command(command):
+            response = self.process_command(command)
+            self.set_visual_state('speaking')
+            self.speak(response)
+            return response
+        
+        logger.info(f"Streaming response for command: {command}")
+        start_time = time.time()
+        spoken = []
+        
+        def sentences():
+            for sentence in self.llm_processor.stream_query(command):
+                if not spoken:
+                    logger.info(f"⏱️ First sentence ready after {time.time() - start_time:.2f}s")
+                    self.set_visual_state('speaking')
+                spoken.append(sentence)
+                yield sentence
+        
+        self.speak_stream(sentences())
+        logger.info(f"⏱️ Streamed response completed in {time.time() - start_time:.2f}s")
+        return " ".join(spoken)
+    
     def start_voice_mode(self):
         """Start continuous voice interaction mode"""
         logger.info("🎤 Starting voice mode...")
@@ -194,10 +232,7 @@ class TotoroAssistant:
                 command = self.voice_recognizer.listen_for_command(timeout=config.COMMAND_TIMEOUT)
                 if command:
                     self.set_visual_state('thinking')
-                    response = self.process_command(command)
-                    
-                    self.set_visual_state('speaking')
-                    self.speak(response)
+                    response = self.respond_to_command(command)
                     self.set_visual_state('idle')
                     return response
                 else:
@@ -278,4 +313,11 @@ class TotoroAssistant:
         if self.george_voice_path:
             return self.tts.speak(text, audio_prompt_path=self.george_voice_path)
         else:
-            return self.tts.speak(text) 
\ No newline at end of file
+            return self.tts.speak(text)
+    
+    def speak_stream(self, sentences: Iterable[str]) -> bool:
+        """Speak streamed sentences using George's voice if configured"""
+        if self.george_voice_path:
+            return self.tts.speak_stream(sentences, audio_prompt_path=self.george_voice_path)
+        else:
+            return self.tts.speak_stream(sentences)
@@ -4,6 +4,7 @@ from typing import List, Optional, Dict, Any
 import logging
 from ..llm.command_processor import Task
 from ..integrations.home_assistant import HomeAssistantClient
+from ..integrations.home_assistant_async import AsyncHomeAssistantClient
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +12,14 @@ class TaskExecutor:
     """Executes tasks generated by the command processor"""
     
     def __init__(self, home_assistant: Optional[HomeAssistantClient] = None, 
-                 spotify_client: Optional[Any] = None):
+                 spotify_client: Optional[Any] = None, max_concurrency: int = 4):
         self.home_assistant = home_assistant
+        self.home_assistant_async = self._make_async_client(home_assistant)
         self.spotify_client = spotify_client
         self.presence_detector = None
         self.tts = None
         self.execution_history = []
+        self.max_concurrency = max(1, max_concurrency)
         
         logger.info("Task executor initialized")
     
@@ -24,6 +27,7 @@ class TaskExecutor:
         """Set or update integrations"""
         if home_assistant is not None:
             self.home_assistant = home_assistant
+            self.home_assistant_async = self._make_async_client(home_assistant)
         if spotify is not None:
             self.spotify_client = spotify
         if presence_detector is not None:
@@ -33,13 +37,30 @@ class TaskExecutor:
         
         logger.info("Task executor integrations updated")
     
+    def _make_async_client(self, home_assistant) -> Optional[AsyncHomeAssistantClient]:
+        """Pooled async client for the same Home Assistant server, so light calls don't block the loop"""
+        if isinstance(home_assistant, AsyncHomeAssistantClient):
+            return home_assistant
+        if isinstance(home_assistant, HomeAssistantClient):
+            return AsyncHomeAssistantClient.from_client(home_assistant)
+        return None
+    
     async def execute_tasks(self, tasks: List[Task]) -> Dict[str, Any]:
-        """Execute a list of tasks in priority order"""
+        """Execute a list of tasks in priority order
+        
+        Tasks with the same priority run concurrently (up to max_concurrency),
+        except tasks that touch the same device, which run in order. Each
+        priority tier finishes before the next one starts.
+        """
         if not tasks:
             return {"success": True, "executed": 0, "errors": []}
         
-        # Sort tasks by priority (1 = highest priority)
-        sorted_tasks = sorted(tasks, key=lambda t: t.priority)
+        start_time = time.time()
+        
+        # Group tasks into priority tiers (1 = highest priority)
+        tiers: Dict[int, List[Task]] = {}
+        for task in sorted(tasks, key=lambda t: t.priority):
+            tiers.setdefault(task.priority, []).append(task)
         
         results = {
             "success": True,
@@ -48,31 +69,31 @@ class TaskExecutor:
             "task_results": []
         }
         
-        for task in sorted_tasks:
-            try:
-                logger.info(f"Executing task: {task.action} on {task.target}")
-                task_result = await self._execute_single_task(task)
-                
-                results["task_results"].append({
-                    "task": task,
-                    "success": task_result["success"],
-                    "message": task_result.get("message", "")
-                })
-                
-                if task_result["success"]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        for priority, tier in tiers.items():
+            # Tasks on the same device keep their order; different devices run in parallel
+            device_groups: Dict[str, List[Task]] = {}
+            for task in tier:
+                device_groups.setdefault(self._device_key(task, tier), []).append(task)
+            
+            group_results = await asyncio.gather(*[
+                self._run_device_group(group, semaphore) for group in device_groups.values()
+            ])
+            
+            # Report in the original task order
+            task_results = {id(entry["task"]): entry for group in group_results for entry in group}
+            for task in tier:
+                entry = task_results[id(task)]
+                results["task_results"].append(entry)
+                if entry["success"]:
                     results["executed"] += 1
                 else:
-                    results["errors"].append(f"{task.action}: {task_result.get('error', 'Unknown error')}")
+                    results["errors"].append(f"{task.action}: {entry.get('error', 'Unknown error')}")
                     results["success"] = False
-                
-                # Add small delay between tasks
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                error_msg = f"Error executing {task.action}: {str(e)}"
-                logger.error(error_msg)
-                results["errors"].append(error_msg)
-                results["success"] = False
+        
+        results["total_time"] = time.time() - start_time
+        logger.info(f"Executed {results['executed']}/{len(tasks)} tasks in {results['total_time']:.2f}s")
         
         # Store execution history
         self.execution_history.append({
@@ -83,6 +104,57 @@ class TaskExecutor:
         
         return results
     
+    def _device_key(self, task: Task, tier: List[Task]) -> str:
+        """Key of the device a task controls; tasks sharing a key are serialised"""
+        if task.action in ("turn_on_lights", "turn_off_lights"):
+            room = task.parameters.get("room", task.target)
+            # "All lights" overlaps every room, so order all light tasks in the tier together
+            if any(t.parameters.get("room", t.target) == "all" for t in tier
+                   if t.action in ("turn_on_lights", "turn_off_lights")):
+                return "lights"
+            return f"lights:{room}"
+        if task.action in ("play_music", "pause_music", "resume_music", "set_volume"):
+            # One Spotify account controls one playback session
+            return "spotify"
+        if task.action == "set_temperature":
+            return f"climate:{task.parameters.get('room', task.target)}"
+        return f"{task.action}:{task.target}"
+    
+    async def _run_device_group(self, group: List[Task], semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """Run the tasks for one device in order"""
+        entries = []
+        for task in group:
+            async with semaphore:
+                entries.append(await self._run_task(task))
+        return entries
+    
+    async def _run_task(self, task: Task) -> Dict[str, Any]:
+        """Run one task and time it"""
+        logger.info(f"Executing task: {task.action} on {task.target}")
+        task_start = time.time()
+        try:
+            task_result = await self._execute_single_task(task)
+        except Exception as e:
+            error_msg = f"Error executing {task.action}: {str(e)}"
+            logger.error(error_msg)
+            task_result = {"success": False, "error": error_msg}
+        
+        latency = time.time() - task_start
+        logger.debug(f"Task {task.action} on {task.target} took {latency:.2f}s")
+        
+        return {
+            "task": task,
+            "success": task_result["success"],
+            "message": task_result.get("message", ""),
+            "error": task_result.get("error"),
+            "latency": latency
+        }
+    
+    async def _call(self, func, *args):
+        """Run a blocking integration call in a worker thread so other tasks keep running"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+    
     async def _execute_single_task(self, task: Task) -> Dict[str, Any]:
         """Execute a single task"""
         try:
@@ -119,11 +191,16 @@ class TaskExecutor:
         color = task.parameters.get("color")
         
         try:
-            if room:
-                success = self.home_assistant.turn_on_room_lights(room, brightness)
+            if self.home_assistant_async:
+                if room:
+                    success = await self.home_assistant_async.turn_on_room_lights(room, brightness)
+                else:
+                    success = await self.home_assistant_async.turn_on_light(task.target, brightness, color)
+            elif room:
+                success = await self._call(self.home_assistant.turn_on_room_lights, room, brightness)
             else:
                 # Turn on specific light
-                success = self.home_assistant.turn_on_light(task.target, brightness, color)
+                success = await self._call(self.home_assistant.turn_on_light, task.target, brightness, color)
             
             if success:
                 return {
@@ -146,10 +223,15 @@ class TaskExecutor:
         room = task.parameters.get("room", task.target)
         
         try:
-            if room:
-                success = self.home_assistant.turn_off_room_lights(room)
+            if self.home_assistant_async:
+                if room:
+                    success = await self.home_assistant_async.turn_off_room_lights(room)
+                else:
+                    success = await self.home_assistant_async.turn_off_light(task.target)
+            elif room:
+                success = await self._call(self.home_assistant.turn_off_room_lights, room)
             else:
-                success = self.home_assistant.turn_off_light(task.target)
+                success = await self._call(self.home_assistant.turn_off_light, task.target)
             
             if success:
                 return {
@@ -177,7 +259,7 @@ class TaskExecutor:
             # This is a simplified implementation
             # In practice, you'd search for the content and play it
             if device:
-                device_obj = self.spotify_client.find_device_by_name(device)
+                device_obj = await self._call(self.spotify_client.find_device_by_name, device)
                 if device_obj:
                     device_id = device_obj['id']
                 else:
@@ -187,14 +269,14 @@ class TaskExecutor:
             
             # Search for content based on type
             if music_type == "track":
-                tracks = self.spotify_client.search_track(query, limit=1)
+                tracks = await self._call(lambda: self.spotify_client.search_track(query, limit=1))
                 if tracks:
-                    success = self.spotify_client.play_track(tracks[0]['uri'], device_id)
+                    success = await self._call(self.spotify_client.play_track, tracks[0]['uri'], device_id)
                 else:
                     return {"success": False, "error": f"No tracks found for: {query}"}
             else:
                 # For now, just try to resume playback
-                success = self.spotify_client.resume(device_id)
+                success = await self._call(self.spotify_client.resume, device_id)
             
             if success:
                 return {
@@ -216,12 +298,12 @@ class TaskExecutor:
         device_id = None
         
         if device:
-            device_obj = self.spotify_client.find_device_by_name(device)
+            device_obj = await self._call(self.spotify_client.find_device_by_name, device)
             if device_obj:
                 device_id = device_obj['id']
         
         try:
-            success = self.spotify_client.pause(device_id)
+            success = await self._call(self.spotify_client.pause, device_id)
             if success:
                 return {"success": True, "message": "Music paused"}
             else:
@@ -238,12 +320,12 @@ class TaskExecutor:
         device_id = None
         
         if device:
-            device_obj = self.spotify_client.find_device_by_name(device)
+            device_obj = await self._call(self.spotify_client.find_device_by_name, device)
             if device_obj:
                 device_id = device_obj['id']
         
         try:
-            success = self.spotify_client.resume(device_id)
+            success = await self._call(self.spotify_client.resume, device_id)
             if success:
                 return {"success": True, "message": "Music resumed"}
             else:
@@ -258,17 +340,24 @@ class TaskExecutor:
         
         try:
             if self.spotify_client and device:
-                device_obj = self.spotify_client.find_device_by_name(device)
+                device_obj = await self._call(self.spotify_client.find_device_by_name, device)
                 if device_obj:
-                    success = self.spotify_client.set_volume(volume, device_obj['id'])
+                    success = await self._call(self.spotify_client.set_volume, volume, device_obj['id'])
                     if success:
                         return {"success": True, "message": f"Volume set to {volume}%"}
                     else:
                         return {"success": False, "error": "Failed to set volume"}
                 else:
                     return {"success": False, "error": f"Device not found: {device}"}
+            elif self.spotify_client:
+                # No device named, so the currently active device is used
+                success = await self._call(self.spotify_client.set_volume, volume, None)
+                if success:
+                    return {"success": True, "message": f"Volume set to {volume}%"}
+                else:
+                    return {"success": False, "error": "Failed to set volume"}
             else:
-                return {"success": False, "error": "Spotify not configured or device not specified"}
+                return {"success": False, "error": "Spotify not configured"}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -1,4 +1,6 @@
 from .home_assistant import HomeAssistantClient
+from .home_assistant_async import AsyncHomeAssistantClient
+from .home_assistant_events import HomeAssistantEventStream
 from .spotify_client import SpotifyClient
 
-__all__ = ['HomeAssistantClient', 'SpotifyClient'] 
\ No newline at end of file
+__all__ = ['HomeAssistantClient', 'AsyncHomeAssistantClient', 'HomeAssistantEventStream', 'SpotifyClient'] 
\ No newline at end of file
@@ -0,0 +1,148 @@
+import logging
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest run of words indexed as a room token ("living_room", "master_bedroom_left")
+MAX_TOKEN_WORDS = 3
+
+def _words(text: str) -> List[str]:
+    """Lowercase words, with numbers split off ("bedroom2" -> "bedroom", "2")"""
+    return re.findall(r"[a-z]+|[0-9]+", text.lower())
+
+def room_key(room: str) -> str:
+    """Normalize a room name ("Living Room", "living_room") to an index key"""
+    return "_".join(_words(room))
+
+def _room_tokens(state: Dict) -> Set[str]:
+    """Every run of up to MAX_TOKEN_WORDS words in the entity id and friendly name"""
+    tokens = set()
+    object_id = state['entity_id'].split('.', 1)[-1]
+    friendly_name = state.get('attributes', {}).get('friendly_name', '') or ''
+    for text in (object_id, friendly_name):
+        words = _words(text)
+        for size in range(1, MAX_TOKEN_WORDS + 1):
+            for start in range(len(words) - size + 1):
+                tokens.add("_".join(words[start:start + size]))
+    return tokens
+
+
+class EntityRegistry:
+    """In-memory index of Home Assistant entity states
+
+    Built from one /api/states dump and indexed by domain and by room
+    token (word runs from the entity id and friendly name), so resolving
+    "lights in the kitchen" is a dictionary lookup rather than a download
+    and scan of every entity. The index expires after ttl seconds, or can
+    be kept current with update_state() from state_changed events.
+    While marked live (an event subscription is connected) it never expires.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._states: Dict[str, Dict] = {}
+        self._by_domain: Dict[str, Set[str]] = {}
+        self._by_room: Dict[Tuple[str, str], Set[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._live = False
+        self._lock = threading.Lock()
+        self.stats = {"refreshes": 0, "lookups": 0, "updates": 0}
+
+    def is_stale(self) -> bool:
+        """Whether the index needs to be reloaded from /api/states"""
+        with self._lock:
+            if self._live and self._loaded_at is not None:
+                return False
+            return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def invalidate(self):
+        """Force the next lookup to reload the index"""
+        with self._lock:
+            self._loaded_at = None
+
+    def load(self, states: Iterable[Dict]):
+        """Replace the index with a full state dump"""
+        with self._lock:
+            self._states.clear()
+            self._by_domain.clear()
+            self._by_room.clear()
+            for state in states:
+                self._add(state)
+            self._loaded_at = time.monotonic()
+            self.stats["refreshes"] += 1
+        logger.debug(f"Entity registry loaded {len(self._states)} entities")
+
+    @property
+    def live(self) -> bool:
+        """Whether state_changed events are currently keeping the index up to date"""
+        with self._lock:
+            return self._live and self._loaded_at is not None
+    
+    def set_live(self, live: bool):
+        """Mark whether an event subscription is keeping the index current"""
+        with self._lock:
+            self._live = live
+            if not live and self._loaded_at is not None:
+                # The TTL restarts from when events stopped arriving
+                self._loaded_at = time.monotonic()
+
+    def _add(self, state: Dict):
+        entity_id = state['entity_id']
+        domain = entity_id.split('.', 1)[0]
+        self._states[entity_id] = state
+        self._by_domain.setdefault(domain, set()).add(entity_id)
+        for token in _room_tokens(state):
+            self._by_room.setdefault((domain, token), set()).add(entity_id)
+
+    def _remove(self, entity_id: str):
+        state = self._states.pop(entity_id, None)
+        if state is None:
+            return
+        domain = entity_id.split('.', 1)[0]
+        self._by_domain.get(domain, set()).discard(entity_id)
+        for token in _room_tokens(state):
+            entities = self._by_room.get((domain, token))
+            if entities is not None:
+                entities.discard(entity_id)
+                if not entities:
+                    del self._by_room[(domain, token)]
+
+    def update_state(self, entity_id: str, new_state: Optional[Dict]):
+        """Apply a state change; a None state removes the entity"""
+        with self._lock:
+            old_state = self._states.get(entity_id)
+            if new_state is None:
+                self._remove(entity_id)
+            elif old_state is not None and (old_state.get('attributes', {}).get('friendly_name')
+                                            == new_state.get('attributes', {}).get('friendly_name')):
+                # Same name, so the room tokens are unchanged
+                self._states[entity_id] = new_state
+            else:
+                self._remove(entity_id)
+                self._add(new_state)
+            self.stats["updates"] += 1
+
+    def get(self, entity_id: str) -> Optional[Dict]:
+        """Get the cached state of an entity"""
+        with self._lock:
+            return self._states.get(entity_id)
+
+    def entities(self, domain: str) -> List[Dict]:
+        """All cached entities in a domain"""
+        with self._lock:
+            self.stats["lookups"] += 1
+            return [self._states[entity_id] for entity_id in sorted(self._by_domain.get(domain, ()))]
+
+    def entities_in_room(self, domain: str, room: str) -> List[Dict]:
+        """Cached entities in a domain whose id or name mentions the room"""
+        with self._lock:
+            self.stats["lookups"] += 1
+            entity_ids = self._by_room.get((domain, room_key(room)), ())
+            return [self._states[entity_id] for entity_id in sorted(entity_ids)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
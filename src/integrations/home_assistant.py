@@ -1,21 +1,32 @@
 import requests
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 import logging
+from .entity_registry import EntityRegistry
+from .home_assistant_events import HomeAssistantEventStream
 
 logger = logging.getLogger(__name__)
 
 class HomeAssistantClient:
     """Client for interacting with Home Assistant"""
     
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, timeout: float = 10.0, registry_ttl: float = 60.0):
         self.url = url.rstrip('/')
         self.token = token
+        self.timeout = timeout
+        
+        # Indexed entity states, so room lookups don't download /api/states every time
+        self.registry = EntityRegistry(ttl=registry_ttl)
+        self.event_stream: Optional[HomeAssistantEventStream] = None
         self.headers = {
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
         }
         
+        # Keep-alive session so calls reuse the connection to Home Assistant
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
         # Test connection
         if not self.test_connection():
             logger.error("Failed to connect to Home Assistant")
@@ -23,7 +34,7 @@ class HomeAssistantClient:
     def test_connection(self) -> bool:
         """Test connection to Home Assistant"""
         try:
-            response = requests.get(f"{self.url}/api/", headers=self.headers, timeout=5)
+            response = self.session.get(f"{self.url}/api/", timeout=5)
             if response.status_code == 200:
                 logger.info("Successfully connected to Home Assistant")
                 return True
@@ -37,35 +48,65 @@ class HomeAssistantClient:
     def get_states(self) -> List[Dict]:
         """Get all entity states"""
         try:
-            response = requests.get(f"{self.url}/api/states", headers=self.headers)
+            response = self.session.get(f"{self.url}/api/states", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error getting states: {e}")
             return []
     
+    def refresh_entities(self) -> bool:
+        """Reload the entity registry from a full state dump"""
+        states = self.get_states()
+        if not states:
+            return False
+        self.registry.load(states)
+        return True
+    
+    def _get_registry(self) -> EntityRegistry:
+        if self.registry.is_stale():
+            self.refresh_entities()
+        return self.registry
+    
+    def start_event_stream(self, **kwargs) -> HomeAssistantEventStream:
+        """Keep the entity registry current from WebSocket state_changed events instead of polling"""
+        if self.event_stream is None:
+            self.event_stream = HomeAssistantEventStream(self.url, self.token, self.registry, **kwargs)
+        return self.event_stream.start()
+    
+    def stop_event_stream(self):
+        """Stop the WebSocket subscription"""
+        if self.event_stream is not None:
+            self.event_stream.stop()
+    
     def get_entity_state(self, entity_id: str) -> Optional[Dict]:
         """Get state of specific entity"""
+        # Events keep the registry current, so no request is needed
+        if self.registry.live:
+            state = self.registry.get(entity_id)
+            if state is not None:
+                return state
+        
         try:
-            response = requests.get(f"{self.url}/api/states/{entity_id}", headers=self.headers)
+            response = self.session.get(f"{self.url}/api/states/{entity_id}", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error getting entity state for {entity_id}: {e}")
             return None
     
-    def call_service(self, domain: str, service: str, entity_id: Optional[str] = None, 
+    def call_service(self, domain: str, service: str, entity_id: Optional[Union[str, List[str]]] = None, 
                     service_data: Optional[Dict] = None) -> bool:
-        """Call a Home Assistant service"""
+        """Call a Home Assistant service on one entity or a list of entities"""
         try:
             data = service_data or {}
             if entity_id:
                 data['entity_id'] = entity_id
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.url}/api/services/{domain}/{service}",
-                headers=self.headers,
-                json=data
+                json=data,
+                timeout=self.timeout
             )
             response.raise_for_status()
             logger.info(f"Successfully called service {domain}.{service}")
@@ -74,7 +115,7 @@ class HomeAssistantClient:
             logger.error(f"Error calling service {domain}.{service}: {e}")
             return False
     
-    def turn_on_light(self, entity_id: str, brightness: Optional[int] = None, 
+    def turn_on_light(self, entity_id: Union[str, List[str]], brightness: Optional[int] = None, 
                      color: Optional[str] = None) -> bool:
         """Turn on a light with optional brightness and color"""
         service_data = {}
@@ -86,7 +127,7 @@ class HomeAssistantClient:
         
         return self.call_service('light', 'turn_on', entity_id, service_data)
     
-    def turn_off_light(self, entity_id: str) -> bool:
+    def turn_off_light(self, entity_id: Union[str, List[str]]) -> bool:
         """Turn off a light"""
         return self.call_service('light', 'turn_off', entity_id)
     
@@ -97,20 +138,15 @@ class HomeAssistantClient:
     
     def get_lights(self) -> List[Dict]:
         """Get all light entities"""
-        states = self.get_states()
-        return [state for state in states if state['entity_id'].startswith('light.')]
+        return self._get_registry().entities('light')
     
     def get_lights_in_room(self, room: str) -> List[Dict]:
         """Get lights in a specific room"""
-        lights = self.get_lights()
-        room_lights = []
-        for light in lights:
-            # Check if room name is in entity_id or friendly_name
-            entity_id = light['entity_id'].lower()
-            friendly_name = light.get('attributes', {}).get('friendly_name', '').lower()
-            if room.lower() in entity_id or room.lower() in friendly_name:
-                room_lights.append(light)
-        return room_lights
+        # Matches the room against words in the entity_id or friendly_name
+        registry = self._get_registry()
+        if room.lower() == 'all':
+            return registry.entities('light')
+        return registry.entities_in_room('light', room)
     
     def turn_on_room_lights(self, room: str, brightness: Optional[int] = None) -> bool:
         """Turn on all lights in a room"""
@@ -119,12 +155,8 @@ class HomeAssistantClient:
             logger.warning(f"No lights found in room: {room}")
             return False
         
-        success = True
-        for light in lights:
-            if not self.turn_on_light(light['entity_id'], brightness):
-                success = False
-        
-        return success
+        # One request for the whole room, so the lights change together
+        return self.turn_on_light([light['entity_id'] for light in lights], brightness)
     
     def turn_off_room_lights(self, room: str) -> bool:
         """Turn off all lights in a room"""
@@ -133,17 +165,11 @@ class HomeAssistantClient:
             logger.warning(f"No lights found in room: {room}")
             return False
         
-        success = True
-        for light in lights:
-            if not self.turn_off_light(light['entity_id']):
-                success = False
-        
-        return success
+        return self.turn_off_light([light['entity_id'] for light in lights])
     
     def get_switches(self) -> List[Dict]:
         """Get all switch entities"""
-        states = self.get_states()
-        return [state for state in states if state['entity_id'].startswith('switch.')]
+        return self._get_registry().entities('switch')
     
     def turn_on_switch(self, entity_id: str) -> bool:
         """Turn on a switch"""
@@ -155,8 +181,7 @@ class HomeAssistantClient:
     
     def get_media_players(self) -> List[Dict]:
         """Get all media player entities"""
-        states = self.get_states()
-        return [state for state in states if state['entity_id'].startswith('media_player.')]
+        return self._get_registry().entities('media_player')
     
     def play_media(self, entity_id: str, media_content_id: str, media_content_type: str = 'music') -> bool:
         """Play media on a media player"""
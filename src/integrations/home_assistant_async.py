@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import aiohttp
+
+from .entity_registry import EntityRegistry
+
+logger = logging.getLogger(__name__)
+
+class ServiceCallBatcher:
+    """Coalesces concurrent service calls into multi-entity requests
+
+    Calls for the same domain, service and service data that arrive within
+    window seconds of each other are sent as one request with a list of
+    entity_ids, so lights targeted by several tasks change together.
+    """
+
+    def __init__(self, send: Callable[[str, str, List[str], Dict], Awaitable[bool]], window: float = 0.02):
+        self._send = send
+        self.window = window
+        self._pending: Dict[Tuple[str, str, str], "_PendingBatch"] = {}
+        self._flushes: Set[asyncio.Task] = set()
+        self.stats = {"calls": 0, "requests": 0, "entities": 0}
+
+    async def call(self, domain: str, service: str, entity_ids: List[str], service_data: Dict) -> bool:
+        """Queue a service call and wait for the batched request it joins"""
+        loop = asyncio.get_running_loop()
+        key = (domain, service, json.dumps(service_data, sort_keys=True))
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(domain, service, service_data)
+            batch.handle = loop.call_later(self.window, self._start_flush, key)
+            self._pending[key] = batch
+
+        for entity_id in entity_ids:
+            if entity_id not in batch.entity_ids:
+                batch.entity_ids.append(entity_id)
+        future = loop.create_future()
+        batch.futures.append(future)
+        self.stats["calls"] += 1
+        return await future
+
+    async def close(self):
+        """Send every queued batch now and wait for the requests still in flight"""
+        for key, batch in list(self._pending.items()):
+            batch.handle.cancel()
+            self._start_flush(key)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _start_flush(self, key: Tuple[str, str, str]):
+        task = asyncio.ensure_future(self._flush(self._pending.pop(key)))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: "_PendingBatch"):
+        self.stats["requests"] += 1
+        self.stats["entities"] += len(batch.entity_ids)
+        try:
+            success = await self._send(batch.domain, batch.service, batch.entity_ids, batch.service_data)
+        except Exception as e:
+            logger.error(f"Error sending batched {batch.domain}.{batch.service}: {e}")
+            success = False
+        for future in batch.futures:
+            if not future.done():
+                future.set_result(success)
+
+
+@dataclass
+class _PendingBatch:
+    domain: str
+    service: str
+    service_data: Dict
+    entity_ids: List[str] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    handle: Optional[asyncio.TimerHandle] = None
+
+
+@dataclass
+class _LoopState:
+    """Per-event-loop session and synchronisation primitives"""
+    session: aiohttp.ClientSession
+    semaphore: asyncio.Semaphore
+    refresh_lock: asyncio.Lock
+    batcher: Optional[ServiceCallBatcher]
+
+
+class AsyncHomeAssistantClient:
+    """Async Home Assistant client on a pooled keep-alive aiohttp session
+
+    Mirrors the HomeAssistantClient API with coroutines. Every call has a
+    timeout, the number of requests in flight is bounded, and room-level
+    light commands go out as a single multi-entity request. Concurrent calls with the same service
+    and data are batched into one multi-entity request (batch_window=0
+    disables batching).
+    """
+
+    def __init__(self, url: str, token: str, pool_size: int = 10, timeout: float = 10.0,
+                 max_concurrency: int = 8, registry: Optional[EntityRegistry] = None,
+                 registry_ttl: float = 60.0, batch_window: float = 0.02):
+        self.url = url.rstrip('/')
+        self.token = token
+        self.headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'
+        }
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.registry = registry or EntityRegistry(ttl=registry_ttl)
+        self.batch_window = batch_window
+
+        # Sessions, semaphores, locks and batchers are bound to the loop they were created on
+        self._loop_states: Dict[asyncio.AbstractEventLoop, _LoopState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_client(cls, client, **kwargs) -> "AsyncHomeAssistantClient":
+        """Create an async client for the same server (and entity registry) as a sync HomeAssistantClient"""
+        kwargs.setdefault('registry', getattr(client, 'registry', None))
+        return cls(client.url, client.token, **kwargs)
+
+    def _get_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for stale_loop in [l for l in self._loop_states if l.is_closed()]:
+                del self._loop_states[stale_loop]
+
+            state = self._loop_states.get(loop)
+            if state is None or state.session.closed:
+                state = _LoopState(
+                    session=aiohttp.ClientSession(
+                        headers=self.headers,
+                        connector=aiohttp.TCPConnector(limit=self.pool_size)
+                    ),
+                    semaphore=asyncio.Semaphore(self.max_concurrency),
+                    refresh_lock=asyncio.Lock(),
+                    batcher=ServiceCallBatcher(self._send_service, self.batch_window) if self.batch_window > 0 else None
+                )
+                self._loop_states[loop] = state
+            return state
+
+    async def _request(self, method: str, path: str, json_data: Optional[Dict] = None,
+                       timeout: Optional[float] = None):
+        state = self._get_state()
+        async with state.semaphore:
+            async with state.session.request(
+                method,
+                f"{self.url}{path}",
+                json=json_data,
+                timeout=aiohttp.ClientTimeout(total=timeout or self.timeout)
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    async def test_connection(self) -> bool:
+        """Test connection to Home Assistant"""
+        try:
+            await self._request('GET', '/api/', timeout=5)
+            logger.info("Successfully connected to Home Assistant")
+            return True
+        except Exception as e:
+            logger.error(f"Home Assistant connection error: {e}")
+            return False
+
+    async def get_states(self) -> List[Dict]:
+        """Get all entity states"""
+        try:
+            return await self._request('GET', '/api/states')
+        except Exception as e:
+            logger.error(f"Error getting states: {e}")
+            return []
+
+    async def refresh_entities(self) -> bool:
+        """Reload the entity registry from a full state dump"""
+        states = await self.get_states()
+        if not states:
+            return False
+        self.registry.load(states)
+        return True
+
+    async def _get_registry(self) -> EntityRegistry:
+        if self.registry.is_stale():
+            async with self._get_state().refresh_lock:
+                # Concurrent room commands share a single refresh
+                if self.registry.is_stale():
+                    await self.refresh_entities()
+        return self.registry
+
+    async def get_entity_state(self, entity_id: str) -> Optional[Dict]:
+        """Get state of specific entity"""
+        if self.registry.live:
+            state = self.registry.get(entity_id)
+            if state is not None:
+                return state
+
+        try:
+            return await self._request('GET', f'/api/states/{entity_id}')
+        except Exception as e:
+            logger.error(f"Error getting entity state for {entity_id}: {e}")
+            return None
+
+    async def call_service(self, domain: str, service: str, entity_id: Optional[Union[str, List[str]]] = None,
+                           service_data: Optional[Dict] = None) -> bool:
+        """Call a Home Assistant service on one entity or a list of entities
+
+        Entity-targeted calls are batched with concurrent calls for the same
+        service and data.
+        """
+        service_data = dict(service_data or {})
+        batcher = self._get_state().batcher
+        if entity_id and batcher:
+            entity_ids = [entity_id] if isinstance(entity_id, str) else list(entity_id)
+            return await batcher.call(domain, service, entity_ids, service_data)
+        return await self._send_service(domain, service, entity_id, service_data)
+
+    async def _send_service(self, domain: str, service: str, entity_id: Optional[Union[str, List[str]]],
+                            service_data: Dict) -> bool:
+        try:
+            data = dict(service_data)
+            if entity_id:
+                data['entity_id'] = entity_id
+
+            await self._request('POST', f'/api/services/{domain}/{service}', data)
+            logger.info(f"Successfully called service {domain}.{service}")
+            return True
+        except Exception as e:
+            logger.error(f"Error calling service {domain}.{service}: {e}")
+            return False
+
+    def get_batch_stats(self) -> Dict[str, int]:
+        """Service calls vs. batched requests actually sent, summed over event loops"""
+        stats = {"calls": 0, "requests": 0, "entities": 0}
+        with self._lock:
+            batchers = [state.batcher for state in self._loop_states.values() if state.batcher]
+        for batcher in batchers:
+            for key in stats:
+                stats[key] += batcher.stats[key]
+        return stats
+
+    async def turn_on_light(self, entity_id: Union[str, List[str]], brightness: Optional[int] = None,
+                            color: Optional[str] = None) -> bool:
+        """Turn on a light with optional brightness and color"""
+        service_data = {}
+        if brightness is not None:
+            service_data['brightness'] = max(0, min(255, brightness))
+        if color:
+            service_data['color_name'] = color
+
+        return await self.call_service('light', 'turn_on', entity_id, service_data)
+
+    async def turn_off_light(self, entity_id: Union[str, List[str]]) -> bool:
+        """Turn off a light"""
+        return await self.call_service('light', 'turn_off', entity_id)
+
+    async def set_light_brightness(self, entity_id: str, brightness: int) -> bool:
+        """Set light brightness (0-255)"""
+        brightness = max(0, min(255, brightness))
+        return await self.call_service('light', 'turn_on', entity_id, {'brightness': brightness})
+
+    async def get_lights(self) -> List[Dict]:
+        """Get all light entities"""
+        return (await self._get_registry()).entities('light')
+
+    async def get_lights_in_room(self, room: str) -> List[Dict]:
+        """Get lights in a specific room"""
+        registry = await self._get_registry()
+        if room.lower() == 'all':
+            return registry.entities('light')
+        return registry.entities_in_room('light', room)
+
+    async def turn_on_room_lights(self, room: str, brightness: Optional[int] = None) -> bool:
+        """Turn on all lights in a room with one request"""
+        lights = await self.get_lights_in_room(room)
+        if not lights:
+            logger.warning(f"No lights found in room: {room}")
+            return False
+
+        return await self.turn_on_light([light['entity_id'] for light in lights], brightness)
+
+    async def turn_off_room_lights(self, room: str) -> bool:
+        """Turn off all lights in a room with one request"""
+        lights = await self.get_lights_in_room(room)
+        if not lights:
+            logger.warning(f"No lights found in room: {room}")
+            return False
+
+        return await self.turn_off_light([light['entity_id'] for light in lights])
+
+    async def get_switches(self) -> List[Dict]:
+        """Get all switch entities"""
+        return (await self._get_registry()).entities('switch')
+
+    async def turn_on_switch(self, entity_id: str) -> bool:
+        """Turn on a switch"""
+        return await self.call_service('switch', 'turn_on', entity_id)
+
+    async def turn_off_switch(self, entity_id: str) -> bool:
+        """Turn off a switch"""
+        return await self.call_service('switch', 'turn_off', entity_id)
+
+    async def get_media_players(self) -> List[Dict]:
+        """Get all media player entities"""
+        return (await self._get_registry()).entities('media_player')
+
+    async def play_media(self, entity_id: str, media_content_id: str, media_content_type: str = 'music') -> bool:
+        """Play media on a media player"""
+        service_data = {
+            'media_content_id': media_content_id,
+            'media_content_type': media_content_type
+        }
+        return await self.call_service('media_player', 'play_media', entity_id, service_data)
+
+    async def set_volume(self, entity_id: str, volume: float) -> bool:
+        """Set volume for media player (0.0 to 1.0)"""
+        volume = max(0.0, min(1.0, volume))
+        return await self.call_service('media_player', 'volume_set', entity_id, {'volume_level': volume})
+
+    async def close(self):
+        """Send queued service calls, then close the session for the running event loop"""
+        with self._lock:
+            state = self._loop_states.pop(asyncio.get_running_loop(), None)
+        if state is None:
+            return
+        if state.batcher:
+            await state.batcher.close()
+        if not state.session.closed:
+            await state.session.close()
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from .entity_registry import EntityRegistry
+
+logger = logging.getLogger(__name__)
+
+class HomeAssistantEventStream:
+    """Keeps an EntityRegistry current from Home Assistant's WebSocket API
+
+    Connects to /api/websocket, subscribes to state_changed events, loads
+    every state with get_states, then applies each event to the registry
+    incrementally. While connected the registry is marked live, so lookups
+    never poll /api/states. On disconnect the registry falls back to its
+    TTL, and the stream reconnects with exponential backoff and resyncs.
+    """
+
+    def __init__(self, url: str, token: str, registry: EntityRegistry,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 heartbeat: float = 30.0):
+        base_url = url.rstrip('/')
+        if base_url.startswith('https://'):
+            base_url = 'wss://' + base_url[len('https://'):]
+        elif base_url.startswith('http://'):
+            base_url = 'ws://' + base_url[len('http://'):]
+        self.ws_url = f"{base_url}/api/websocket"
+        self.token = token
+        self.registry = registry
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat = heartbeat
+
+        self.connected = False
+        self.stats = {"connects": 0, "reconnects": 0, "resyncs": 0, "events": 0}
+
+        self._message_id = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._connected_event = threading.Event()
+
+    def _next_id(self) -> int:
+        self._message_id += 1
+        return self._message_id
+
+    async def _send_command(self, ws: aiohttp.ClientWebSocketResponse, command: Dict[str, Any]) -> int:
+        message_id = self._next_id()
+        await ws.send_json({"id": message_id, **command})
+        return message_id
+
+    async def _receive_result(self, ws: aiohttp.ClientWebSocketResponse, message_id: int) -> Any:
+        """Wait for the result of a command, applying any events that arrive first"""
+        while True:
+            message = await ws.receive_json()
+            if message.get("type") == "event":
+                self._handle_event(message)
+                continue
+            if message.get("type") == "result" and message.get("id") == message_id:
+                if not message.get("success"):
+                    raise ConnectionError(f"Home Assistant command failed: {message.get('error')}")
+                return message.get("result")
+
+    async def _authenticate(self, ws: aiohttp.ClientWebSocketResponse):
+        message = await ws.receive_json()
+        if message.get("type") != "auth_required":
+            raise ConnectionError(f"Unexpected handshake message: {message.get('type')}")
+
+        await ws.send_json({"type": "auth", "access_token": self.token})
+        message = await ws.receive_json()
+        if message.get("type") != "auth_ok":
+            raise PermissionError(f"Home Assistant authentication failed: {message.get('message', message.get('type'))}")
+
+    def _handle_event(self, message: Dict):
+        event = message.get("event", {})
+        if event.get("event_type") != "state_changed":
+            return
+        data = event.get("data", {})
+        entity_id = data.get("entity_id")
+        if entity_id:
+            self.registry.update_state(entity_id, data.get("new_state"))
+            self.stats["events"] += 1
+
+    async def _session(self, session: aiohttp.ClientSession):
+        """One connection: authenticate, resync, subscribe, then apply events until it drops"""
+        async with session.ws_connect(self.ws_url, heartbeat=self.heartbeat) as ws:
+            await self._authenticate(ws)
+
+            # Subscribe first so no change is missed between the dump and the subscription
+            subscribe_id = await self._send_command(ws, {"type": "subscribe_events", "event_type": "state_changed"})
+            await self._receive_result(ws, subscribe_id)
+
+            states_id = await self._send_command(ws, {"type": "get_states"})
+            states = await self._receive_result(ws, states_id)
+            self.registry.load(states or [])
+            self.stats["resyncs"] += 1
+
+            self.registry.set_live(True)
+            self.connected = True
+            self._connected_event.set()
+            self.stats["connects"] += 1
+            logger.info(f"📡 Subscribed to Home Assistant state changes ({len(self.registry)} entities)")
+
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    payload = message.json()
+                    if payload.get("type") == "event":
+                        self._handle_event(payload)
+                elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+
+    async def run(self):
+        """Maintain the subscription until stop() is called"""
+        self._stop = asyncio.Event()
+        if self._stopping:
+            return
+        delay = self.reconnect_delay
+
+        async with aiohttp.ClientSession() as session:
+            while not self._stop.is_set():
+                connection = asyncio.ensure_future(self._session(session))
+                stopper = asyncio.ensure_future(self._stop.wait())
+                await asyncio.wait([connection, stopper], return_when=asyncio.FIRST_COMPLETED)
+                stopper.cancel()
+
+                if not connection.done():
+                    connection.cancel()
+                    await asyncio.gather(connection, return_exceptions=True)
+
+                was_connected = self.connected
+                self._mark_disconnected()
+                if self._stop.is_set():
+                    break
+
+                error = connection.exception() if not connection.cancelled() else None
+                if isinstance(error, PermissionError):
+                    logger.error(f"{error}; not reconnecting")
+                    break
+                if was_connected:
+                    delay = self.reconnect_delay
+                logger.warning(f"Home Assistant event stream disconnected ({error or 'closed'}), "
+                               f"reconnecting in {delay:.1f}s")
+                self.stats["reconnects"] += 1
+
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _mark_disconnected(self):
+        self.connected = False
+        self._connected_event.clear()
+        # Fall back to TTL-based reloads until the stream is back
+        self.registry.set_live(False)
+
+    def start(self) -> "HomeAssistantEventStream":
+        """Run the subscription on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stopping = False
+
+        def run_loop():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.run())
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run_loop, daemon=True, name="ha-event-stream")
+        self._thread.start()
+        return self
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Block until the stream is connected and synced"""
+        return self._connected_event.wait(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the subscription and wait for the background thread"""
+        self._stopping = True
+        if self._loop is not None and self._stop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
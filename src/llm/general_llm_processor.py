@@ -1,19 +1,25 @@
-import requests
 import json
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import asyncio
-import aiohttp
+from .http_client import LLMTransport, get_llm_transport
+from .model_residency import ModelResidencyManager
+from .tool_runner import run_tool_calls
+from ..tools.tool_cache import ToolResultCache, get_tool_result_cache
 
 logger = logging.getLogger(__name__)
 
 class GeneralLLMProcessor:
     """General-purpose LLM processor for conversational AI capabilities"""
     
-    def __init__(self, model_name: str = "llama3.1:8b", base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str = "llama3.1:8b", base_url: str = "http://localhost:11434",
+                 transport: Optional[LLMTransport] = None, keep_alive: Optional[str] = "30m",
+                 tool_cache: Optional[ToolResultCache] = None):
         self.model_name = model_name
         self.base_url = base_url.rstrip('/')
+        self.transport = transport or get_llm_transport(self.base_url)
+        self.residency = ModelResidencyManager(self.transport, model_name, keep_alive=keep_alive)
+        self.tool_cache = tool_cache or get_tool_result_cache()
         self.conversation_history = []
         self.tools = {}
         self._register_tools()
@@ -27,7 +33,7 @@ class GeneralLLMProcessor:
     def _test_connection(self) -> bool:
         """Test connection to local LLM"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.transport.get_sync("/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Local LLM connection error: {e}")
@@ -161,7 +167,7 @@ Remember: You are knowledgeable but not omniscient. Use tools for current inform
         try:
             full_prompt = f"{system_prompt}\n\n{context}\n\nUser: {user_query}\nAssistant:"
             
-            payload = {
+            payload = self.residency.apply({
                 "model": self.model_name,
                 "prompt": full_prompt,
                 "stream": False,
@@ -170,20 +176,12 @@ Remember: You are knowledgeable but not omniscient. Use tools for current inform
                     "top_p": 0.9,
                     "max_tokens": 1000
                 }
-            }
+            })
+            
+            result = await self.transport.post_json("/api/generate", payload, timeout=60)
+            self.residency.record(result)
+            return result.get("response", "").strip()
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("response", "").strip()
-                    else:
-                        raise Exception(f"HTTP {response.status}")
-                        
         except Exception as e:
             logger.error(f"General LLM API error: {e}")
             raise
@@ -213,27 +211,10 @@ Remember: You are knowledgeable but not omniscient. Use tools for current inform
         return tool_calls
     
     async def _execute_tools(self, tool_calls: List[Dict]) -> Dict[str, Any]:
-        """Execute tool calls and return results"""
-        results = {}
-        
-        for call in tool_calls:
-            tool_name = call["tool"]
-            parameters = call["parameters"]
-            
-            try:
-                if tool_name in self.tools:
-                    func = self.tools[tool_name]["function"]
-                    if asyncio.iscoroutinefunction(func):
-                        result = await func(**parameters)
-                    else:
-                        result = func(**parameters)
-                    results[tool_name] = result
-                else:
-                    results[tool_name] = f"Unknown tool: {tool_name}"
-                    
-            except Exception as e:
-                results[tool_name] = f"Error: {str(e)}"
-        
+        """Execute tool calls concurrently and return results"""
+        results = {call["tool"]: f"Unknown tool: {call['tool']}"
+                   for call in tool_calls if call["tool"] not in self.tools}
+        results.update(await run_tool_calls(tool_calls, self.tools, cache=self.tool_cache))
         return results
     
     # Tool implementations
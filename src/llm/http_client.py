@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Any
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class LLMTransport:
+    """Shared, connection-pooled HTTP transport for local LLM (Ollama) calls
+
+    Keeps one keep-alive aiohttp session for async callers and one pooled
+    requests session for sync callers, so every utterance reuses an open
+    TCP connection instead of paying connection setup again.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:11434", pool_size: int = 10,
+                 keepalive_timeout: float = 30.0, connect_timeout: float = 5.0,
+                 request_timeout: float = 60.0):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+
+        # aiohttp sessions are bound to the loop they were created on, so keep one per loop.
+        # A session replaced after a connection error is retired rather than closed, and
+        # closed once the requests still running on it finish
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._retired: Dict[asyncio.AbstractEventLoop, List[aiohttp.ClientSession]] = {}
+        self._in_flight: Dict[aiohttp.ClientSession, int] = {}
+        self._session_lock = threading.Lock()
+
+        # Sync session with a bounded keep-alive pool
+        self._sync_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._sync_session.mount("http://", adapter)
+        self._sync_session.mount("https://", adapter)
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "errors": 0
+        }
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """Trace hooks that count new vs. reused pooled connections"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            self._count("new_connections")
+
+        async def on_connection_reuseconn(session, context, params):
+            self._count("reused_connections")
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def _acquire_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session for the running event loop and count a request on it"""
+        loop = asyncio.get_running_loop()
+        with self._session_lock:
+            # Sessions of loops that have since closed can never be used or closed again, so they
+            # are only detached and dropped; loop owners should await close() before closing a loop
+            # (UnifiedLLMProcessor.close does)
+            for stale_loop in [l for l in set(self._sessions) | set(self._retired) if l.is_closed()]:
+                logger.warning("Event loop closed without closing its LLM session, dropping it")
+                stale = self._retired.pop(stale_loop, [])
+                if stale_loop in self._sessions:
+                    stale.append(self._sessions.pop(stale_loop))
+                for session in stale:
+                    self._in_flight.pop(session, None)
+                    session.detach()
+
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    keepalive_timeout=self.keepalive_timeout
+                )
+                session = aiohttp.ClientSession(
+                    connector=connector,
+                    trace_configs=[self._create_trace_config()]
+                )
+                self._sessions[loop] = session
+            self._in_flight[session] = self._in_flight.get(session, 0) + 1
+            return session
+
+    async def _release_session(self, session: aiohttp.ClientSession):
+        """Finish a request on a session, closing it if it was retired and this was its last request"""
+        loop = asyncio.get_running_loop()
+        with self._session_lock:
+            remaining = self._in_flight.get(session, 1) - 1
+            if remaining > 0:
+                self._in_flight[session] = remaining
+                return
+            self._in_flight.pop(session, None)
+            retired = self._retired.get(loop, [])
+            if session not in retired:
+                return
+            retired.remove(session)
+            if not retired:
+                del self._retired[loop]
+        if not session.closed:
+            await session.close()
+
+    def _retire_session(self, session: aiohttp.ClientSession):
+        """Route new requests to a fresh pool after a connection error
+
+        The failed session is closed by _release_session once the requests and
+        streams still using it finish, so they are not aborted.
+        """
+        loop = asyncio.get_running_loop()
+        with self._session_lock:
+            if self._sessions.get(loop) is session:
+                logger.debug("LLM connection failed, replacing the pooled session")
+                del self._sessions[loop]
+                self._retired.setdefault(loop, []).append(session)
+
+    def _client_timeout(self, timeout: Optional[float]) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            total=timeout or self.request_timeout,
+            sock_connect=self.connect_timeout
+        )
+
+    async def post_json(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict:
+        """POST a JSON payload and return the decoded JSON response"""
+        session = self._acquire_session()
+        self._count("requests")
+        try:
+            async with session.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=self._client_timeout(timeout)
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}")
+                return await response.json()
+        except aiohttp.ClientConnectionError:
+            self._count("errors")
+            self._retire_session(session)
+            raise
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            await self._release_session(session)
+
+    async def stream_json(self, path: str, payload: Dict[str, Any],
+                          timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+        """POST a JSON payload and yield each newline-delimited JSON object as it arrives"""
+        session = self._acquire_session()
+        self._count("requests")
+        try:
+            async with session.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=self._client_timeout(timeout)
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"HTTP {response.status}")
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    yield json.loads(line)
+        except aiohttp.ClientConnectionError:
+            self._count("errors")
+            self._retire_session(session)
+            raise
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            await self._release_session(session)
+
+    def post_json_sync(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict:
+        """Blocking variant of post_json for sync callers"""
+        self._count("requests")
+        try:
+            response = self._sync_session.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=(self.connect_timeout, timeout or self.request_timeout)
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            self._count("errors")
+            raise
+
+    def get_sync(self, path: str, timeout: Optional[float] = None) -> requests.Response:
+        """Blocking GET, used for health checks such as /api/tags"""
+        self._count("requests")
+        try:
+            return self._sync_session.get(
+                f"{self.base_url}{path}",
+                timeout=(self.connect_timeout, timeout or self.request_timeout)
+            )
+        except Exception:
+            self._count("errors")
+            raise
+
+    def _sync_pool_stats(self) -> Dict[str, int]:
+        """Connection counts from the urllib3 pools behind the sync session"""
+        created = 0
+        served = 0
+        for adapter in set(self._sync_session.adapters.values()):
+            pools = getattr(adapter.poolmanager, "pools", None)
+            if pools is None:
+                continue
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                created += getattr(pool, "num_connections", 0)
+                served += getattr(pool, "num_requests", 0)
+        return {"new": created, "reused": max(0, served - created)}
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get request and connection reuse counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        sync_pool = self._sync_pool_stats()
+        stats["new_connections"] += sync_pool["new"]
+        stats["reused_connections"] += sync_pool["reused"]
+        return stats
+
+    async def close(self):
+        """Close the running loop's async sessions, including retired ones (the sync pool is closed by close_sync)"""
+        loop = asyncio.get_running_loop()
+        with self._session_lock:
+            sessions = self._retired.pop(loop, [])
+            if loop in self._sessions:
+                sessions.append(self._sessions.pop(loop))
+            for session in sessions:
+                self._in_flight.pop(session, None)
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    def close_sync(self):
+        """Close the pooled sync session"""
+        self._sync_session.close()
+
+
+_transports: Dict[str, LLMTransport] = {}
+_transports_lock = threading.Lock()
+
+def get_llm_transport(base_url: str = "http://localhost:11434", **kwargs) -> LLMTransport:
+    """Get the process-wide transport for an LLM base URL
+
+    Keyword arguments (pool_size, timeouts) only apply when the transport
+    for that URL is first created.
+    """
+    key = base_url.rstrip('/')
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = LLMTransport(key, **kwargs)
+            _transports[key] = transport
+            logger.info(f"Created pooled LLM transport for {key} (pool size {transport.pool_size})")
+        return transport
@@ -0,0 +1,243 @@
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .command_processor import Task
+
+logger = logging.getLogger(__name__)
+
+ROOMS = ["living room", "bedroom", "kitchen", "bathroom", "office", "dining room", "basement", "garage"]
+
+# Words that carry no intent; only stripped from the ends of the utterance and the start
+# of each clause, so a song or album title keeps them ("play the album ok computer")
+LEADING_FILLER_PATTERN = re.compile(
+    r"^(?:(?:please|totoro|hey|ok|okay|can you|could you|would you|will you)\b\s*)+"
+)
+TRAILING_FILLER_PATTERN = re.compile(
+    r"(?:\s*\b(?:please|for me|now|thanks|thank you))+$"
+)
+
+# Known music genres, which can be played without saying "music" ("play some jazz")
+GENRES = [
+    "jazz", "blues", "rock", "classical", "pop", "hip hop", "rap", "country", "lo-fi", "lofi", "ambient",
+    "electronic", "reggae", "metal", "folk", "soul", "funk", "r&b", "indie", "disco", "chill", "house", "techno"
+]
+
+# Captured music queries that are not a real search term ("play the bedroom" -> "the")
+NON_QUERY_WORDS = {"the", "a", "an", "some", "my", "it", "that", "this", "something", "anything", "nothing"}
+
+# Any of these mean the utterance needs the LLM (questions, tools, chit-chat)
+ESCALATE_PATTERN = re.compile(
+    r"\?|\b(what|why|how|when|who|where|weather|time|search|calculate|tell me|explain|news)\b"
+)
+
+def extract_room(text: str) -> Optional[str]:
+    """Extract a room name from command text"""
+    text = text.lower()
+    for room in ROOMS:
+        if room in text or room.replace(" ", "_") in text:
+            return room.replace(" ", "_")
+    return None
+
+def _percent_to_brightness(percent: int) -> int:
+    """Convert 0-100% to Home Assistant's 0-255 brightness scale"""
+    return max(0, min(255, round(percent * 255 / 100)))
+
+
+@dataclass
+class IntentMatch:
+    """Tasks produced by the rule-based matcher"""
+    tasks: List[Task]
+    response: str
+
+
+class IntentMatcher:
+    """Deterministic matcher for simple smart home commands
+
+    Every clause of the utterance must match a known pattern for an action in
+    the processor's smart home action table; anything ambiguous returns None
+    so the caller can escalate to the LLM.
+    """
+
+    def __init__(self, smart_home_actions: Dict[str, Dict], default_room: str = "living_room"):
+        self.smart_home_actions = smart_home_actions
+        self.default_room = default_room
+        self._lock = threading.Lock()
+        self.stats = {"total": 0, "matched": 0, "escalated": 0}
+
+        room_names = "|".join(r.replace(" ", "[ _]") for r in ROOMS)
+        # "the kitchen and living room lights" -> "the kitchen lights and living room lights"
+        self.room_list = re.compile(rf"\b({room_names}) and (?:the )?({room_names}) (lights?|lamps?)\b")
+
+        def room(n: int) -> str:
+            # Optional room mention; numbered because a pattern may allow it in two places
+            return rf"(?:(?:in|for) )?(?:the )?(?P<room{n}>{room_names}|all(?: the)?)"
+
+        lights = rf"(?:the )?(?:{room(1)} )?(?:lights?|lamps?)(?: {room(2)})?"
+        percent = r"(?P<percent>\d{1,3}) ?(?:%|percent)"
+
+        # (intent, compiled pattern) tried in order; each must match a whole clause
+        self.patterns: List[Tuple[str, re.Pattern]] = [
+            ("turn_on_lights", re.compile(rf"(?:turn|switch) on {lights}(?: (?:to|at) {percent})?")),
+            ("turn_on_lights", re.compile(rf"(?:turn|switch) {lights} on(?: (?:to|at) {percent})?")),
+            ("turn_off_lights", re.compile(rf"(?:turn|switch) off {lights}")),
+            ("turn_off_lights", re.compile(rf"(?:turn|switch) {lights} off")),
+            ("dim_lights", re.compile(rf"dim {lights}(?: (?:to|at) {percent})?")),
+            ("brighten_lights", re.compile(rf"brighten {lights}")),
+            ("set_brightness", re.compile(
+                rf"set (?:the )?(?:{room(1)} )?(?:lights?|lamps?|brightness)(?: {room(2)})? (?:to|at) {percent}")),
+            ("pause_music", re.compile(r"(?:pause|stop) (?:the )?(?:music|song|playback|spotify)")),
+            ("resume_music", re.compile(r"(?:resume|unpause|continue) (?:the )?(?:music|song|playback|spotify)")),
+            ("set_volume", re.compile(
+                r"(?:set|turn) (?:the )?volume (?:to|at) (?P<volume>\d{1,3}) ?(?:%|percent)?")),
+        ]
+
+        # Only explicit music phrasings; anything else starting with "play" ("play a game")
+        # goes to the LLM
+        query = r"(?P<query>[a-z0-9' &-]+?)"
+        genres = "|".join(re.escape(genre) for genre in GENRES)
+        self.patterns += [
+            ("play_music", re.compile(rf"play (?:some |my )?music(?: {room(1)})?")),
+            ("play_music", re.compile(rf"play (?:some )?(?P<query>{genres})(?: music)?(?: {room(1)})?")),
+            ("play_music", re.compile(rf"play (?:some |my )?(?:music|songs) by {query}(?: {room(1)})?")),
+            ("play_music", re.compile(rf"play (?:the )?(?:song|track|album|playlist|artist) {query}(?: {room(1)})?")),
+            ("play_music", re.compile(rf"play (?:some |my )?{query} (?:music|songs|playlist)(?: {room(1)})?")),
+        ]
+
+    def match(self, command: str, current_room: Optional[str] = None) -> Optional[IntentMatch]:
+        """Match a command to tasks, or return None to escalate to the LLM"""
+        result = self._match(command, current_room)
+
+        with self._lock:
+            self.stats["total"] += 1
+            self.stats["matched" if result else "escalated"] += 1
+
+        return result
+
+    def _match(self, command: str, current_room: Optional[str]) -> Optional[IntentMatch]:
+        text = command.lower().strip()
+        if not text or ESCALATE_PATTERN.search(text):
+            return None
+
+        text = re.sub(r"[^\w%'&° -]", " ", text)
+        text = re.sub(r"\s+", " ", text).strip()
+        text = TRAILING_FILLER_PATTERN.sub("", LEADING_FILLER_PATTERN.sub("", text)).strip()
+        while self.room_list.search(text):
+            text = self.room_list.sub(r"\1 \3 and \2 \3", text)
+
+        # Multi-action commands: every clause must be understood. Clauses run
+        # concurrently unless joined by "then", which orders them.
+        parts = re.split(r"\b(and then|and|then|also)\b", text)
+        fallback_room = (current_room or self.default_room).lower().replace(" ", "_")
+        tasks = []
+        phrases = []
+        priority = 1
+        verb = None
+
+        for index, part in enumerate(parts):
+            if index % 2:
+                if part in ("and then", "then") and tasks:
+                    priority += 1
+                continue
+            clause = LEADING_FILLER_PATTERN.sub("", part.strip()).strip()
+            if not clause:
+                continue
+            parsed = self._match_clause(clause, fallback_room)
+            if parsed is None and verb:
+                # "turn on the kitchen lights and the hallway lights": the verb carries over
+                parsed = self._match_clause(f"{verb} {clause}", fallback_room)
+            if parsed is None or parsed[0] is None:
+                return None
+            verb_match = re.match(r"(?:turn|switch) (?:on|off)\b|dim\b|brighten\b", clause)
+            verb = verb_match.group(0) if verb_match else verb
+            task, phrase = parsed
+            task.priority = priority
+            tasks.append(task)
+            phrases.append(phrase)
+
+        if not tasks:
+            return None
+
+        return IntentMatch(tasks=tasks, response=f"I'll {' and '.join(phrases)}.")
+
+    def _match_clause(self, clause: str, fallback_room: str) -> Optional[Tuple[Task, str]]:
+        for intent, pattern in self.patterns:
+            match = pattern.fullmatch(clause)
+            if match:
+                return self._build_task(intent, match, fallback_room)
+        return None
+
+    def _room_from_match(self, match: re.Match, fallback_room: str) -> str:
+        rooms = [value for name, value in match.groupdict().items() if name.startswith("room") and value]
+        if not rooms:
+            return fallback_room
+        room = rooms[0]
+        if room.startswith("all"):
+            return "all"
+        return room.replace(" ", "_")
+
+    def _build_task(self, intent: str, match: re.Match, fallback_room: str) -> Optional[Tuple[Task, str]]:
+        groups = match.groupdict()
+        room = self._room_from_match(match, fallback_room)
+        room_text = "all the" if room == "all" else f"the {room.replace('_', ' ')}"
+
+        if intent in ("turn_on_lights", "dim_lights", "brighten_lights", "set_brightness"):
+            parameters = {"room": room}
+            if groups.get("percent"):
+                percent = int(groups["percent"])
+                if percent > 100:
+                    return None
+                parameters["brightness"] = _percent_to_brightness(percent)
+            elif intent == "dim_lights":
+                parameters["brightness"] = 64
+            elif intent == "brighten_lights":
+                parameters["brightness"] = 255
+
+            if "brightness" in parameters and intent != "turn_on_lights":
+                phrase = f"set {room_text} lights to {round(parameters['brightness'] * 100 / 255)}%"
+            else:
+                phrase = f"turn on {room_text} lights"
+            return self._task("turn_on_lights", room, parameters, room), phrase
+
+        if intent == "turn_off_lights":
+            return self._task("turn_off_lights", room, {"room": room}, room), f"turn off {room_text} lights"
+
+        if intent == "pause_music":
+            return self._task("pause_music", "default", {}, None), "pause the music"
+
+        if intent == "resume_music":
+            return self._task("resume_music", "default", {}, None), "resume the music"
+
+        if intent == "set_volume":
+            volume = int(groups["volume"])
+            if volume > 100:
+                return None
+            return self._task("set_volume", "default", {"volume": volume}, None), f"set the volume to {volume}%"
+
+        if intent == "play_music":
+            query = (groups.get("query") or "music").strip()
+            if not re.search(r"[a-z0-9]", query) or all(word in NON_QUERY_WORDS for word in query.split()):
+                return None
+            parameters = {"query": query, "type": "track"}
+            phrase = "play some music" if query == "music" else f"play {query}"
+            if groups.get("room1"):
+                parameters["device"] = room
+                phrase += f" in {room_text}"
+                return self._task("play_music", "default", parameters, room), phrase
+            return self._task("play_music", "default", parameters, None), phrase
+
+        return None
+
+    def _task(self, action: str, target: str, parameters: Dict, room: Optional[str]) -> Optional[Task]:
+        if action not in self.smart_home_actions:
+            return None
+        return Task(action=action, target=target, parameters=parameters, room=room, priority=1)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get match-rate statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["match_rate"] = stats["matched"] / stats["total"] if stats["total"] else 0.0
+        return stats
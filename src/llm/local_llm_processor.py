@@ -1,18 +1,26 @@
-import requests
 import json
 from typing import Dict, List, Optional, Any
 import logging
 from dataclasses import dataclass
 from .command_processor import Task, CommandResult
+from .http_client import LLMTransport, get_llm_transport
+from .intent_matcher import extract_room
+from .response_cache import LLMResponseCache, get_llm_response_cache
+from .model_residency import ModelResidencyManager
 
 logger = logging.getLogger(__name__)
 
 class LocalLLMProcessor:
     """Processes voice commands using local LLM (Ollama, etc.)"""
     
-    def __init__(self, model_name: str = "llama3.2", base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str = "llama3.2", base_url: str = "http://localhost:11434",
+                 transport: Optional[LLMTransport] = None, response_cache: Optional[LLMResponseCache] = None,
+                 enable_response_cache: bool = True, keep_alive: Optional[str] = "30m"):
         self.model_name = model_name
         self.base_url = base_url.rstrip('/')
+        self.transport = transport or get_llm_transport(self.base_url)
+        self.response_cache = (response_cache or get_llm_response_cache()) if enable_response_cache else None
+        self.residency = ModelResidencyManager(self.transport, model_name, keep_alive=keep_alive)
         
         # Define available actions and their parameters
         self.available_actions = {
@@ -55,7 +63,7 @@ class LocalLLMProcessor:
     def _test_connection(self) -> bool:
         """Test connection to local LLM"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.transport.get_sync("/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Local LLM connection error: {e}")
@@ -85,34 +93,39 @@ class LocalLLMProcessor:
     def _call_local_llm(self, system_prompt: str, user_message: str) -> str:
         """Call local LLM API with retry logic for better JSON consistency"""
         max_retries = 3
+        temperature = 0.1  # Lower temperature for more consistent responses
+        
+        cache_key = None
+        if self.response_cache and self.response_cache.is_cacheable(user_message, temperature):
+            cache_key = self.response_cache.make_key(self.model_name, system_prompt, user_message, temperature)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached LLM response")
+                return cached
         
         for attempt in range(max_retries):
             try:
                 # Ollama API format
-                payload = {
+                payload = self.residency.apply({
                     "model": self.model_name,
                     "prompt": f"{system_prompt}\n\nUser: {user_message}\nAssistant:",
                     "stream": False,
                     "options": {
-                        "temperature": 0.1,  # Lower temperature for more consistent responses
+                        "temperature": temperature,
                         "top_p": 0.9,
                         "repeat_penalty": 1.1,  # Prevent repetition
                         "stop": ["\n\n", "User:", "Human:"]  # Stop at these tokens
                     }
-                }
-                
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    timeout=30
-                )
-                response.raise_for_status()
+                })
                 
-                result = response.json()
+                result = self.transport.post_json_sync("/api/generate", payload, timeout=30)
+                self.residency.record(result)
                 llm_response = result.get("response", "").strip()
                 
                 # Validate that response looks like JSON
                 if self._is_valid_json_response(llm_response):
+                    if cache_key:
+                        self.response_cache.put(cache_key, llm_response)
                     return llm_response
                 else:
                     logger.warning(f"Attempt {attempt + 1}: Invalid JSON response, retrying...")
@@ -397,11 +410,7 @@ IMPORTANT RULES:
     
     def _extract_room_from_command(self, command: str) -> Optional[str]:
         """Extract room name from command text"""
-        rooms = ["living room", "bedroom", "kitchen", "bathroom", "office", "dining room", "basement", "garage"]
-        for room in rooms:
-            if room in command:
-                return room.replace(" ", "_")
-        return None
+        return extract_room(command)
     
     def get_available_actions(self) -> Dict[str, Dict]:
         """Get available actions and their descriptions"""
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from .http_client import LLMTransport
+
+logger = logging.getLogger(__name__)
+
+# Requests that spent longer than this loading the model count as cold loads
+COLD_LOAD_THRESHOLD = 0.5
+
+def _seconds(nanoseconds: Optional[int]) -> float:
+    return (nanoseconds or 0) / 1e9
+
+def in_active_hours(active_hours: Optional[Tuple[int, int]], now: Optional[datetime] = None) -> bool:
+    """Whether the current hour is inside (start, end), which may wrap past midnight"""
+    if not active_hours:
+        return True
+    start, end = active_hours
+    hour = (now or datetime.now()).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class ModelResidencyManager:
+    """Keeps the Ollama model loaded so commands don't pay a cold load
+
+    Issues a warmup request at startup, and while inside the configured
+    active hours periodically refreshes residency whenever the model has
+    been idle for a refresh interval. Timings from every generate response
+    are recorded so model load time is reported separately from generation.
+    """
+
+    def __init__(self, transport: LLMTransport, model_name: str, keep_alive: Optional[str] = "30m"):
+        self.transport = transport
+        self.model_name = model_name
+        self.keep_alive = keep_alive
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_used = 0.0
+        self.stats = {
+            "warmups": 0,
+            "refreshes": 0,
+            "requests": 0,
+            "cold_loads": 0,
+            "last_load_time": 0.0,
+            "last_generation_time": 0.0,
+            "total_load_time": 0.0,
+            "total_generation_time": 0.0
+        }
+
+    def apply(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the keep_alive setting to an Ollama request payload"""
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def record(self, result: Dict[str, Any]) -> Tuple[float, float]:
+        """Record load and generation time from a generate response, returning both in seconds"""
+        load_time = _seconds(result.get("load_duration"))
+        generation_time = _seconds(result.get("prompt_eval_duration")) + _seconds(result.get("eval_duration"))
+
+        with self._lock:
+            self._last_used = time.monotonic()
+            self.stats["requests"] += 1
+            self.stats["last_load_time"] = load_time
+            self.stats["last_generation_time"] = generation_time
+            self.stats["total_load_time"] += load_time
+            self.stats["total_generation_time"] += generation_time
+            if load_time > COLD_LOAD_THRESHOLD:
+                self.stats["cold_loads"] += 1
+
+        if load_time > COLD_LOAD_THRESHOLD:
+            logger.warning(f"🐢 Request paid a cold model load: load {load_time:.2f}s, "
+                           f"generation {generation_time:.2f}s")
+        else:
+            logger.debug(f"LLM timing: load {load_time:.2f}s, generation {generation_time:.2f}s")
+        return load_time, generation_time
+
+    def warmup(self, timeout: float = 120.0) -> Optional[float]:
+        """Load the model with an empty generate request, returning the load time in seconds"""
+        # An empty prompt makes Ollama load the model without generating anything
+        payload = self.apply({"model": self.model_name, "prompt": "", "stream": False})
+        start_time = time.time()
+        try:
+            result = self.transport.post_json_sync("/api/generate", payload, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Model warmup failed: {e}")
+            return None
+
+        load_time = _seconds(result.get("load_duration"))
+        with self._lock:
+            self._last_used = time.monotonic()
+            self.stats["warmups"] += 1
+        logger.info(f"🔥 Model {self.model_name} resident (load {load_time:.2f}s, "
+                    f"request {time.time() - start_time:.2f}s)")
+        return load_time
+
+    def is_resident(self) -> bool:
+        """Check /api/ps for whether the model is currently loaded"""
+        try:
+            response = self.transport.get_sync("/api/ps", timeout=5)
+            response.raise_for_status()
+            models = response.json().get("models", [])
+        except Exception:
+            return False
+        return any(model.get("name") == self.model_name or model.get("model") == self.model_name
+                   for model in models)
+
+    def start(self, refresh_interval: float = 240.0, active_hours: Optional[Tuple[int, int]] = None):
+        """Warm the model in the background and keep refreshing residency"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(refresh_interval, active_hours),
+            daemon=True,
+            name="llm-residency"
+        )
+        self._thread.start()
+
+    def _run(self, refresh_interval: float, active_hours: Optional[Tuple[int, int]]):
+        self.warmup()
+
+        while not self._stop_event.wait(refresh_interval):
+            if not in_active_hours(active_hours):
+                continue
+
+            with self._lock:
+                idle_time = time.monotonic() - self._last_used
+            if idle_time < refresh_interval:
+                # A real request already kept the model resident
+                continue
+
+            if self.warmup() is not None:
+                with self._lock:
+                    self.stats["refreshes"] += 1
+
+    def stop(self):
+        """Stop refreshing residency"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get warmup counts and load vs generation timing"""
+        with self._lock:
+            stats = dict(self.stats)
+        requests = stats["requests"]
+        stats["avg_load_time"] = stats["total_load_time"] / requests if requests else 0.0
+        stats["avg_generation_time"] = stats["total_generation_time"] / requests if requests else 0.0
+        return stats
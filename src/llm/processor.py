@@ -1,6 +1,10 @@
 import logging
 import datetime
+from typing import Iterator
 from .unified_processor import UnifiedLLMProcessor
+from .http_client import get_llm_transport
+from .response_cache import get_llm_response_cache
+from ..tools.tool_cache import get_tool_result_cache
 import config
 
 logger = logging.getLogger(__name__)
@@ -9,20 +13,64 @@ class LLMProcessor:
     """Main LLM processor that handles all queries"""
     
     def __init__(self):
+        base_url = getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')
+        
+        # Shared keep-alive connection pool for all LLM requests
+        transport = get_llm_transport(
+            base_url,
+            pool_size=getattr(config, 'LLM_POOL_SIZE', 10),
+            keepalive_timeout=getattr(config, 'LLM_KEEPALIVE_TIMEOUT', 30.0),
+            connect_timeout=getattr(config, 'LLM_CONNECT_TIMEOUT', 5.0),
+            request_timeout=getattr(config, 'LLM_REQUEST_TIMEOUT', 60.0)
+        )
+        
+        # Shared cache of repeated low-temperature completions
+        response_cache = get_llm_response_cache(
+            max_entries=getattr(config, 'LLM_CACHE_SIZE', 256),
+            ttl=getattr(config, 'LLM_CACHE_TTL', 300.0),
+            max_temperature=getattr(config, 'LLM_CACHE_MAX_TEMPERATURE', 0.5)
+        )
+        
+        # Shared cache of weather and search results
+        tool_cache = get_tool_result_cache(
+            ttls=getattr(config, 'TOOL_CACHE_TTLS', None),
+            negative_ttl=getattr(config, 'TOOL_CACHE_NEGATIVE_TTL', 30.0),
+            cache_dir=getattr(config, 'TOOL_CACHE_DIR', None)
+        )
+        
         # Use the unified processor by default
         self.processor = UnifiedLLMProcessor(
             model_name=getattr(config, 'OLLAMA_MODEL', 'llama3.1:8b'),
-            base_url=getattr(config, 'OLLAMA_BASE_URL', 'http://localhost:11434')
+            base_url=base_url,
+            transport=transport,
+            response_cache=response_cache,
+            enable_response_cache=getattr(config, 'LLM_CACHE_ENABLED', True),
+            keep_alive=getattr(config, 'OLLAMA_KEEP_ALIVE', "30m"),
+            tool_cache=tool_cache
         )
+        
+        # Load the model now rather than inside the first command
+        if getattr(config, 'LLM_WARMUP_ON_START', True):
+            self.processor.residency.start(
+                refresh_interval=getattr(config, 'LLM_RESIDENCY_REFRESH_INTERVAL', 240.0),
+                active_hours=getattr(config, 'LLM_ACTIVE_HOURS', None)
+            )
         logger.info("LLM processor initialized with unified backend")
     
+    def _answer_directly(self, query: str):
+        """Answer queries that don't need the LLM, or return None"""
+        # Handle simple time queries directly
+        if 'time' in query.lower() and ('what' in query.lower() or 'current' in query.lower()):
+            current_time = datetime.datetime.now().strftime("%I:%M %p")
+            return f"The current time is {current_time}."
+        return None
+    
     def process_query(self, query: str) -> str:
         """Process any type of query"""
         try:
-            # Handle simple time queries directly
-            if 'time' in query.lower() and ('what' in query.lower() or 'current' in query.lower()):
-                current_time = datetime.datetime.now().strftime("%I:%M %p")
-                return f"The current time is {current_time}."
+            direct_answer = self._answer_directly(query)
+            if direct_answer:
+                return direct_answer
             
             # Use the unified processor for other queries
             result = self.processor.process_command(query, current_room="living room")
@@ -34,4 +82,18 @@ class LLMProcessor:
                 
         except Exception as e:
             logger.error(f"Error processing query: {e}")
-            return "I'm sorry, I'm having trouble processing that request right now." 
\ No newline at end of file
+            return "I'm sorry, I'm having trouble processing that request right now." 
+    
+    def stream_query(self, query: str) -> Iterator[str]:
+        """Process a query and yield the response one sentence at a time"""
+        try:
+            direct_answer = self._answer_directly(query)
+            if direct_answer:
+                yield direct_answer
+                return
+            
+            yield from self.processor.stream_command(query, current_room="living room")
+            
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            yield "I'm sorry, I'm having trouble processing that request right now."
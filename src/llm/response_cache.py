@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .intent_matcher import LEADING_FILLER_PATTERN, TRAILING_FILLER_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# Requests whose answer depends on the moment they are asked are never cached
+TIME_SENSITIVE_PATTERN = re.compile(
+    r"\b(time|date|today|tonight|tomorrow|yesterday|currently|latest|weather|forecast|"
+    r"temperature outside|news|search|look up|score)\b"
+)
+
+# Responses that embed or depend on a fresh tool result are not stored
+TIME_SENSITIVE_RESPONSE = re.compile(r"\b\d{1,2}:\d{2}\b|get_time|get_weather|web_search")
+
+# Timestamps the system prompt embeds on every call
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2})?")
+
+def normalize_prompt(text: str) -> str:
+    """Normalize a system prompt so per-call timestamps and whitespace don't change the key"""
+    text = TIMESTAMP_PATTERN.sub("<time>", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def normalize_user_text(text: str) -> str:
+    """Normalize user text so near-identical requests share a cache entry"""
+    text = text.lower()
+    text = re.sub(r"[^\w%' -]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return TRAILING_FILLER_PATTERN.sub("", LEADING_FILLER_PATTERN.sub("", text)).strip()
+
+
+class LLMResponseCache:
+    """TTL + LRU cache of LLM completions
+
+    Keyed by model, normalized system prompt, normalized user text and a
+    temperature bucket. Only low-temperature completions are cached, since
+    deterministic smart home prompts repeat constantly while creative
+    answers are expected to vary. Time-sensitive requests bypass the cache.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0, max_temperature: float = 0.5,
+                 temperature_step: float = 0.1):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.temperature_step = temperature_step
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "expired": 0, "evictions": 0, "stores": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def is_cacheable(self, user_input: str, temperature: float) -> bool:
+        """Whether a request may be served from or stored in the cache"""
+        if temperature > self.max_temperature or TIME_SENSITIVE_PATTERN.search(user_input.lower()):
+            self._count("bypassed")
+            return False
+        return True
+
+    def make_key(self, model: str, system_prompt: str, user_input: str, temperature: float) -> str:
+        """Build the cache key for a completion request"""
+        bucket = round(temperature / self.temperature_step) if self.temperature_step else temperature
+        raw_key = f"{model}|{bucket}|{normalize_prompt(system_prompt)}|{normalize_user_text(user_input)}"
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached completion, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            response, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return response
+
+    def put(self, key: str, response: str) -> bool:
+        """Store a completion, returning False if it is empty or time-sensitive"""
+        if not response or TIME_SENSITIVE_RESPONSE.search(response):
+            return False
+
+        with self._lock:
+            self._entries[key] = (response, time.monotonic())
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return True
+
+    def clear(self):
+        """Drop every cached completion"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_response_cache(**kwargs) -> LLMResponseCache:
+    """Get the process-wide LLM response cache
+
+    Keyword arguments only apply when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(**kwargs)
+        return _cache
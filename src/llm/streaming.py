@@ -0,0 +1,54 @@
+import re
+from typing import List
+
+# Sentence end: terminal punctuation (optionally followed by a closing quote
+# or bracket) and then whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+# Common abbreviations that end in a period but do not end a sentence
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "e.g.", "i.e.", "etc.", "approx."}
+
+def _ends_with_abbreviation(text: str) -> bool:
+    last_word = text.rstrip().rsplit(None, 1)[-1].lower() if text.strip() else ""
+    return last_word in ABBREVIATIONS
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences for incremental speech synthesis"""
+    splitter = SentenceSplitter()
+    sentences = splitter.feed(text)
+    sentences.extend(splitter.flush())
+    return sentences
+
+
+class SentenceSplitter:
+    """Incrementally splits streamed LLM text into complete sentences
+
+    Feed token chunks as they arrive; every complete sentence is returned as
+    soon as its terminating punctuation and following whitespace are seen.
+    """
+
+    def __init__(self, min_length: int = 2):
+        self.min_length = min_length
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk of text and return any sentences it completed"""
+        self._buffer += chunk
+        sentences = []
+        start = 0
+
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_length or _ends_with_abbreviation(candidate):
+                continue
+            sentences.append(candidate)
+            start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains once the stream has ended"""
+        remaining = self._buffer.strip()
+        self._buffer = ""
+        return [remaining] if remaining else []
@@ -0,0 +1,72 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from ..tools.tool_cache import ToolResultCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOOL_TIMEOUT = 10.0
+
+async def _run_tool(tool_name: str, tool: Dict[str, Any], parameters: Dict[str, Any],
+                    default_timeout: float, cache: Optional[ToolResultCache] = None) -> Any:
+    """Run one tool with its timeout; sync tools run in the default thread pool"""
+    if cache is not None:
+        hit, result = cache.get(tool_name, parameters)
+        if hit:
+            logger.debug(f"Tool {tool_name} served from cache")
+            return result
+
+    func = tool["function"]
+    timeout = tool.get("timeout", default_timeout)
+    start_time = time.time()
+
+    try:
+        if asyncio.iscoroutinefunction(func):
+            result = await asyncio.wait_for(func(**parameters), timeout=timeout)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await asyncio.wait_for(
+                loop.run_in_executor(None, functools.partial(func, **parameters)),
+                timeout=timeout
+            )
+        logger.debug(f"Tool {tool_name} finished in {time.time() - start_time:.2f}s")
+        error = None
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ Tool {tool_name} timed out after {timeout:.1f}s")
+        result, error = f"Error: {tool_name} timed out", True
+    except Exception as e:
+        logger.error(f"Tool execution error for {tool_name}: {e}")
+        result, error = f"Error: {str(e)}", True
+
+    if cache is not None:
+        cache.put(tool_name, parameters, result, error=error)
+    return result
+
+async def run_tool_calls(tool_calls: List[Dict], tools: Dict[str, Dict[str, Any]],
+                         default_timeout: float = DEFAULT_TOOL_TIMEOUT,
+                         cache: Optional[ToolResultCache] = None) -> Dict[str, Any]:
+    """Run extracted tool calls concurrently and return results keyed by tool name
+
+    A tool that fails or exceeds its timeout ("timeout" in its tool entry,
+    else default_timeout) yields an error string, so the other results are
+    still returned. When a tool is called more than once the last call's
+    result wins, as it did when calls ran in order. Results of tools with a
+    TTL in the cache are reused between turns.
+    """
+    names = []
+    jobs = []
+    for call in tool_calls:
+        tool_name = call["tool"]
+        tool = tools.get(tool_name)
+        if tool is None:
+            continue
+        names.append(tool_name)
+        jobs.append(_run_tool(tool_name, tool, call.get("parameters", {}), default_timeout, cache))
+
+    results = {}
+    for tool_name, result in zip(names, await asyncio.gather(*jobs)):
+        results[tool_name] = result
+    return results
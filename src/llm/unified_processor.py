@@ -4,20 +4,32 @@ Unified Totoro LLM Processor
 Combines smart home excellence with general AI capabilities
 """
 
-import requests
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 import asyncio
-import aiohttp
 import re
 import math
 from dataclasses import dataclass
 from .command_processor import Task, CommandResult
+from .http_client import LLMTransport, get_llm_transport
+from .intent_matcher import IntentMatcher, extract_room
+from .response_cache import LLMResponseCache, get_llm_response_cache
+from .model_residency import ModelResidencyManager
+from .event_loop import BackgroundEventLoop
+from .tool_runner import run_tool_calls
+from ..tools.tool_cache import ToolResultCache, get_tool_result_cache
+from .streaming import SentenceSplitter, split_sentences
 
 logger = logging.getLogger(__name__)
 
+# Prefix of a tool call line in LLM output; the call itself is never spoken
+TOOL_CALL_MARKER = "TOOL_CALL:"
+
+# Sentences stream_command may generate ahead of the caller before generation waits
+STREAM_QUEUE_SIZE = 8
+
 @dataclass
 class UnifiedResult:
     """Result from unified processing"""
@@ -35,9 +47,13 @@ class UnifiedLLMProcessor:
     and general AI capabilities in one system
     """
     
-    def __init__(self, model_name: str = "llama3.1:8b", base_url: str = "http://localhost:11434"):
+    def __init__(self, model_name: str = "llama3.1:8b", base_url: str = "http://localhost:11434",
+                 transport: Optional[LLMTransport] = None, enable_fast_path: bool = True,
+                 response_cache: Optional[LLMResponseCache] = None, enable_response_cache: bool = True,
+                 keep_alive: Optional[str] = "30m", tool_cache: Optional[ToolResultCache] = None):
         self.model_name = model_name
         self.base_url = base_url.rstrip('/')
+        self.transport = transport or get_llm_transport(self.base_url)
         self.conversation_history = []
         
         # Smart home actions
@@ -85,28 +101,48 @@ class UnifiedLLMProcessor:
                 "description": "Search the web for current information",
                 "parameters": ["query"],
                 "category": "general",
-                "function": self._web_search
+                "function": self._web_search,
+                "timeout": 8.0
             },
             "get_time": {
                 "description": "Get current date and time",
                 "parameters": [],
-                "category": "general", 
-                "function": self._get_time
+                "category": "general",
+                "function": self._get_time,
+                "timeout": 1.0
             },
             "calculate": {
                 "description": "Perform mathematical calculations",
                 "parameters": ["expression"],
                 "category": "general",
-                "function": self._calculate
+                "function": self._calculate,
+                "timeout": 2.0
             },
             "get_weather": {
                 "description": "Get weather for specified location",
                 "parameters": ["location"],
                 "category": "general",
-                "function": self._get_weather
+                "function": self._get_weather,
+                "timeout": 5.0
             }
         }
         
+        # Weather and search results are reused between turns
+        self.tool_cache = tool_cache or get_tool_result_cache()
+        
+        # Rule-based matcher for simple smart home commands that don't need the LLM
+        self.enable_fast_path = enable_fast_path
+        self.intent_matcher = IntentMatcher(self.smart_home_actions)
+        
+        # One long-lived event loop serves every sync caller, so pooled connections survive between calls
+        self.event_loop = BackgroundEventLoop(name="unified-llm-loop")
+        
+        # Keeps the model loaded between commands and reports load vs generation time
+        self.residency = ModelResidencyManager(self.transport, model_name, keep_alive=keep_alive)
+        
+        # Cache of low-temperature completions for repeated requests
+        self.response_cache = (response_cache or get_llm_response_cache()) if enable_response_cache else None
+        
         # Test connection
         if not self._test_connection():
             logger.warning("Could not connect to local LLM. Make sure Ollama is running.")
@@ -116,7 +152,7 @@ class UnifiedLLMProcessor:
     def _test_connection(self) -> bool:
         """Test connection to local LLM"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.transport.get_sync("/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Local LLM connection error: {e}")
@@ -125,20 +161,7 @@ class UnifiedLLMProcessor:
     def process_command(self, command: str, current_room: Optional[str] = None) -> CommandResult:
         """Main entry point - processes any command (smart home or general)"""
         try:
-            # Check if we're already in an async context
-            try:
-                loop = asyncio.get_running_loop()
-                # We're in an async context, create a task
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, self.process_unified_command(command, {"current_room": current_room}))
-                    result = future.result(timeout=60)
-            except RuntimeError:
-                # No running loop, safe to create new one
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(self.process_unified_command(command, {"current_room": current_room}))
-                loop.close()
+            result = self.run_sync(self.process_unified_command(command, {"current_room": current_room}), timeout=60)
             
             # Convert to CommandResult for compatibility
             return CommandResult(
@@ -157,12 +180,41 @@ class UnifiedLLMProcessor:
                 error=str(e)
             )
     
+    def run_sync(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the processor's event loop from sync code and wait for the result"""
+        return self.event_loop.run(coro, timeout=timeout)
+    
+    def close(self):
+        """Close the processor's pooled async session and stop its event loop"""
+        try:
+            self.run_sync(self.transport.close(), timeout=5)
+        except Exception as e:
+            logger.debug(f"Error closing LLM session: {e}")
+        self.event_loop.stop()
+    
     async def process_unified_command(self, user_input: str, context: Optional[Dict] = None) -> UnifiedResult:
         """
         Process any command - smart home or general AI
         Uses intelligent routing and hybrid response format
         """
         try:
+            # Simple, unambiguous smart home commands skip the LLM entirely
+            if self.enable_fast_path:
+                current_room = context.get("current_room") if context else None
+                fast_match = self.intent_matcher.match(user_input, current_room)
+                if fast_match:
+                    logger.info(f"Fast path matched: {user_input}")
+                    result = UnifiedResult(
+                        success=True,
+                        response=fast_match.response,
+                        tasks=fast_match.tasks,
+                        tool_calls=[],
+                        tool_results={},
+                        type="smart_home"
+                    )
+                    self._update_conversation_history(user_input, result)
+                    return result
+            
             # Analyze input to determine response strategy
             analysis = self._analyze_input(user_input)
             
@@ -228,6 +280,122 @@ class UnifiedLLMProcessor:
                 error=str(e)
             )
     
+    async def stream_unified_command(self, user_input: str, context: Optional[Dict] = None) -> AsyncIterator[str]:
+        """
+        Process a command and yield the spoken response sentence by sentence
+        General queries are streamed from the LLM so the first sentence can be
+        spoken while the rest is still generating
+        """
+        analysis = self._analyze_input(user_input)
+        
+        if analysis["has_smart_home_commands"]:
+            # Smart home replies need the complete JSON block before tasks exist
+            result = await self.process_unified_command(user_input, context)
+            for sentence in split_sentences(result.response):
+                yield sentence
+            return
+        
+        system_prompt = self._create_unified_system_prompt(analysis, context)
+        splitter = SentenceSplitter()
+        response_parts = []
+        spoken = False
+        
+        pending = ""
+        
+        async for chunk in self._stream_unified_llm(system_prompt, user_input, analysis):
+            response_parts.append(chunk)
+            # Tool syntax is removed before splitting, since a call can span a sentence boundary
+            speakable, pending = self._split_tool_syntax(pending + chunk)
+            for sentence in splitter.feed(speakable):
+                spoken = True
+                yield sentence
+        
+        speakable, _ = self._split_tool_syntax(pending, final=True)
+        splitter.feed(speakable)
+        for sentence in splitter.flush():
+            spoken = True
+            yield sentence
+        
+        # Tool calls can only be seen once the full response is known
+        llm_response = "".join(response_parts).strip()
+        tool_calls = self._extract_tool_calls(llm_response)
+        tool_results = {}
+        
+        if tool_calls:
+            tool_results = await self._execute_tools(tool_calls)
+            tool_text = self._clean_response_text("", tool_results) if tool_results else ""
+            for sentence in split_sentences(tool_text):
+                spoken = True
+                yield sentence
+        
+        if not spoken:
+            yield "I'll help you with that."
+        
+        result = UnifiedResult(
+            success=True,
+            response=self._clean_response_text(llm_response, tool_results),
+            tasks=[],
+            tool_calls=tool_calls,
+            tool_results=tool_results,
+            type="general"
+        )
+        self._update_conversation_history(user_input, result)
+    
+    def stream_command(self, command: str, current_room: Optional[str] = None) -> Iterator[str]:
+        """Sync bridge for stream_unified_command: yields sentences as they are generated"""
+        done = object()
+        
+        async def produce(sentences: asyncio.Queue):
+            # The end marker is only queued when generation finishes or fails; after a
+            # cancellation nobody is reading, and waiting on a full queue would never return
+            try:
+                async for sentence in self.stream_unified_command(command, {"current_room": current_room}):
+                    await sentences.put(sentence)
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"Error in streamed processing: {e}")
+                await sentences.put(e)
+            await sentences.put(done)
+        
+        async def start() -> Tuple[asyncio.Queue, asyncio.Task]:
+            # Bounded, so generation waits for a slow speaker instead of buffering the whole answer
+            sentences = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+            return sentences, asyncio.ensure_future(produce(sentences))
+        
+        # Generation continues on the processor's loop while the caller speaks
+        sentences, producer = self.run_sync(start())
+        try:
+            while True:
+                item = self.run_sync(sentences.get())
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # A caller that stops listening early must not leave the LLM stream running
+            self.event_loop.loop.call_soon_threadsafe(producer.cancel)
+    
+    def _split_tool_syntax(self, text: str, final: bool = False) -> Tuple[str, str]:
+        """
+        Split buffered LLM text into speakable text with tool calls removed and
+        a held-back tail that may still be part of an unfinished tool call
+        """
+        text = re.sub(r'TOOL_CALL:\s*\w+\([^)]*\)', "", text)
+        text = re.sub(r'TOOL_CALL:[^\n]*\n', "", text)
+        
+        marker = text.find(TOOL_CALL_MARKER)
+        if marker != -1:
+            # An unterminated call runs to the end of its line
+            return text[:marker], "" if final else text[marker:]
+        if not final:
+            # Hold back a trailing partial marker such as "TOOL_"
+            for size in range(min(len(TOOL_CALL_MARKER) - 1, len(text)), 0, -1):
+                if TOOL_CALL_MARKER.startswith(text[-size:]):
+                    return text[:-size], text[-size:]
+        return text, ""
+    
     def _analyze_input(self, user_input: str) -> Dict[str, Any]:
         """Analyze input to determine appropriate processing strategy"""
         smart_home_keywords = [
@@ -335,49 +503,76 @@ Instructions:
 6. Always respond with natural text, JSON and tool calls are additional
 """
     
+    def _select_temperature(self, analysis: Dict[str, Any]) -> float:
+        """Adjust temperature based on task type"""
+        return 0.1 if analysis["has_smart_home_commands"] else 0.7
+    
+    def _build_generate_payload(self, system_prompt: str, user_input: str,
+                                analysis: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        """Build the Ollama /api/generate payload"""
+        temperature = self._select_temperature(analysis)
+        
+        return self.residency.apply({
+            "model": self.model_name,
+            "prompt": f"{system_prompt}\n\nUser: {user_input}\nAssistant:",
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "top_p": 0.9,
+                "repeat_penalty": 1.1,
+                "stop": ["\n\n", "User:", "Human:"]
+            }
+        })
+    
+    async def _stream_unified_llm(self, system_prompt: str, user_input: str,
+                                  analysis: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream response text from the LLM chunk by chunk"""
+        payload = self._build_generate_payload(system_prompt, user_input, analysis, stream=True)
+        
+        async for chunk in self.transport.stream_json("/api/generate", payload, timeout=60):
+            text = chunk.get("response", "")
+            if text:
+                yield text
+            if chunk.get("done"):
+                self.residency.record(chunk)
+                break
+    
     async def _call_unified_llm(self, system_prompt: str, user_input: str, analysis: Dict[str, Any]) -> str:
         """Call the LLM with unified prompting"""
         max_retries = 3
         
+        temperature = self._select_temperature(analysis)
+        cache_key = None
+        if self.response_cache and self.response_cache.is_cacheable(user_input, temperature):
+            cache_key = self.response_cache.make_key(self.model_name, system_prompt, user_input, temperature)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached LLM response")
+                return cached
+        
         for attempt in range(max_retries):
             try:
-                # Adjust temperature based on task type
-                temperature = 0.1 if analysis["has_smart_home_commands"] else 0.7
+                payload = self._build_generate_payload(system_prompt, user_input, analysis, stream=False)
+                
+                result = await self.transport.post_json("/api/generate", payload, timeout=60)
+                self.residency.record(result)
+                llm_response = result.get("response", "").strip()
                 
-                payload = {
-                    "model": self.model_name,
-                    "prompt": f"{system_prompt}\n\nUser: {user_input}\nAssistant:",
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "top_p": 0.9,
-                        "repeat_penalty": 1.1,
-                        "stop": ["\n\n", "User:", "Human:"]
-                    }
-                }
+                # For smart home commands, validate JSON
+                if analysis["has_smart_home_commands"]:
+                    if self._has_valid_smart_home_json(llm_response):
+                        if cache_key:
+                            self.response_cache.put(cache_key, llm_response)
+                        return llm_response
+                    elif attempt < max_retries - 1:
+                        logger.warning(f"Attempt {attempt + 1}: Invalid JSON response, retrying...")
+                        continue
+                    return llm_response
+                
+                if cache_key:
+                    self.response_cache.put(cache_key, llm_response)
+                return llm_response
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{self.base_url}/api/generate",
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=60)
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            llm_response = result.get("response", "").strip()
-                            
-                            # For smart home commands, validate JSON
-                            if analysis["has_smart_home_commands"]:
-                                if self._has_valid_smart_home_json(llm_response):
-                                    return llm_response
-                                elif attempt < max_retries - 1:
-                                    logger.warning(f"Attempt {attempt + 1}: Invalid JSON response, retrying...")
-                                    continue
-                            
-                            return llm_response
-                        else:
-                            raise Exception(f"HTTP {response.status}")
-                            
             except Exception as e:
                 logger.error(f"Unified LLM API error on attempt {attempt + 1}: {e}")
                 if attempt == max_retries - 1:
@@ -385,48 +580,51 @@ Instructions:
                 
         return ""
     
+    def _find_smart_home_json(self, response: str) -> tuple[Optional[Dict], Optional[tuple]]:
+        """Decode the SMART_HOME_JSON object, returning (data, (start, end)) of the section"""
+        marker = re.search(r'SMART_HOME_JSON:\s*(?=\{)', response)
+        if not marker:
+            return None, None
+        
+        # raw_decode finds the end of the object, so nested task objects parse correctly
+        try:
+            data, end = json.JSONDecoder().raw_decode(response, marker.end())
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error: {e}")
+            # The object's end is unknown, so drop everything after the marker rather than speak broken JSON
+            return None, (marker.start(), len(response))
+        
+        if not isinstance(data, dict):
+            return None, (marker.start(), end)
+        return data, (marker.start(), end)
+    
     def _has_valid_smart_home_json(self, response: str) -> bool:
         """Check if response contains valid smart home JSON"""
-        json_pattern = r'SMART_HOME_JSON:\s*(\{.*?\})'
-        json_match = re.search(json_pattern, response, re.DOTALL)
-        
-        if json_match:
-            try:
-                json.loads(json_match.group(1))
-                return True
-            except json.JSONDecodeError:
-                pass
-        
-        return False
+        data, _ = self._find_smart_home_json(response)
+        return data is not None
     
     def _parse_smart_home_response(self, response: str, original_command: str) -> tuple[List[Task], str]:
         """Parse smart home JSON from response while preserving conversational text"""
         tasks = []
         
         # Extract JSON section
-        json_pattern = r'SMART_HOME_JSON:\s*(\{.*?\})'
-        json_match = re.search(json_pattern, response, re.DOTALL)
-        
-        if json_match:
-            try:
-                json_data = json.loads(json_match.group(1))
-                tasks_data = json_data.get("tasks", [])
-                
-                for task_data in tasks_data:
-                    task = Task(
-                        action=task_data.get("action", ""),
-                        target=task_data.get("target", ""),
-                        parameters=task_data.get("parameters", {}),
-                        room=task_data.get("room", ""),
-                        priority=task_data.get("priority", 1)
-                    )
-                    tasks.append(task)
-                    
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}")
+        json_data, span = self._find_smart_home_json(response)
+        
+        if json_data:
+            for task_data in json_data.get("tasks", []):
+                task = Task(
+                    action=task_data.get("action", ""),
+                    target=task_data.get("target", ""),
+                    parameters=task_data.get("parameters", {}),
+                    room=task_data.get("room", ""),
+                    priority=task_data.get("priority", 1)
+                )
+                tasks.append(task)
         
         # Extract conversational text (everything except JSON)
-        conversational_text = re.sub(json_pattern, "", response, flags=re.DOTALL).strip()
+        if span:
+            response = response[:span[0]] + response[span[1]:]
+        conversational_text = response.strip()
         
         # If no tasks found, try keyword-based parsing as fallback
         if not tasks:
@@ -443,11 +641,7 @@ Instructions:
         
         # Simple patterns for common commands
         if "turn on" in command_lower and "light" in command_lower:
-            room = "living_room"  # default
-            for room_name in ["bedroom", "kitchen", "living room", "bathroom"]:
-                if room_name in command_lower:
-                    room = room_name.replace(" ", "_")
-                    break
+            room = extract_room(command_lower) or "living_room"
             
             task = Task(
                 action="turn_on_lights",
@@ -496,25 +690,8 @@ Instructions:
         return tool_calls
     
     async def _execute_tools(self, tool_calls: List[Dict]) -> Dict[str, Any]:
-        """Execute tool calls"""
-        results = {}
-        for call in tool_calls:
-            tool_name = call["tool"]
-            parameters = call["parameters"]
-            
-            if tool_name in self.general_tools:
-                func = self.general_tools[tool_name]["function"]
-                try:
-                    if asyncio.iscoroutinefunction(func):
-                        result = await func(**parameters)
-                    else:
-                        result = func(**parameters)
-                    results[tool_name] = result
-                except Exception as e:
-                    logger.error(f"Tool execution error for {tool_name}: {e}")
-                    results[tool_name] = f"Error: {str(e)}"
-        
-        return results
+        """Execute tool calls concurrently, with per-tool timeouts"""
+        return await run_tool_calls(tool_calls, self.general_tools, cache=self.tool_cache)
     
     def _enhance_response_with_tools(self, response_text: str, tool_results: Dict[str, Any]) -> str:
         """Enhance response text with tool results"""
@@ -561,6 +738,22 @@ Instructions:
         
         return clean_response or "I'll help you with that."
     
+    def get_fast_path_stats(self) -> Dict[str, float]:
+        """Get rule-based fast path match-rate statistics"""
+        return self.intent_matcher.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get LLM response cache hit/miss statistics"""
+        return self.response_cache.get_stats() if self.response_cache else {}
+    
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """Get model warmup counts and load vs generation timing"""
+        return self.residency.get_stats()
+    
+    def get_connection_stats(self) -> Dict[str, int]:
+        """Get LLM request and connection reuse counters"""
+        return self.transport.get_stats()
+    
     def _update_conversation_history(self, user_input: str, result: UnifiedResult):
         """Update conversation history"""
         self.conversation_history.append({
@@ -0,0 +1,83 @@
+import heapq
+import math
+import threading
+from typing import Dict, List, Tuple
+
+class BM25Index:
+    """Inverted index ranking documents with Okapi BM25
+
+    Each term maps to a postings dict of doc_id -> term frequency, so a
+    query only touches documents that share at least one of its terms.
+    Documents can be added and removed incrementally; IDF and the average
+    document length are derived from running totals at query time.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: str, term_counts: Dict[str, int]):
+        """Add or replace a document given its term counts"""
+        with self._lock:
+            self._remove(doc_id)
+            for term, count in term_counts.items():
+                self.postings.setdefault(term, {})[doc_id] = count
+            length = sum(term_counts.values())
+            self._doc_terms[doc_id] = dict(term_counts)
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def remove(self, doc_id: str):
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def idf(self, term: str) -> float:
+        """Inverse document frequency; always positive so common terms still count a little"""
+        doc_freq = len(self.postings.get(term, ()))
+        doc_count = len(self._doc_lengths)
+        return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query_terms: Dict[str, int], k: int, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """Top k (doc_id, BM25 score) pairs scoring above min_score, best first"""
+        with self._lock:
+            if not self._doc_lengths or k <= 0:
+                return []
+            average_length = self._total_length / len(self._doc_lengths) or 1.0
+
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = self.idf(term)
+                for doc_id, frequency in postings.items():
+                    length_norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / average_length
+                    gain = idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + gain
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(doc_id, score) for doc_id, score in top if score > min_score]
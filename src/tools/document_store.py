@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Records are written with "op" and "id" first, so the index can be rebuilt
+# without parsing document bodies
+RECORD_HEAD = re.compile(rb'\{"op":"(put|delete)","id":("(?:[^"\\]|\\.)*")[,}]')
+
+class DocumentLog:
+    """Append-only single-file document store
+
+    Every write appends one compact JSON line ("put" with the document,
+    or "delete"), and an in-memory index maps each doc_id to the offset
+    and length of its latest record, so a document is read with one seek.
+    Records superseded by later writes are dead space that compact()
+    reclaims by rewriting the live records into a fresh file.
+    """
+
+    def __init__(self, path: str, compact_ratio: float = 0.5, min_compact_bytes: int = 1 << 20):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        self._size = 0
+        self._live_bytes = 0
+        self._lock = threading.Lock()
+        self._scan()
+        self._file = open(self.path, 'ab')
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.offsets
+
+    def _scan(self):
+        """Rebuild the offset index, dropping a torn record left by a crash mid-write"""
+        if not self.path.exists():
+            return
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                head = _read_head(line)
+                if head is None:
+                    logger.warning(f"Truncating damaged record at byte {offset} of {self.path}")
+                    break
+                self._apply(head[1], head[0], offset, len(line))
+                offset += len(line)
+        if offset != self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+        self._size = offset
+
+    def _apply(self, doc_id: str, op: str, offset: int, length: int):
+        previous = self.offsets.pop(doc_id, None)
+        if previous is not None:
+            self._live_bytes -= previous[1]
+        if op == "put":
+            self.offsets[doc_id] = (offset, length)
+            self._live_bytes += length
+
+    def _append(self, records: Iterable[Dict]):
+        lines = []
+        for record in records:
+            line = (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8')
+            lines.append((record, line))
+
+        with self._lock:
+            offset = self._size
+            self._file.write(b"".join(line for _, line in lines))
+            self._file.flush()
+            for record, line in lines:
+                self._apply(record["id"], record["op"], offset, len(line))
+                offset += len(line)
+            self._size = offset
+
+    def put(self, doc_id: str, content: str, metadata: Optional[Dict] = None):
+        """Append a document, replacing any earlier version"""
+        self.put_many([(doc_id, content, metadata)])
+
+    def put_many(self, documents: Iterable[Tuple[str, str, Optional[Dict]]]):
+        """Append several documents with a single write"""
+        self._append({
+            "op": "put",
+            "id": doc_id,
+            "content": content,
+            "metadata": metadata or {}
+        } for doc_id, content, metadata in documents)
+
+    def delete(self, doc_id: str):
+        """Append a tombstone for a document"""
+        self.delete_many([doc_id])
+
+    def delete_many(self, doc_ids: Iterable[str]):
+        """Append tombstones for several documents with a single write"""
+        records = [{"op": "delete", "id": doc_id} for doc_id in doc_ids if doc_id in self.offsets]
+        if records:
+            self._append(records)
+
+    def get(self, doc_id: str) -> Optional[Dict]:
+        """Read the latest record of a document"""
+        with self._lock:
+            location = self.offsets.get(doc_id)
+            if location is None:
+                return None
+            with open(self.path, 'rb') as f:
+                f.seek(location[0])
+                return json.loads(f.read(location[1]))
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict]]:
+        """Every live (doc_id, record) in one sequential pass over the file, oldest first"""
+        with self._lock:
+            live = {offset: doc_id for doc_id, (offset, _) in self.offsets.items()}
+            size = self._size
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if offset >= size:
+                    break
+                doc_id = live.get(offset)
+                if doc_id is not None:
+                    yield doc_id, json.loads(line)
+                offset += len(line)
+
+    @property
+    def size(self) -> int:
+        """Bytes of valid records in the file"""
+        return self._size
+
+    @property
+    def dead_bytes(self) -> int:
+        """Bytes held by superseded records and tombstones"""
+        return self._size - self._live_bytes
+
+    def maybe_compact(self) -> bool:
+        """Compact once dead records pass compact_ratio of a file of at least min_compact_bytes"""
+        if self._size < self.min_compact_bytes or self.dead_bytes <= self.compact_ratio * self._size:
+            return False
+        self.compact()
+        return True
+
+    def compact(self):
+        """Rewrite only the live records and swap the new file in atomically"""
+        with self._lock:
+            temp_path = self.path.with_suffix(self.path.suffix + ".compact")
+            offsets = {}
+            offset = 0
+            with open(self.path, 'rb') as source, open(temp_path, 'wb') as target:
+                for doc_id, (old_offset, length) in sorted(self.offsets.items(), key=lambda item: item[1][0]):
+                    source.seek(old_offset)
+                    target.write(source.read(length))
+                    offsets[doc_id] = (offset, length)
+                    offset += length
+                target.flush()
+                os.fsync(target.fileno())
+
+            reclaimed = self._size - offset
+            self._file.close()
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'ab')
+            self.offsets = offsets
+            self._size = self._live_bytes = offset
+        logger.info(f"Compacted {self.path.name}, reclaimed {reclaimed} bytes")
+
+    def sync(self):
+        """Force appended records to disk"""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def _read_head(line: bytes) -> Optional[Tuple[str, str]]:
+    """(op, doc_id) of a complete record line, or None if it is torn or damaged
+
+    Only the id is decoded; a line not in the written layout is parsed in full.
+    """
+    if not line.endswith(b"}\n"):
+        return None
+    match = RECORD_HEAD.match(line)
+    if match:
+        return match.group(1).decode(), json.loads(match.group(2))
+    try:
+        record = json.loads(line)
+        return record["op"], record["id"]
+    except (ValueError, KeyError, TypeError):
+        return None
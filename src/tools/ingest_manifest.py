@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class IngestManifest:
+    """Record of which source files produced which knowledge base chunks
+
+    Each entry is keyed by the resolved source path and holds the file's
+    mtime, size and content hash plus the doc_ids of its chunks, so an
+    unchanged file is recognised from a stat() alone and the chunks of a
+    modified or deleted file can be evicted.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable ingest manifest {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Write the manifest atomically"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        return str(Path(file_path).resolve())
+
+    def get(self, file_path: str) -> Optional[Dict]:
+        return self.entries.get(self.key(file_path))
+
+    def is_unchanged(self, file_path: str, stat: os.stat_result) -> bool:
+        """Whether the file still has the recorded mtime and size"""
+        entry = self.get(file_path)
+        return entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size
+
+    def record(self, file_path: str, stat: os.stat_result, file_hash: str, doc_ids: List[str]):
+        """Remember the current version of a file and its chunks"""
+        with self._lock:
+            self.entries[self.key(file_path)] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "hash": file_hash,
+                "doc_ids": list(doc_ids)
+            }
+
+    def forget(self, file_path: str) -> Optional[Dict]:
+        """Drop a file's entry, returning it"""
+        with self._lock:
+            return self.entries.pop(self.key(file_path), None)
+
+    def doc_id_counts(self) -> Counter:
+        """How many recorded files produce each doc_id"""
+        with self._lock:
+            return Counter(doc_id for entry in self.entries.values() for doc_id in entry["doc_ids"])
@@ -1,22 +1,72 @@
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+import html
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 import pickle
 import hashlib
 
+from .bm25_index import BM25Index
+from .document_store import DocumentLog
+from .ingest_manifest import IngestManifest
+from .vector_index import SparseVectorIndex
+
 logger = logging.getLogger(__name__)
 
+# Search modes: word-frequency cosine similarity, or BM25 over an inverted index
+RETRIEVAL_MODES = ("cosine", "bm25")
+
+# Minimum relevance per mode when the caller gives none
+DEFAULT_MIN_SCORES = {"cosine": 0.1, "bm25": 1.0}
+
+# Words too common to say anything about relevance; BM25 ignores them
+STOPWORDS = frozenset("""
+about after again all also and any are because been before being but can could did does doing
+down during each few for from had has have having her here hers him his how into its just more
+most not now off once only other our ours out over own same she should some such than that the
+their them then there these they this those through too under until very was were what when
+where which while who whom why will with would you your yours
+""".split())
+
+# Plain-text formats ingested from document directories; HTML is reduced to its text
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".markdown", ".rst", ".csv", ".log", ".html", ".htm")
+
 class SimpleKnowledgeBase:
     """Simple in-memory knowledge base with semantic search capabilities"""
     
-    def __init__(self, knowledge_dir: str = "knowledge"):
+    def __init__(self, knowledge_dir: str = "knowledge", retrieval_mode: str = "cosine",
+                 index_flush_rows: int = 256, context_cache_size: int = 128,
+                 min_scores: Optional[Dict[str, float]] = None):
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
+        self.min_scores = {**DEFAULT_MIN_SCORES, **(min_scores or {})}
         self.knowledge_dir = Path(knowledge_dir)
         self.knowledge_dir.mkdir(exist_ok=True)
+        self.store = DocumentLog(self.knowledge_dir / "documents.jsonl")
+        self.index_dir = self.knowledge_dir / "index"
+        self.manifest = IngestManifest(self.index_dir / "manifest.json")  # source file -> chunk doc_ids
         
         self.documents = {}  # document_id -> content
-        self.embeddings = {}  # document_id -> embedding
         self.metadata = {}   # document_id -> metadata
+        self.index = SparseVectorIndex()  # normalized document-term matrix over embeddings, mapped from disk
+        self.index_flush_rows = index_flush_rows
+        self._bm25_index = None  # built on the first BM25 search, then kept current
+        
+        # Assembled context strings, keyed by normalized query and index version
+        self.version = 0
+        self.context_cache_size = context_cache_size
+        self._context_cache: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._context_lock = threading.Lock()
+        self.context_stats = {"hits": 0, "misses": 0}
         
         # Load existing knowledge
         self._load_knowledge_base()
@@ -30,45 +80,132 @@ class SimpleKnowledgeBase:
         self.metadata[doc_id] = metadata or {}
         
         # Generate simple embedding (word frequency based)
-        self.embeddings[doc_id] = self._simple_embedding(content)
+        self.index.add(doc_id, self._simple_embedding(content))
+        if self._bm25_index is not None:
+            self._bm25_index.add(doc_id, self._bm25_terms(content))
         
         # Save to disk
         self._save_document(doc_id, content, metadata)
+        self._bump_version()
+        if self.index.pending_rows >= self.index_flush_rows:
+            self.save_index()
         
         logger.info(f"Added document {doc_id} to knowledge base")
         return doc_id
     
-    def search(self, query: str, max_results: int = 5) -> List[Dict]:
-        """Search the knowledge base for relevant documents"""
+    def add_documents(self, documents: Iterable[Tuple[str, Optional[Dict]]], persist_index: bool = True) -> List[str]:
+        """Add many (content, metadata) documents with a single log write
+        
+        With persist_index=False the embedding matrix is left for the caller
+        to save once after a bulk load, including after a log compaction.
+        """
+        records = []
+        for content, metadata in documents:
+            doc_id = self._generate_doc_id(content)
+            self.documents[doc_id] = content
+            self.metadata[doc_id] = metadata or {}
+            self.index.add(doc_id, self._simple_embedding(content))
+            if self._bm25_index is not None:
+                self._bm25_index.add(doc_id, self._bm25_terms(content))
+            records.append((doc_id, content, metadata))
+        
+        try:
+            self.store.put_many(records)
+        except Exception as e:
+            logger.error(f"Error saving {len(records)} documents: {e}")
+        self._bump_version()
+        compacted = self._compact_log()
+        if persist_index and (compacted or self.index.pending_rows >= self.index_flush_rows):
+            self.save_index()
+        
+        logger.debug(f"Added {len(records)} documents to knowledge base")
+        return [doc_id for doc_id, _, _ in records]
+    
+    def remove_documents(self, doc_ids: Iterable[str], persist_index: bool = True) -> int:
+        """Remove documents, writing their tombstones with a single log write"""
+        removed = []
+        for doc_id in doc_ids:
+            if self.documents.pop(doc_id, None) is None:
+                continue
+            self.metadata.pop(doc_id, None)
+            self.index.remove(doc_id)
+            if self._bm25_index is not None:
+                self._bm25_index.remove(doc_id)
+            removed.append(doc_id)
+        
+        try:
+            self.store.delete_many(removed)
+        except Exception as e:
+            logger.error(f"Error removing {len(removed)} documents: {e}")
+        if removed:
+            self._bump_version()
+            self._compact_log()
+        if persist_index and removed:
+            self.save_index()
+        
+        logger.debug(f"Removed {len(removed)} documents from knowledge base")
+        return len(removed)
+    
+    def search(self, query: str, max_results: int = 5, mode: Optional[str] = None,
+               min_score: Optional[float] = None) -> List[Dict]:
+        """Search the knowledge base for relevant documents
+        
+        mode overrides the knowledge base's retrieval_mode for this search,
+        and min_score the minimum relevance configured for that mode.
+        """
         if not self.documents:
             return []
         
-        query_embedding = self._simple_embedding(query)
-        
-        # Calculate similarity scores
-        scores = []
-        for doc_id, doc_embedding in self.embeddings.items():
-            similarity = self._cosine_similarity(query_embedding, doc_embedding)
-            scores.append((doc_id, similarity))
+        mode = mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        if min_score is None:
+            min_score = self.min_scores[mode]
         
-        # Sort by similarity and return top results
-        scores.sort(key=lambda x: x[1], reverse=True)
+        if mode == "bm25":
+            # Only documents sharing a (non-stopword) query term are scored
+            matches = self._get_bm25_index().search(self._bm25_terms(query), max_results, min_score=min_score)
+        else:
+            # One sparse matrix-vector product scores every document
+            matches = self.index.search(self._simple_embedding(query), max_results, min_score=min_score)
         
         results = []
-        for doc_id, score in scores[:max_results]:
-            if score > 0.1:  # Minimum relevance threshold
-                results.append({
-                    "doc_id": doc_id,
-                    "content": self.documents[doc_id],
-                    "metadata": self.metadata[doc_id],
-                    "relevance_score": score
-                })
+        for doc_id, score in matches:
+            results.append({
+                "doc_id": doc_id,
+                "content": self.documents[doc_id],
+                "metadata": self.metadata[doc_id],
+                "relevance_score": score
+            })
         
         return results
     
-    def get_context_for_query(self, query: str, max_length: int = 1000) -> str:
-        """Get relevant context for a query"""
-        results = self.search(query, max_results=3)
+    def get_context_for_query(self, query: str, max_length: int = 1000, max_results: int = 3,
+                              mode: Optional[str] = None, min_score: Optional[float] = None) -> str:
+        """Get relevant context for a query; repeat questions are served from an LRU cache"""
+        key = (_normalize_query(query), max_length, max_results, mode or self.retrieval_mode, min_score,
+               self.version)
+        with self._context_lock:
+            context = self._context_cache.get(key)
+            if context is not None:
+                self._context_cache.move_to_end(key)
+                self.context_stats["hits"] += 1
+                return context
+            self.context_stats["misses"] += 1
+        
+        context = self._build_context(query, max_length, max_results, mode, min_score)
+        
+        with self._context_lock:
+            # A write during the search bumped the version, so this context is already stale
+            if key[-1] == self.version and self.context_cache_size > 0:
+                self._context_cache[key] = context
+                while len(self._context_cache) > self.context_cache_size:
+                    self._context_cache.popitem(last=False)
+        return context
+    
+    def _build_context(self, query: str, max_length: int, max_results: int, mode: Optional[str],
+                       min_score: Optional[float]) -> str:
+        results = self.search(query, max_results=max_results, mode=mode, min_score=min_score)
         
         if not results:
             return "No relevant information found in knowledge base."
@@ -91,8 +228,32 @@ class SimpleKnowledgeBase:
         
         return "\n\n".join(context_parts)
     
-    def _simple_embedding(self, text: str) -> Dict[str, float]:
-        """Create a simple word frequency embedding"""
+    def _bump_version(self):
+        """Record a write, invalidating every cached context"""
+        with self._context_lock:
+            self.version += 1
+            self._context_cache.clear()
+    
+    def get_context_cache_stats(self) -> Dict[str, int]:
+        """Get context cache hit/miss statistics"""
+        with self._context_lock:
+            stats = dict(self.context_stats)
+            stats["entries"] = len(self._context_cache)
+            stats["version"] = self.version
+        return stats
+    
+    def _get_bm25_index(self) -> BM25Index:
+        """The BM25 inverted index, built from the loaded documents on first use"""
+        if self._bm25_index is None:
+            index = BM25Index()
+            for doc_id, content in list(self.documents.items()):
+                index.add(doc_id, self._bm25_terms(content))
+            self._bm25_index = index
+            logger.info(f"Built BM25 index over {len(index)} documents")
+        return self._bm25_index
+    
+    def _term_counts(self, text: str) -> Dict[str, int]:
+        """Count the cleaned words of a text"""
         words = text.lower().split()
         word_count = {}
         
@@ -102,6 +263,16 @@ class SimpleKnowledgeBase:
             if len(word) > 2:  # Skip very short words
                 word_count[word] = word_count.get(word, 0) + 1
         
+        return word_count
+    
+    def _bm25_terms(self, text: str) -> Dict[str, int]:
+        """Term counts for BM25, without stopwords"""
+        return {word: count for word, count in self._term_counts(text).items() if word not in STOPWORDS}
+    
+    def _simple_embedding(self, text: str) -> Dict[str, float]:
+        """Create a simple word frequency embedding"""
+        word_count = self._term_counts(text)
+        
         # Normalize to create embedding
         total_words = sum(word_count.values())
         if total_words == 0:
@@ -135,54 +306,161 @@ class SimpleKnowledgeBase:
         return hashlib.md5(content.encode()).hexdigest()[:12]
     
     def _save_document(self, doc_id: str, content: str, metadata: Optional[Dict]):
-        """Save document to disk"""
+        """Append document to the on-disk log"""
         try:
-            doc_file = self.knowledge_dir / f"{doc_id}.json"
-            with open(doc_file, 'w') as f:
-                json.dump({
-                    "content": content,
-                    "metadata": metadata or {},
-                    "embedding": self.embeddings[doc_id]
-                }, f, indent=2)
+            self.store.put(doc_id, content, metadata)
         except Exception as e:
             logger.error(f"Error saving document {doc_id}: {e}")
     
     def _load_knowledge_base(self):
         """Load existing knowledge base from disk"""
         try:
-            for doc_file in self.knowledge_dir.glob("*.json"):
-                doc_id = doc_file.stem
-                
-                with open(doc_file, 'r') as f:
-                    data = json.load(f)
-                
+            self._migrate_json_documents()
+            
+            # Documents written to the log after the saved index are embedded again
+            index = SparseVectorIndex.load(self.index_dir)
+            indexed_until = self._indexed_log_size(index)
+            if indexed_until is None:
+                index, indexed_until = SparseVectorIndex(), 0
+            self.index = index
+            
+            for doc_id, data in self.store:
                 self.documents[doc_id] = data["content"]
                 self.metadata[doc_id] = data.get("metadata", {})
-                self.embeddings[doc_id] = data.get("embedding", {})
-                
+                if doc_id not in index or self.store.offsets[doc_id][0] >= indexed_until:
+                    index.add(doc_id, self._simple_embedding(data["content"]))
+            
+            for doc_id in index.doc_ids():
+                if doc_id not in self.documents:
+                    index.remove(doc_id)
+            
+            # Compaction rewrites the log, so the index is saved against the new file
+            if self.store.maybe_compact() or index.needs_save:
+                self.save_index()
             logger.info(f"Loaded {len(self.documents)} documents from knowledge base")
             
         except Exception as e:
             logger.error(f"Error loading knowledge base: {e}")
+    
+    def _compact_log(self) -> bool:
+        """Reclaim dead log space once it passes the store's threshold
+        
+        Compaction rewrites the log, so the index must be saved against the
+        new file afterwards.
+        """
+        try:
+            return self.store.maybe_compact()
+        except Exception as e:
+            logger.error(f"Error compacting document log: {e}")
+            return False
+    
+    def save_index(self):
+        """Persist the embedding matrix so the next start maps it instead of re-embedding"""
+        try:
+            stat = self.store.path.stat()
+            self.index_dir.mkdir(exist_ok=True)
+            self.index.save(self.index_dir, source={"log_inode": stat.st_ino, "log_size": self.store.size})
+        except Exception as e:
+            logger.error(f"Error saving vector index: {e}")
+    
+    def _indexed_log_size(self, index: Optional[SparseVectorIndex]) -> Optional[int]:
+        """How much of the current log a saved index covers; None if it belongs to another file"""
+        if index is None or not self.store.path.exists():
+            return None
+        stat = self.store.path.stat()
+        source = index.source
+        if source.get("log_inode") != stat.st_ino or source.get("log_size", -1) > self.store.size:
+            return None
+        return source["log_size"]
+    
+    def _migrate_json_documents(self):
+        """Move documents saved as one {doc_id}.json file each into the log"""
+        doc_files = sorted(self.knowledge_dir.glob("*.json"))
+        if not doc_files:
+            return
+        
+        documents = []
+        for doc_file in doc_files:
+            try:
+                with open(doc_file, 'r') as f:
+                    data = json.load(f)
+                documents.append((doc_file.stem, data["content"], data.get("metadata", {})))
+            except Exception as e:
+                logger.error(f"Skipping unreadable document {doc_file}: {e}")
+        
+        self.store.put_many(documents)
+        self.store.sync()
+        
+        # Only files that made it into the log are removed
+        migrated = {doc_id for doc_id, _, _ in documents}
+        for doc_file in doc_files:
+            if doc_file.stem in migrated:
+                doc_file.unlink()
+        logger.info(f"Migrated {len(migrated)} JSON documents into {self.store.path.name}")
+
+
+def _normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the retrieved context"""
+    return re.sub(r"\s+", " ", query.lower()).strip().rstrip("?!.")
+
+
+_knowledge_bases: Dict[Path, SimpleKnowledgeBase] = {}
+_knowledge_bases_lock = threading.Lock()
+
+def get_knowledge_base(knowledge_dir: str = "knowledge", **kwargs) -> SimpleKnowledgeBase:
+    """Get the process-wide knowledge base for a directory
+    
+    Keyword arguments only apply when the knowledge base is first created.
+    """
+    key = Path(knowledge_dir).resolve()
+    with _knowledge_bases_lock:
+        knowledge_base = _knowledge_bases.get(key)
+        if knowledge_base is None:
+            knowledge_base = SimpleKnowledgeBase(knowledge_dir, **kwargs)
+            _knowledge_bases[key] = knowledge_base
+        return knowledge_base
 
 
 class DocumentProcessor:
     """Process various document types for the knowledge base"""
     
     @staticmethod
-    def process_text_file(file_path: str) -> List[Dict]:
-        """Process a text file into chunks"""
+    def find_files(directory: str, extensions: Iterable[str] = SUPPORTED_EXTENSIONS,
+                   recursive: bool = True) -> List[Path]:
+        """Every supported document under a directory"""
+        extensions = {extension.lower() for extension in extensions}
+        pattern = "**/*" if recursive else "*"
+        return sorted(path for path in Path(directory).glob(pattern)
+                      if path.is_file() and path.suffix.lower() in extensions)
+    
+    @staticmethod
+    def read_file(file_path: str) -> Tuple[str, str]:
+        """Read a document as text, returning (sha256 of its bytes, text)"""
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        
+        text = raw.decode('utf-8', errors='replace')
+        if Path(file_path).suffix.lower() in (".html", ".htm"):
+            text = re.sub(r"(?is)<(script|style)\b.*?</\1>", " ", text)
+            text = html.unescape(re.sub(r"<[^>]+>", " ", text))
+            text = re.sub(r"\s+", " ", text).strip()
+        
+        return hashlib.sha256(raw).hexdigest(), text
+    
+    @staticmethod
+    def process_file(file_path: str) -> Tuple[Optional[str], List[Dict]]:
+        """Process a document into chunks, returning (file hash, chunks)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            file_hash, content = DocumentProcessor.read_file(file_path)
             
             # Split into chunks (simple sentence-based chunking)
             chunks = DocumentProcessor._chunk_text(content)
             
-            return [{
+            return file_hash, [{
                 "content": chunk,
                 "metadata": {
                     "source_file": file_path,
+                    "source_hash": file_hash,
                     "chunk_index": i,
                     "total_chunks": len(chunks)
                 }
@@ -190,7 +468,36 @@ class DocumentProcessor:
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
-            return []
+            return None, []
+    
+    @staticmethod
+    def process_text_file(file_path: str) -> List[Dict]:
+        """Process a text file into chunks"""
+        return DocumentProcessor.process_file(file_path)[1]
+    
+    @staticmethod
+    def process_files(file_paths: List[str], max_workers: Optional[int] = None
+                      ) -> Iterator[Tuple[str, Optional[str], List[Dict]]]:
+        """Read and chunk files across a process pool, yielding (path, hash, chunks) in order"""
+        if max_workers is None:
+            max_workers = min(len(file_paths), os.cpu_count() or 1)
+        
+        done = 0
+        if max_workers > 1 and len(file_paths) > 1:
+            try:
+                chunksize = max(1, len(file_paths) // (max_workers * 4))
+                # Spawned workers don't inherit the parent's threads, locks or open files
+                with ProcessPoolExecutor(max_workers=max_workers,
+                                         mp_context=multiprocessing.get_context("spawn")) as executor:
+                    for result in executor.map(_process_file_job, file_paths, chunksize=chunksize):
+                        yield result
+                        done += 1
+                return
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f"Process pool unavailable ({e}), processing files in this process")
+        
+        for file_path in file_paths[done:]:
+            yield _process_file_job(file_path)
     
     @staticmethod
     def _chunk_text(text: str, max_chunk_size: int = 500) -> List[str]:
@@ -215,12 +522,25 @@ class DocumentProcessor:
 class RAGSystem:
     """Complete RAG (Retrieval Augmented Generation) system"""
     
-    def __init__(self, knowledge_base: SimpleKnowledgeBase):
+    def __init__(self, knowledge_base: SimpleKnowledgeBase, retrieval_mode: Optional[str] = None,
+                 max_results: int = 3, max_context_length: int = 1000, min_score: Optional[float] = None):
+        if retrieval_mode is not None and retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
         self.kb = knowledge_base
+        self.retrieval_mode = retrieval_mode  # None uses the knowledge base's mode
+        self.max_results = max_results
+        self.max_context_length = max_context_length
+        self.min_score = min_score  # None uses the knowledge base's minimum for the mode
     
     def enhance_query_with_context(self, query: str, system_prompt: str) -> str:
         """Enhance a query with relevant context from the knowledge base"""
-        context = self.kb.get_context_for_query(query)
+        context = self.kb.get_context_for_query(
+            query,
+            max_length=self.max_context_length,
+            max_results=self.max_results,
+            mode=self.retrieval_mode,
+            min_score=self.min_score
+        )
         
         if context and "No relevant information found" not in context:
             enhanced_prompt = f"""{system_prompt}
@@ -248,34 +568,126 @@ Use the above context to inform your response when relevant. If the context does
             }
         )
     
-    def load_documents_from_directory(self, directory: str) -> int:
-        """Load all text documents from a directory"""
+    def load_documents_from_directory(self, directory: str, extensions: Iterable[str] = SUPPORTED_EXTENSIONS,
+                                      recursive: bool = True, max_workers: Optional[int] = None,
+                                      batch_size: int = 256) -> int:
+        """Load all supported documents under a directory, returning how many chunks were added
+        
+        Files whose mtime and size match the ingest manifest are skipped
+        without being read. New and modified files are read and chunked in a
+        process pool and their chunks inserted in batches, with one log write
+        each. Chunks of modified or deleted files that no other file produces
+        are evicted, and the embedding matrix is saved once at the end.
+        """
         directory_path = Path(directory)
         if not directory_path.exists():
             logger.warning(f"Directory {directory} does not exist")
             return 0
         
+        manifest = self.kb.manifest
+        file_paths = [str(path) for path in DocumentProcessor.find_files(directory, extensions, recursive)]
+        stats = {file_path: os.stat(file_path) for file_path in file_paths}
+        changed = [file_path for file_path in file_paths if not manifest.is_unchanged(file_path, stats[file_path])]
+        
+        refcounts = manifest.doc_id_counts()
+        evict = set()
+        
+        def replace_chunks(old_ids: List[str], new_ids: List[str]):
+            refcounts.subtract(old_ids)
+            refcounts.update(new_ids)
+            evict.update(old_ids)
+        
+        # Files recorded under this directory that are gone
+        found = {manifest.key(file_path) for file_path in file_paths}
+        for key in [key for key in manifest.entries if key not in found]:
+            if _in_scope(Path(key), directory_path.resolve(), extensions, recursive):
+                replace_chunks(manifest.forget(key)["doc_ids"], [])
+        
         count = 0
-        for file_path in directory_path.glob("*.txt"):
-            chunks = DocumentProcessor.process_text_file(str(file_path))
+        batch = []
+        batch_ids = set()
+        legacy_chunks = None
+        for file_path, file_hash, chunks in DocumentProcessor.process_files(changed, max_workers):
+            if file_hash is None:
+                continue
+            entry = manifest.get(file_path)
+            if entry is not None and entry["hash"] == file_hash:
+                # Touched but not modified
+                manifest.record(file_path, stats[file_path], file_hash, entry["doc_ids"])
+                continue
             
+            if entry is None:
+                # Chunks ingested before the manifest existed are only known by their metadata
+                if legacy_chunks is None:
+                    legacy_chunks = _chunks_by_source(self.kb.metadata)
+                old_ids = legacy_chunks.get(manifest.key(file_path), [])
+                # They were never counted in the manifest, so count them before replacing them
+                refcounts.update(old_ids)
+            else:
+                old_ids = entry["doc_ids"]
+            
+            new_ids = []
             for chunk in chunks:
-                self.kb.add_document(
-                    chunk["content"],
-                    metadata=chunk["metadata"]
-                )
-                count += 1
+                doc_id = self.kb._generate_doc_id(chunk["content"])
+                new_ids.append(doc_id)
+                # Identical chunks from other files or earlier runs are stored once
+                if doc_id not in self.kb.documents and doc_id not in batch_ids:
+                    batch.append((chunk["content"], chunk["metadata"]))
+                    batch_ids.add(doc_id)
+            replace_chunks(old_ids, new_ids)
+            manifest.record(file_path, stats[file_path], file_hash, new_ids)
+            
+            if len(batch) >= batch_size:
+                count += len(self.kb.add_documents(batch, persist_index=False))
+                batch = []
+                batch_ids = set()
         
-        logger.info(f"Added {count} document chunks to knowledge base")
+        if batch:
+            count += len(self.kb.add_documents(batch, persist_index=False))
+        evicted = self.kb.remove_documents([doc_id for doc_id in evict if refcounts[doc_id] <= 0],
+                                           persist_index=False)
+        if count or evicted:
+            self.kb.save_index()
+        manifest.save()
+        
+        logger.info(f"Added {count} document chunks to knowledge base, evicted {evicted} stale chunks "
+                    f"({len(file_paths) - len(changed)} unchanged files skipped)")
         return count
 
 
+def _in_scope(path: Path, directory: Path, extensions: Iterable[str], recursive: bool) -> bool:
+    """Whether a load of directory would have picked up path"""
+    if path.suffix.lower() not in {extension.lower() for extension in extensions}:
+        return False
+    if not recursive:
+        return path.parent == directory
+    try:
+        path.relative_to(directory)
+        return True
+    except ValueError:
+        return False
+
+def _chunks_by_source(metadata: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """Doc ids grouped by the resolved source_file in their metadata"""
+    chunks = {}
+    for doc_id, doc_metadata in metadata.items():
+        source_file = doc_metadata.get("source_file")
+        if source_file:
+            chunks.setdefault(IngestManifest.key(source_file), []).append(doc_id)
+    return chunks
+
+def _process_file_job(file_path: str) -> Tuple[str, Optional[str], List[Dict]]:
+    """Process-pool entry point for DocumentProcessor.process_file"""
+    file_hash, chunks = DocumentProcessor.process_file(file_path)
+    return file_path, file_hash, chunks
+
+
 # Integration example
 async def create_knowledge_enhanced_prompt(query: str, base_prompt: str, kb_path: str = "knowledge") -> str:
     """Create a knowledge-enhanced prompt for better LLM responses"""
     
-    # Initialize RAG system
-    kb = SimpleKnowledgeBase(kb_path)
+    # Shared knowledge base, so nothing is reloaded from disk per call
+    kb = get_knowledge_base(kb_path)
     rag = RAGSystem(kb)
     
     # Enhance prompt with relevant context
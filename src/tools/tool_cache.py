@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a result stays valid per tool; tools not listed are never cached
+DEFAULT_TOOL_TTLS = {
+    "get_weather": 600.0,
+    "web_search": 3600.0,
+}
+
+# How the built-in tools phrase failures
+ERROR_RESULT_PATTERN = re.compile(r"(error:|search error|weather error|web search failed|weather lookup failed)", re.I)
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value.strip().lower())
+    return value
+
+def is_error_result(result: Any) -> bool:
+    """Whether a tool result describes a failure rather than data"""
+    if isinstance(result, dict):
+        return "error" in result
+    if isinstance(result, str):
+        return bool(ERROR_RESULT_PATTERN.match(result))
+    return False
+
+
+class ToolResultCache:
+    """TTL cache of tool results shared between conversation turns
+
+    Keys are the tool name plus its normalized parameters, each tool has
+    its own TTL, and failed lookups are remembered for a short negative
+    TTL so a broken API is not hammered. An optional on-disk tier of JSON
+    files lets results survive restarts.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, negative_ttl: float = 30.0,
+                 max_entries: int = 512, cache_dir: Optional[str] = None):
+        self.ttls = dict(DEFAULT_TOOL_TTLS if ttls is None else ttls)
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # key -> (result, expires_at wall-clock time, is_error)
+        self._entries: "OrderedDict[str, Tuple[Any, float, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "negative_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        """Whether results of this tool are cached at all"""
+        return self.ttls.get(tool_name, 0) > 0
+
+    def make_key(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+        """Build the cache key for a tool call"""
+        normalized = {key: _normalize(value) for key, value in parameters.items()}
+        raw_key = f"{tool_name}|{json.dumps(normalized, sort_keys=True, default=str)}"
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, tool_name: str, parameters: Dict[str, Any]) -> Tuple[bool, Any]:
+        """Return (hit, result) for a tool call"""
+        if not self.is_cacheable(tool_name):
+            return False, None
+
+        key = self.make_key(tool_name, parameters)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["negative_hits" if entry[2] else "hits"] += 1
+                return True, entry[0]
+
+        entry = self._load_from_disk(key, now)
+        if entry is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return False, None
+
+        with self._lock:
+            self.stats["disk_hits"] += 1
+        self._remember(key, entry)
+        return True, entry[0]
+
+    def put(self, tool_name: str, parameters: Dict[str, Any], result: Any, error: Optional[bool] = None):
+        """Store a tool result; errors are kept only for the negative TTL"""
+        if not self.is_cacheable(tool_name):
+            return
+
+        if error is None:
+            error = is_error_result(result)
+        ttl = self.negative_ttl if error else self.ttls[tool_name]
+        if ttl <= 0:
+            return
+
+        key = self.make_key(tool_name, parameters)
+        entry = (result, time.time() + ttl, error)
+        self._remember(key, entry)
+        with self._lock:
+            self.stats["stores"] += 1
+
+        # Errors are transient, so they are never written to disk
+        if not error:
+            self._save_to_disk(key, entry)
+
+    def _remember(self, key: str, entry: Tuple[Any, float, bool]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}.json" if self.cache_dir else None
+
+    def _load_from_disk(self, key: str, now: float) -> Optional[Tuple[Any, float, bool]]:
+        disk_path = self._disk_path(key)
+        if not disk_path or not disk_path.exists():
+            return None
+        try:
+            with open(disk_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable tool cache entry {disk_path}: {e}")
+            return None
+
+        if data["expires_at"] <= now:
+            try:
+                disk_path.unlink()
+            except OSError:
+                pass
+            return None
+        return data["result"], data["expires_at"], False
+
+    def _save_to_disk(self, key: str, entry: Tuple[Any, float, bool]):
+        disk_path = self._disk_path(key)
+        if not disk_path:
+            return
+        try:
+            with open(disk_path, 'w', encoding='utf-8') as f:
+                json.dump({"result": entry[0], "expires_at": entry[1]}, f)
+        except (TypeError, OSError) as e:
+            logger.warning(f"Could not persist tool result to {disk_path}: {e}")
+
+    def clear(self):
+        """Drop every in-memory result"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+def get_tool_result_cache(**kwargs) -> ToolResultCache:
+    """Get the process-wide tool result cache
+
+    Keyword arguments only apply when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolResultCache(**kwargs)
+        return _cache
@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+MATRIX_PARTS = ("data", "indices", "indptr")
+
+class SparseVectorIndex:
+    """Document-term matrix for cosine search over sparse embeddings
+
+    Each document is a row of a CSR matrix over a shared vocabulary, L2
+    normalized when added, so a query is scored against every document
+    with one sparse matrix-vector product and the top k are picked with
+    argpartition.
+
+    save() writes the matrix as .npy arrays plus a JSON sidecar holding
+    the vocabulary and row doc_ids, and load() memory-maps them, so a
+    large corpus is paged in by the OS instead of parsed into RAM. Rows
+    added since the last save live in a small in-memory delta matrix, and
+    removed rows are masked out until the next save drops them.
+    """
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self.source: Dict[str, Any] = {}  # caller-defined description of what the saved index covers
+
+        self._doc_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._removed = 0
+
+        # Saved (possibly memory-mapped) rows, then rows added since
+        self._base: Tuple[np.ndarray, np.ndarray, np.ndarray] = (
+            np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int32)
+        )
+        self._base_matrix: Optional[sparse.csr_matrix] = None
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._delta: Optional[sparse.csr_matrix] = None
+        self._alive: Optional[np.ndarray] = None
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def doc_ids(self) -> List[str]:
+        """Ids of every indexed document"""
+        with self._lock:
+            return list(self._rows)
+
+    @property
+    def pending_rows(self) -> int:
+        """Rows added since the last save"""
+        return len(self._pending)
+
+    @property
+    def needs_save(self) -> bool:
+        """Whether rows were added or removed since the last save"""
+        return bool(self._pending or self._removed)
+
+    @property
+    def _base_rows(self) -> int:
+        return len(self._base[2]) - 1
+
+    def _vectorize(self, embedding: Dict[str, float], grow: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Column indices and L2-normalized weights of an embedding
+
+        The norm covers every term, including ones dropped for not being in
+        the vocabulary, so query scores stay true cosine similarities.
+        """
+        norm = float(np.linalg.norm(np.fromiter(embedding.values(), dtype=np.float64, count=len(embedding))))
+        columns = []
+        weights = []
+        for term, weight in embedding.items():
+            column = self.vocabulary.get(term)
+            if column is None:
+                if not grow:
+                    continue
+                column = len(self.vocabulary)
+                self.vocabulary[term] = column
+            columns.append(column)
+            weights.append(weight)
+
+        indices = np.asarray(columns, dtype=np.int32)
+        data = np.asarray(weights, dtype=np.float32)
+        if norm > 0:
+            data /= norm
+        order = np.argsort(indices)
+        return indices[order], data[order]
+
+    def add(self, doc_id: str, embedding: Dict[str, float]):
+        """Add or replace a document's embedding"""
+        with self._lock:
+            if doc_id in self._rows:
+                self._remove(doc_id)
+            indices, data = self._vectorize(embedding, grow=True)
+            self._rows[doc_id] = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._pending.append((indices, data))
+            self._delta = None
+            self._alive = None
+
+    def remove(self, doc_id: str):
+        """Drop a document from the index"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+        self._doc_ids[row] = None
+        self._removed += 1
+        self._alive = None
+
+    def _matrices(self) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """The saved rows and the in-memory delta, both over the current vocabulary"""
+        columns = max(len(self.vocabulary), 1)
+        if self._base_matrix is None or self._base_matrix.shape[1] != columns:
+            # Wraps the (mapped) arrays without copying them
+            self._base_matrix = sparse.csr_matrix(self._base, shape=(self._base_rows, columns), copy=False)
+
+        if self._delta is None or self._delta.shape[1] != columns:
+            lengths = np.fromiter((len(indices) for indices, _ in self._pending), dtype=np.int32,
+                                  count=len(self._pending))
+            indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32)
+            indices = np.concatenate([np.zeros(0, dtype=np.int32)] + [indices for indices, _ in self._pending])
+            data = np.concatenate([np.zeros(0, dtype=np.float32)] + [data for _, data in self._pending])
+            self._delta = sparse.csr_matrix((data, indices, indptr), shape=(len(self._pending), columns))
+
+        if self._alive is None:
+            self._alive = np.fromiter((doc_id is not None for doc_id in self._doc_ids), dtype=bool,
+                                      count=len(self._doc_ids))
+        return self._base_matrix, self._delta
+
+    def search(self, embedding: Dict[str, float], k: int, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """Top k (doc_id, cosine similarity) pairs scoring above min_score, best first"""
+        with self._lock:
+            if not self._rows or k <= 0:
+                return []
+            indices, data = self._vectorize(embedding, grow=False)
+            if not len(indices):
+                return []
+
+            base, delta = self._matrices()
+            query = np.zeros(base.shape[1], dtype=np.float32)
+            query[indices] = data
+            scores = np.concatenate([base @ query, delta @ query])
+            scores[~self._alive] = 0.0
+
+            candidates = np.flatnonzero(scores > min_score)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(self._doc_ids[row], float(scores[row])) for row in candidates]
+
+    def save(self, directory: str, name: str = "vectors", source: Optional[Dict[str, Any]] = None):
+        """Write live rows to {name}.{data,indices,indptr}.npy and {name}.json, then map them back"""
+        directory = Path(directory)
+        with self._lock:
+            base, delta = self._matrices()
+            keep = np.flatnonzero(self._alive)
+            matrix = sparse.vstack([base, delta], format="csr")[keep]
+            doc_ids = [self._doc_ids[row] for row in keep]
+            terms = [None] * len(self.vocabulary)
+            for term, column in self.vocabulary.items():
+                terms[column] = term
+            if source is not None:
+                self.source = dict(source)
+
+            arrays = {
+                "data": matrix.data.astype(np.float32),
+                "indices": matrix.indices.astype(np.int32),
+                "indptr": matrix.indptr.astype(np.int32)
+            }
+            for part in MATRIX_PARTS:
+                _atomic_write(directory / f"{name}.{part}.npy", lambda f: np.save(f, arrays[part]))
+            # The sidecar is written last, so a crash mid-save leaves a mismatch load() rejects
+            sidecar = {"doc_ids": doc_ids, "vocabulary": terms, "nnz": int(matrix.nnz), "source": self.source}
+            _atomic_write(directory / f"{name}.json",
+                          lambda f: f.write(json.dumps(sidecar, separators=(',', ':')).encode('utf-8')))
+
+            self._set_base(tuple(np.load(directory / f"{name}.{part}.npy", mmap_mode='r') for part in MATRIX_PARTS),
+                           doc_ids)
+        logger.debug(f"Saved vector index with {len(doc_ids)} rows to {directory}")
+
+    def _set_base(self, arrays: Tuple[np.ndarray, np.ndarray, np.ndarray], doc_ids: List[str]):
+        self._base = arrays
+        self._base_matrix = None
+        self._doc_ids = list(doc_ids)
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._doc_ids)}
+        self._removed = 0
+        self._pending = []
+        self._delta = None
+        self._alive = None
+
+    @classmethod
+    def load(cls, directory: str, name: str = "vectors", mmap: bool = True) -> Optional["SparseVectorIndex"]:
+        """Map an index written by save(); None if it is missing or incomplete"""
+        directory = Path(directory)
+        sidecar_path = directory / f"{name}.json"
+        if not sidecar_path.exists():
+            return None
+        try:
+            with open(sidecar_path, 'r', encoding='utf-8') as f:
+                sidecar = json.load(f)
+            data, indices, indptr = (
+                np.load(directory / f"{name}.{part}.npy", mmap_mode='r' if mmap else None) for part in MATRIX_PARTS
+            )
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable vector index in {directory}: {e}")
+            return None
+
+        doc_ids = sidecar["doc_ids"]
+        if len(indptr) != len(doc_ids) + 1 or not (int(indptr[-1]) == len(data) == len(indices) == sidecar["nnz"]):
+            logger.warning(f"Ignoring inconsistent vector index in {directory}")
+            return None
+
+        index = cls()
+        index.vocabulary = {term: column for column, term in enumerate(sidecar["vocabulary"])}
+        index.source = sidecar.get("source", {})
+        index._set_base((data, indices, indptr), doc_ids)
+        return index
+
+
+def _atomic_write(path: Path, write):
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
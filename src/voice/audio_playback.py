@@ -0,0 +1,82 @@
+import logging
+import os
+import time
+import wave
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+import pygame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 24000  # XTTS v2 output rate
+
+def output_sample_rate(tts_api: Any) -> int:
+    """Output sample rate of a loaded Coqui TTS model"""
+    synthesizer = getattr(tts_api, 'synthesizer', None)
+    return getattr(synthesizer, 'output_sample_rate', None) or DEFAULT_SAMPLE_RATE
+
+def to_pcm16(wav: np.ndarray, sample_rate: int, target_rate: int, channels: int = 1) -> np.ndarray:
+    """Convert a float waveform to interleaved 16-bit PCM at the target rate"""
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+
+    # Resample so pitch and speed are preserved on the output device
+    if sample_rate != target_rate and len(wav) > 1:
+        target_length = int(len(wav) * target_rate / sample_rate)
+        wav = np.interp(
+            np.linspace(0, len(wav) - 1, target_length),
+            np.arange(len(wav)),
+            wav
+        )
+
+    pcm = (np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16)
+    if channels > 1:
+        pcm = np.repeat(pcm[:, np.newaxis], channels, axis=1)
+    return pcm
+
+def dump_waveform(wav: np.ndarray, sample_rate: int, dump_dir: str, prefix: str = "tts") -> Optional[str]:
+    """Write a waveform to a WAV file for debugging, returning its path"""
+    try:
+        os.makedirs(dump_dir, exist_ok=True)
+        file_name = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.wav"
+        path = os.path.join(dump_dir, file_name)
+
+        pcm = to_pcm16(wav, sample_rate, sample_rate)
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm.tobytes())
+
+        logger.debug(f"Dumped synthesised audio to {path}")
+        return path
+    except Exception as e:
+        logger.warning(f"Could not dump audio for debugging: {e}")
+        return None
+
+def play_waveform(wav: np.ndarray, sample_rate: int, dump_dir: Optional[str] = None) -> bool:
+    """Play a float waveform from memory through the pygame mixer and wait for it to finish
+
+    No file is written unless dump_dir is given, in which case a copy of the
+    audio is saved there for debugging.
+    """
+    mixer = pygame.mixer.get_init()
+    if not mixer:
+        logger.error("Audio mixer not initialized")
+        return False
+
+    if dump_dir:
+        dump_waveform(wav, sample_rate, dump_dir)
+
+    frequency, _, channels = mixer
+    pcm = to_pcm16(wav, sample_rate, frequency, channels)
+
+    sound = pygame.mixer.Sound(buffer=pcm.tobytes())
+    channel = sound.play()
+
+    # Wait for playback to complete
+    while channel is not None and channel.get_busy():
+        time.sleep(0.02)
+
+    return True
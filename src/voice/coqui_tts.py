@@ -1,20 +1,25 @@
 import os
-import tempfile
 import pygame
+import numpy as np
 import logging
 import threading
 import time
 from typing import Optional
+from .audio_playback import output_sample_rate, play_waveform
+from .speaker_latents import get_speaker_latent_cache, get_xtts_model
 
 logger = logging.getLogger(__name__)
 
 class CoquiTTS:
     """Coqui TTS (XTTS v2) - Fast neural voice synthesis with voice cloning"""
     
-    def __init__(self, model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2"):
+    def __init__(self, model_name: str = "tts_models/multilingual/multi-dataset/xtts_v2",
+                 latent_cache_dir: Optional[str] = None, debug_dump_dir: Optional[str] = None):
         self.model_name = model_name
         self.tts = None
         self.george_voice_path = None
+        self.debug_dump_dir = debug_dump_dir  # Save a WAV copy of each utterance when set
+        self.speaker_latents = get_speaker_latent_cache(latent_cache_dir)
         self._lock = threading.Lock()
         self._audio_initialized = False
         
@@ -68,6 +73,11 @@ class CoquiTTS:
         if os.path.exists(voice_path):
             self.george_voice_path = voice_path
             logger.info(f"🎭 George voice set: {voice_path}")
+            
+            # Compute the speaker latents now rather than on the first utterance
+            model = get_xtts_model(self.tts)
+            if model is not None:
+                self.speaker_latents.warm(model, [voice_path])
         else:
             logger.error(f"Voice file not found: {voice_path}")
     
@@ -91,20 +101,22 @@ class CoquiTTS:
                     logger.error("Coqui XTTS requires a speaker voice file")
                     return False
                 
-                # Create temporary file
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                
                 logger.info(f"🗣️ Coqui TTS generating: {text[:50]}...")
                 
-                # Generate speech with Coqui TTS
-                self.tts.tts_to_file(
-                    text=text,
-                    speaker_wav=speaker_wav,
-                    language="en",
-                    file_path=temp_path,
-                    speed=speed
-                )
+                # Generate speech with Coqui TTS, reusing cached speaker latents for XTTS
+                model = get_xtts_model(self.tts)
+                if model is not None:
+                    gpt_cond_latent, speaker_embedding = self.speaker_latents.get(model, speaker_wav)
+                    output = model.inference(text, "en", gpt_cond_latent, speaker_embedding,
+                                             speed=speed, enable_text_splitting=True)
+                    wav = output["wav"]
+                else:
+                    wav = self.tts.tts(
+                        text=text,
+                        speaker_wav=speaker_wav,
+                        language="en",
+                        speed=speed
+                    )
                 
                 logger.debug(f"Voice cloning from: {speaker_wav}")
                 
@@ -113,26 +125,16 @@ class CoquiTTS:
                     pygame.mixer.music.stop()
                     time.sleep(0.1)
                 
-                # Play the generated audio
-                pygame.mixer.music.load(temp_path)
-                pygame.mixer.music.play()
-                
-                # Wait for playback to complete
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
+                # Play the generated audio straight from memory
+                if not play_waveform(np.asarray(wav, dtype=np.float32), output_sample_rate(self.tts),
+                                     dump_dir=self.debug_dump_dir):
+                    return False
                 
-                # Clean up
-                os.unlink(temp_path)
                 logger.info("✅ Coqui TTS speech completed")
                 return True
                 
             except Exception as e:
                 logger.error(f"Coqui TTS generation failed: {e}")
-                try:
-                    if 'temp_path' in locals():
-                        os.unlink(temp_path)
-                except:
-                    pass
                 return False
     
     def test_speed(self, test_text: str = "Hello! This is a speed test of Coqui TTS with voice cloning."):
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class PhraseAudioCache:
+    """Content-addressed cache of synthesised audio for repeated phrases
+
+    Entries are keyed by the normalized text, a hash of the voice reference
+    file, the speech speed and the engine, so a changed voice file or speed
+    never replays stale audio. A bounded in-memory LRU tier sits in front of
+    an optional on-disk tier of .npz files. Only phrases that are pre-warmed
+    or come up more than once are written to disk; one-off sentences stay in
+    memory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 128,
+                 max_disk_entries: int = 1000):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        # Keys synthesised once but not yet persisted, so a repeat can be spotted
+        # even after the memory tier has evicted the audio
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        # Keys on disk in least recently used order; the directory is only listed here
+        self._disk: "OrderedDict[str, None]" = self._index_disk()
+        self._voice_hashes: Dict[Tuple[str, int], str] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _index_disk(self) -> "OrderedDict[str, None]":
+        """List the on-disk entries once, oldest first"""
+        if not self.cache_dir:
+            return OrderedDict()
+        files = sorted(self.cache_dir.glob("*.npz"), key=lambda f: f.stat().st_mtime)
+        return OrderedDict((f.stem, None) for f in files)
+
+    def _voice_hash(self, voice_path: Optional[str]) -> str:
+        """Hash of the voice file contents, cached per path and mtime"""
+        if not voice_path or not os.path.exists(voice_path):
+            return "none"
+
+        path = os.path.abspath(voice_path)
+        key = (path, os.stat(path).st_mtime_ns)
+        with self._lock:
+            cached = self._voice_hashes.get(key)
+        if cached:
+            return cached
+
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        voice_hash = digest.hexdigest()[:16]
+
+        with self._lock:
+            self._voice_hashes[key] = voice_hash
+        return voice_hash
+
+    def make_key(self, text: str, voice_path: Optional[str], speed: float, engine: str) -> str:
+        """Build the cache key for a phrase"""
+        normalized = re.sub(r'\s+', ' ', text.strip())
+        raw_key = f"{engine}|{self._voice_hash(voice_path)}|{speed:.2f}|{normalized}"
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Get (waveform, sample_rate) for a key, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                persist = self.cache_dir is not None and key not in self._disk
+        if entry is not None:
+            # A second use makes the phrase worth keeping across restarts
+            if persist:
+                self._save_to_disk(key, entry)
+            return entry
+
+        entry = self._load_from_disk(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["disk_hits"] += 1
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, wav: np.ndarray, sample_rate: int, persist: bool = False):
+        """Store a synthesised waveform
+
+        The waveform always goes to the memory tier. It is also written to disk
+        when persist is set (pre-warmed phrases) or the phrase was synthesised
+        before.
+        """
+        entry = (np.asarray(wav, dtype=np.float32), int(sample_rate))
+        self._remember(key, entry)
+        if self.cache_dir is None:
+            return
+
+        with self._lock:
+            if not persist and key not in self._seen:
+                self._seen[key] = None
+                while len(self._seen) > self.max_disk_entries:
+                    self._seen.popitem(last=False)
+                return
+        self._save_to_disk(key, entry)
+
+    def _remember(self, key: str, entry: Tuple[np.ndarray, int]):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}.npz" if self.cache_dir else None
+
+    def _load_from_disk(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+
+        disk_path = self._disk_path(key)
+        try:
+            with np.load(disk_path) as data:
+                return data["wav"], int(data["sample_rate"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable phrase cache entry {disk_path}: {e}")
+            with self._lock:
+                self._disk.pop(key, None)
+            return None
+
+    def _save_to_disk(self, key: str, entry: Tuple[np.ndarray, int]):
+        with self._lock:
+            if key in self._disk:
+                return
+            self._disk[key] = None
+            self._seen.pop(key, None)
+            evicted = []
+            while len(self._disk) > self.max_disk_entries:
+                evicted.append(self._disk.popitem(last=False)[0])
+
+        disk_path = self._disk_path(key)
+        try:
+            np.savez(disk_path, wav=entry[0], sample_rate=entry[1])
+        except Exception as e:
+            logger.warning(f"Could not persist phrase audio to {disk_path}: {e}")
+            with self._lock:
+                self._disk.pop(key, None)
+
+        for old_key in evicted:
+            try:
+                self._disk_path(old_key).unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        """Clear the in-memory tier"""
+        with self._lock:
+            self._memory.clear()
+
+
+_cache: Optional[PhraseAudioCache] = None
+_cache_lock = threading.Lock()
+
+def get_phrase_audio_cache(cache_dir: Optional[str] = None, **kwargs) -> PhraseAudioCache:
+    """Get the process-wide phrase audio cache
+
+    Arguments only apply when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PhraseAudioCache(cache_dir, **kwargs)
+        return _cache
@@ -0,0 +1,201 @@
+import logging
+import multiprocessing
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+def _select_voice(engine, voice_id: Optional[str]):
+    """Pick the configured voice, then Samantha, then the first available voice"""
+    voices = engine.getProperty('voices')
+    if not voices:
+        return
+    if voice_id:
+        for voice in voices:
+            if voice.id == voice_id:
+                engine.setProperty('voice', voice.id)
+                return
+    for voice in voices:
+        if 'samantha' in voice.name.lower():
+            engine.setProperty('voice', voice.id)
+            return
+    engine.setProperty('voice', voices[0].id)
+
+def _worker_main(conn, rate: int, volume: float, voice_id: Optional[str]):
+    """Worker process: initialise pyttsx3 once, then speak every request sent over the pipe"""
+    import pyttsx3
+
+    try:
+        engine = pyttsx3.init()
+        _select_voice(engine, voice_id)
+        engine.setProperty('rate', rate)
+        engine.setProperty('volume', volume)
+    except Exception as e:
+        conn.send(("error", f"pyttsx3 init failed: {e}"))
+        return
+
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            command, text = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if command == "stop":
+            break
+        elif command == "ping":
+            conn.send(("pong", None))
+        elif command == "speak":
+            try:
+                engine.say(text)
+                engine.runAndWait()
+                conn.send(("done", None))
+            except Exception as e:
+                conn.send(("error", str(e)))
+
+
+class SystemVoiceWorker:
+    """Long-lived pyttsx3 process fed over a pipe
+
+    pyttsx3 runs in its own process to keep it isolated from the assistant's
+    threads, but the process is started once and reused, so utterances do
+    not pay interpreter startup and engine initialisation each time. The
+    worker is restarted automatically if it crashes or hangs.
+    """
+
+    def __init__(self, rate: int = 180, volume: float = 0.8, voice_id: Optional[str] = None,
+                 timeout: float = 30.0, startup_timeout: float = 15.0, max_start_failures: int = 3):
+        self.rate = rate
+        self.volume = volume
+        self.voice_id = voice_id
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.max_start_failures = max_start_failures
+
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+        self._start_failures = 0
+        self.interrupted = False  # the last request was sent but never answered
+
+    def start(self) -> bool:
+        """Start the worker process if it is not already running"""
+        with self._lock:
+            return self._ensure_started()
+
+    def _ensure_started(self) -> bool:
+        if self._process is not None and self._process.is_alive():
+            return True
+
+        if self._start_failures >= self.max_start_failures:
+            # Stop paying process startup on every utterance if pyttsx3 cannot run here
+            return False
+
+        if self._process is not None:
+            self.restarts += 1
+            logger.warning(f"System TTS worker died, restarting (restart #{self.restarts})")
+            self._cleanup()
+
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.rate, self.volume, self.voice_id),
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        reply = self._receive(self.startup_timeout)
+        if reply is None or reply[0] != "ready":
+            logger.error(f"System TTS worker failed to start: {reply[1] if reply else 'timed out'}")
+            self._cleanup()
+            self._start_failures += 1
+            return False
+
+        self._start_failures = 0
+        logger.info("✅ System TTS worker process started")
+        return True
+
+    def _receive(self, timeout: float):
+        """Wait for a reply from the worker, or None on timeout or broken pipe"""
+        try:
+            if self._conn.poll(timeout):
+                return self._conn.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def _cleanup(self):
+        """Terminate the worker and close the pipe"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                # A worker stuck in the speech engine can ignore SIGTERM
+                self._process.kill()
+                self._process.join(timeout=2)
+        self._conn = None
+        self._process = None
+
+    def _request(self, command: str, text: Optional[str], timeout: float) -> Optional[tuple]:
+        self.interrupted = False
+        if not self._ensure_started():
+            return None
+        try:
+            self._conn.send((command, text))
+        except (BrokenPipeError, OSError):
+            # Worker died between requests; restart once and retry
+            self._cleanup()
+            self.restarts += 1
+            if not self._ensure_started():
+                return None
+            self._conn.send((command, text))
+
+        reply = self._receive(timeout)
+        if reply is None:
+            # Kill the worker before anything else speaks, so a hung utterance
+            # cannot resume over a retry or fallback, then have a fresh one ready
+            logger.error(f"System TTS worker did not answer '{command}', restarting it")
+            self.interrupted = True
+            self._cleanup()
+            self.restarts += 1
+            self._ensure_started()
+        return reply
+
+    def speak(self, text: str) -> bool:
+        """Speak text in the worker process and wait until it has finished"""
+        with self._lock:
+            reply = self._request("speak", text, self.timeout)
+        if reply is None:
+            return False
+        if reply[0] == "error":
+            logger.error(f"System TTS worker error: {reply[1]}")
+            return False
+        return reply[0] == "done"
+
+    def health_check(self, timeout: float = 5.0) -> bool:
+        """Check that the worker process is alive and responsive"""
+        with self._lock:
+            reply = self._request("ping", None, timeout)
+        return reply is not None and reply[0] == "pong"
+
+    def stop(self):
+        """Stop the worker process"""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.send(("stop", None))
+                except OSError:
+                    pass
+            if self._process is not None:
+                self._process.join(timeout=2)
+            self._cleanup()
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def get_xtts_model(tts_api: Any) -> Optional[Any]:
+    """Get the underlying XTTS model from a Coqui TTS API object, if it is one"""
+    synthesizer = getattr(tts_api, 'synthesizer', None)
+    model = getattr(synthesizer, 'tts_model', None)
+    if model is not None and hasattr(model, 'get_conditioning_latents') and hasattr(model, 'inference'):
+        return model
+    return None
+
+
+class SpeakerLatentCache:
+    """Caches XTTS speaker conditioning latents per voice reference file
+
+    Computing the GPT conditioning latent and speaker embedding decodes the
+    reference audio and runs the encoder, which is a large fixed cost per
+    utterance on CPU. Latents are kept in memory keyed by file path and
+    modification time, and optionally persisted as .npz files so they
+    survive restarts.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._latents: Dict[Tuple[str, int], Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _key(self, voice_path: str) -> Tuple[str, int]:
+        path = os.path.abspath(voice_path)
+        return path, os.stat(path).st_mtime_ns
+
+    def _disk_path(self, key: Tuple[str, int]) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        path_hash = hashlib.sha1(key[0].encode()).hexdigest()[:16]
+        return self.cache_dir / f"{path_hash}_{key[1]}.npz"
+
+    def get(self, model: Any, voice_path: str) -> Tuple[Any, Any]:
+        """Get (gpt_cond_latent, speaker_embedding) for a voice file, computing it once"""
+        key = self._key(voice_path)
+
+        with self._lock:
+            latents = self._latents.get(key)
+            if latents is not None:
+                self.stats["hits"] += 1
+                return latents
+
+        latents = self._load_from_disk(key, model)
+        if latents is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            logger.info(f"🎙️ Computing speaker latents for {os.path.basename(key[0])}...")
+            latents = model.get_conditioning_latents(audio_path=[key[0]])
+            self._save_to_disk(key, latents)
+
+        with self._lock:
+            # Drop latents from older versions of the same file
+            for stale_key in [k for k in self._latents if k[0] == key[0]]:
+                del self._latents[stale_key]
+            self._latents[key] = latents
+
+        return latents
+
+    def warm(self, model: Any, voice_paths) -> int:
+        """Precompute latents for every existing voice file, returning how many are cached"""
+        count = 0
+        for voice_path in voice_paths:
+            if not voice_path or not os.path.exists(voice_path):
+                continue
+            try:
+                self.get(model, voice_path)
+                count += 1
+            except Exception as e:
+                logger.warning(f"Could not compute speaker latents for {voice_path}: {e}")
+        return count
+
+    def _load_from_disk(self, key: Tuple[str, int], model: Any) -> Optional[Tuple[Any, Any]]:
+        disk_path = self._disk_path(key)
+        if not disk_path or not disk_path.exists():
+            return None
+
+        try:
+            import torch
+
+            device = next(model.parameters()).device
+            with np.load(disk_path) as data:
+                gpt_cond_latent = torch.from_numpy(data["gpt_cond_latent"]).to(device)
+                speaker_embedding = torch.from_numpy(data["speaker_embedding"]).to(device)
+            return gpt_cond_latent, speaker_embedding
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable speaker latent cache {disk_path}: {e}")
+            return None
+
+    def _save_to_disk(self, key: Tuple[str, int], latents: Tuple[Any, Any]):
+        disk_path = self._disk_path(key)
+        if not disk_path:
+            return
+
+        try:
+            gpt_cond_latent, speaker_embedding = latents
+            np.savez(
+                disk_path,
+                gpt_cond_latent=gpt_cond_latent.detach().cpu().numpy(),
+                speaker_embedding=speaker_embedding.detach().cpu().numpy()
+            )
+        except Exception as e:
+            logger.warning(f"Could not persist speaker latents to {disk_path}: {e}")
+
+    def clear(self):
+        """Clear the in-memory cache"""
+        with self._lock:
+            self._latents.clear()
+
+
+_cache: Optional[SpeakerLatentCache] = None
+_cache_lock = threading.Lock()
+
+def get_speaker_latent_cache(cache_dir: Optional[str] = None) -> SpeakerLatentCache:
+    """Get the process-wide speaker latent cache
+
+    cache_dir only applies when the cache is first created.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SpeakerLatentCache(cache_dir)
+        return _cache
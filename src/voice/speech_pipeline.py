@@ -0,0 +1,137 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SentenceSource:
+    """Thread-safe iterator over the non-blank sentences of a stream
+
+    Remembers every sentence it has handed out, so a caller can find the
+    sentences a failed pipeline took but never spoke, and then keep reading
+    the same stream after the pipeline's worker has let go of it.
+    """
+
+    def __init__(self, sentences: Iterable[str]):
+        self._sentences = iter(sentences)
+        self._lock = threading.Lock()
+        self.taken: List[str] = []
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        with self._lock:
+            while True:
+                sentence = next(self._sentences)
+                if sentence.strip():
+                    self.taken.append(sentence)
+                    return sentence
+
+    def unspoken(self, handled: int) -> Iterator[str]:
+        """Sentences after the first `handled` taken ones, including those not yet read from the stream"""
+        index = handled
+        while True:
+            if index < len(self.taken):
+                yield self.taken[index]
+                index += 1
+                continue
+            try:
+                next(self)
+            except StopIteration:
+                return
+
+
+class SpeechPipeline:
+    """Two-stage synthesis/playback pipeline for sentence-by-sentence speech
+
+    A worker thread synthesises sentence N+1 while the calling thread plays
+    sentence N. The stages are connected by a bounded queue so synthesis
+    never runs more than `queue_size` sentences ahead of playback.
+    """
+
+    _DONE = object()
+
+    def __init__(self, synthesize: Callable[[str], Optional[Any]], play: Callable[[Any], bool],
+                 fallback: Optional[Callable[[str], bool]] = None, queue_size: int = 2):
+        self.synthesize = synthesize
+        self.play = play
+        self.fallback = fallback
+        self.queue_size = max(1, queue_size)
+        self.metrics = {}
+
+    def run(self, sentences: Iterable[str]) -> bool:
+        """Synthesise and play sentences in order, returning True if all were spoken"""
+        audio_queue = queue.Queue(maxsize=self.queue_size)
+        cancelled = threading.Event()
+        start_time = time.time()
+        self.metrics = {
+            "sentences": 0,
+            "handled": 0,  # sentences played, spoken by the fallback, or given up on
+            "failed": 0,
+            "first_audio_time": None,
+            "total_time": None
+        }
+
+        def put(item) -> bool:
+            # Bounded put that gives up if playback has stopped
+            while not cancelled.is_set():
+                try:
+                    audio_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def synthesis_worker():
+            try:
+                for sentence in sentences:
+                    if cancelled.is_set():
+                        break
+                    if not sentence.strip():
+                        continue
+                    try:
+                        audio = self.synthesize(sentence)
+                    except Exception as e:
+                        logger.error(f"Synthesis failed for sentence: {e}")
+                        audio = None
+                    if not put((sentence, audio)):
+                        break
+            except Exception as e:
+                # The sentence source itself (e.g. a streaming LLM) failed
+                logger.error(f"Sentence source failed: {e}")
+            finally:
+                put(self._DONE)
+
+        worker = threading.Thread(target=synthesis_worker, daemon=True)
+        worker.start()
+
+        success = True
+        try:
+            while True:
+                item = audio_queue.get()
+                if item is self._DONE:
+                    break
+
+                sentence, audio = item
+                self.metrics["sentences"] += 1
+                if self.metrics["first_audio_time"] is None:
+                    self.metrics["first_audio_time"] = time.time() - start_time
+                    logger.info(f"⏱️ First audio after {self.metrics['first_audio_time']:.2f}s")
+
+                if audio is not None and self.play(audio):
+                    self.metrics["handled"] += 1
+                    continue
+
+                self.metrics["failed"] += 1
+                if not (self.fallback and self.fallback(sentence)):
+                    success = False
+                self.metrics["handled"] += 1
+        finally:
+            cancelled.set()
+            worker.join(timeout=1.0)
+            self.metrics["total_time"] = time.time() - start_time
+
+        return success and self.metrics["sentences"] > 0
@@ -1,11 +1,22 @@
 import pyttsx3
 import os
-import tempfile
+import sys
 import pygame
 import logging
-from typing import Optional
+from typing import Callable, Iterable, Optional, Tuple
 import threading
 import time
+import numpy as np
+from .audio_playback import output_sample_rate, play_waveform
+from .speech_pipeline import SentenceSource, SpeechPipeline
+from .phrase_cache import get_phrase_audio_cache
+from .pyttsx3_worker import SystemVoiceWorker
+from .speaker_latents import get_speaker_latent_cache, get_xtts_model
+from ..llm.streaming import split_sentences
+
+# Add parent directory to path to access root config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import config
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +26,11 @@ class TextToSpeech:
     def __init__(self, voice_preference: str = "coqui"):
         self.voice_preference = voice_preference
         self.tts_engine = None
+        self.system_voice = None
         self.coqui_tts = None
+        self.coqui_model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
+        self.speaker_latents = None
+        self.phrase_cache = None
         self._lock = threading.Lock()
         
         # Initialize audio system once
@@ -25,6 +40,9 @@ class TextToSpeech:
         # Initialize TTS engines based on preference
         if voice_preference == "coqui":
             self._init_coqui_tts()
+            if self.coqui_tts:
+                self._init_speaker_latents()
+                self._init_phrase_cache()
             # Fallback to system TTS if Coqui fails
             if not self.coqui_tts:
                 logger.warning("Coqui TTS failed, initializing system TTS fallback")
@@ -61,7 +79,7 @@ class TextToSpeech:
             torch.load = patched_load
             
             logger.info("🚀 Loading Coqui XTTS v2 model...")
-            self.coqui_tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
+            self.coqui_tts = TTS(self.coqui_model_name)
             
             # Restore original torch.load
             torch.load = original_load
@@ -87,16 +105,38 @@ class TextToSpeech:
             logger.info("Will fall back to system TTS")
             self.coqui_tts = None
     
+    def _init_speaker_latents(self):
+        """Precompute XTTS speaker latents for the configured voices"""
+        model = get_xtts_model(self.coqui_tts)
+        if model is None:
+            return
+        
+        try:
+            self.speaker_latents = get_speaker_latent_cache(getattr(config, 'SPEAKER_LATENT_CACHE_DIR', None))
+            voice_paths = [
+                getattr(config, 'K2SO_VOICE_PATH', None),
+                getattr(config, 'GEORGE_VOICE_PATH', None),
+                getattr(config, 'DEFAULT_VOICE_PATH', None)
+            ]
+            count = self.speaker_latents.warm(model, voice_paths)
+            logger.info(f"✅ Speaker latents ready for {count} voice(s)")
+        except Exception as e:
+            logger.warning(f"Speaker latent precomputation failed: {e}")
+    
+    def _init_phrase_cache(self):
+        """Set up the synthesised phrase cache for repeated responses"""
+        try:
+            self.phrase_cache = get_phrase_audio_cache(
+                getattr(config, 'PHRASE_CACHE_DIR', None),
+                max_entries=getattr(config, 'PHRASE_CACHE_SIZE', 128)
+            )
+        except Exception as e:
+            logger.warning(f"Phrase cache unavailable: {e}")
+            self.phrase_cache = None
+    
     def _init_pyttsx3(self):
         """Initialize pyttsx3 as fallback"""
         try:
-            import sys
-            import os
-            
-            # Add parent directory to path to access root config
-            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            import config
-            
             self.tts_engine = pyttsx3.init()
             
             # Configure voice settings - prioritize specific voice from config
@@ -139,6 +179,15 @@ class TextToSpeech:
             self.tts_engine.setProperty('rate', 180)
             self.tts_engine.setProperty('volume', 0.8)
             
+            # Speech itself runs in a long-lived worker process using the same voice;
+            # start it in the background so it is warm before the first reply
+            self.system_voice = SystemVoiceWorker(
+                rate=180,
+                volume=0.8,
+                voice_id=self.tts_engine.getProperty('voice')
+            )
+            threading.Thread(target=self.system_voice.start, daemon=True).start()
+            
             logger.info("✅ System TTS (pyttsx3) initialized")
             
         except Exception as e:
@@ -156,218 +205,255 @@ class TextToSpeech:
             return False
         
         with self._lock:
-            logger.info(f"🗣️ Speaking with {self.voice_preference} TTS: {text[:50]}...")
-            
-            # Use Coqui TTS if available and preferred
+            return self._speak_text(text, audio_prompt_path)
+    
+    def speak_stream(self, sentences: Iterable[str], audio_prompt_path: Optional[str] = None) -> bool:
+        """Speak sentences as they arrive, e.g. from a streaming LLM response
+        
+        Each sentence is spoken as soon as it is yielded, so playback of the
+        first sentence starts while later ones are still being generated.
+        
+        Args:
+            sentences: Iterable (typically a generator) of sentences to speak
+            audio_prompt_path: Optional path to audio file for voice cloning
+        """
+        success = True
+        spoke_anything = False
+        
+        with self._lock:
             if self.voice_preference == "coqui" and self.coqui_tts:
-                success = self._speak_coqui(text, audio_prompt_path)
-                if success:
-                    logger.info("✅ Coqui TTS completed successfully")
-                    return True
-                else:
-                    logger.error("❌ Coqui TTS failed completely")
-                    # Only fallback on complete failure
-                    if self.tts_engine:
-                        logger.warning("🔄 Falling back to system TTS due to Coqui failure")
-                        return self._speak_pyttsx3(text)
-                    return False
+                # Synthesis of each sentence overlaps playback of the previous one
+                return self._speak_coqui_with_fallback(sentences, audio_prompt_path)
             
-            # For system preference or if Coqui not available
-            elif self.tts_engine:
-                success = self._speak_pyttsx3(text)
-                if success:
-                    logger.info("✅ System TTS completed successfully")
-                    return True
-                else:
-                    logger.error("❌ System TTS failed")
-                    return False
+            for sentence in sentences:
+                if not sentence.strip():
+                    continue
+                spoke_anything = True
+                if not self._speak_text(sentence, audio_prompt_path):
+                    success = False
+        
+        return success and spoke_anything
+    
+    def _speak_text(self, text: str, audio_prompt_path: Optional[str] = None) -> bool:
+        """Speak text with the preferred engine; caller must hold self._lock"""
+        logger.info(f"🗣️ Speaking with {self.voice_preference} TTS: {text[:50]}...")
+        
+        # Use Coqui TTS if available and preferred
+        if self.voice_preference == "coqui" and self.coqui_tts:
+            return self._speak_coqui_with_fallback(split_sentences(text), audio_prompt_path)
+        
+        # For system preference or if Coqui not available
+        elif self.tts_engine:
+            success = self._speak_pyttsx3(text)
+            if success:
+                logger.info("✅ System TTS completed successfully")
+                return True
             else:
-                logger.error("❌ No TTS engine available")
+                logger.error("❌ System TTS failed")
                 return False
+        else:
+            logger.error("❌ No TTS engine available")
+            return False
     
-    def _speak_coqui(self, text: str, audio_prompt_path: Optional[str] = None) -> bool:
-        """Speak using Coqui TTS"""
+    def _speak_coqui_with_fallback(self, sentences: Iterable[str], audio_prompt_path: Optional[str] = None) -> bool:
+        """Speak sentences with Coqui, handing any it could not speak to the system voice
+        
+        Sentences that fail to synthesise fall back one at a time inside the
+        pipeline. If the pipeline itself fails, the sentences it took but
+        never reached and the rest of the stream are spoken by the system voice.
+        """
+        fallback = self._speak_pyttsx3 if self.tts_engine else None
+        source = SentenceSource(sentences)
+        success, handled = self._speak_coqui_sentences(source, audio_prompt_path, fallback=fallback)
+        if success:
+            logger.info("✅ Coqui TTS completed successfully")
+            return True
+        
+        logger.error("❌ Coqui TTS failed")
+        if not self.tts_engine:
+            return False
+        
+        spoke_anything = False
+        all_spoken = True
         try:
-            import sys
-            import os
-            
-            # Add parent directory to path to access root config
-            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            import config
-            
-            # Create temporary file for audio
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            # Generate speech with Coqui TTS
-            logger.debug(f"Generating Coqui speech...")
-            
-            # Get voice path from config if no specific path provided
-            if not audio_prompt_path:
-                # Priority order: K2-SO voice -> George voice -> Default voice -> None
-                if hasattr(config, 'K2SO_VOICE_PATH') and getattr(config, 'USE_K2SO_VOICE', False):
-                    audio_prompt_path = config.K2SO_VOICE_PATH
-                    logger.debug("Using K2-SO voice from config")
-                elif hasattr(config, 'GEORGE_VOICE_PATH') and getattr(config, 'USE_GEORGE_VOICE', False):
-                    audio_prompt_path = config.GEORGE_VOICE_PATH
-                    logger.debug("Using George voice from config")
-                else:
-                    audio_prompt_path = getattr(config, 'DEFAULT_VOICE_PATH', None)
-                    logger.debug("Using default voice path")
+            for sentence in source.unspoken(handled):
+                if not spoke_anything:
+                    logger.warning("🔄 Falling back to system TTS for the unspoken sentences")
+                spoke_anything = True
+                if not self._speak_pyttsx3(sentence):
+                    all_spoken = False
+        except Exception as e:
+            logger.error(f"Sentence source failed during fallback: {e}")
+            all_spoken = False
+        return spoke_anything and all_spoken
+    
+    def _speak_coqui_sentences(self, sentences: Iterable[str], audio_prompt_path: Optional[str] = None,
+                               fallback: Optional[Callable[[str], bool]] = None) -> Tuple[bool, int]:
+        """Synthesise sentence N+1 on a worker thread while sentence N plays
+        
+        Returns whether every sentence was spoken, and how many sentences were
+        played or handed to the fallback.
+        """
+        pipeline = None
+        try:
+            audio_prompt_path = self._resolve_voice_path(audio_prompt_path)
             
             # Coqui XTTS requires a speaker voice for cloning
             if not audio_prompt_path or not os.path.exists(audio_prompt_path):
                 logger.error("Coqui XTTS requires a speaker voice file")
-                return False
-            
-            # Generate audio with voice cloning
-            self.coqui_tts.tts_to_file(
-                text=text,
-                speaker_wav=audio_prompt_path,
-                language="en",
-                file_path=temp_path,
-                speed=1.0
-            )
+                return False, 0
             
             logger.debug(f"Voice cloning from: {audio_prompt_path}")
             
+            # Synthesised audio is only written to disk when debugging
+            dump_dir = getattr(config, 'TTS_DEBUG_DUMP_DIR', None)
+            
             # Stop any previous audio before playing new
-            if pygame.mixer.music.get_busy():
+            if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
                 pygame.mixer.music.stop()
                 time.sleep(0.1)
             
-            # Play the generated audio
-            pygame.mixer.music.load(temp_path)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to complete
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+            pipeline = SpeechPipeline(
+                synthesize=lambda sentence: self._synthesize_coqui(sentence, audio_prompt_path),
+                play=lambda wav: self._play_waveform(wav, dump_dir),
+                fallback=fallback,
+                queue_size=getattr(config, 'TTS_PIPELINE_QUEUE_SIZE', 2)
+            )
+            success = pipeline.run(sentences)
             
-            # Clean up
-            os.unlink(temp_path)
-            logger.debug("Coqui speech completed")
-            return True
+            logger.debug(f"Coqui speech completed: {pipeline.metrics}")
+            return success, pipeline.metrics.get("handled", 0)
             
         except Exception as e:
             logger.error(f"Coqui TTS error: {e}")
-            # Clean up temp file if it exists
-            try:
-                if 'temp_path' in locals():
-                    os.unlink(temp_path)
-            except:
-                pass
-            return False
+            return False, pipeline.metrics.get("handled", 0) if pipeline is not None else 0
+    
+    def _resolve_voice_path(self, audio_prompt_path: Optional[str] = None) -> Optional[str]:
+        """Get the voice cloning reference file, falling back to the configured voices"""
+        if audio_prompt_path:
+            return audio_prompt_path
+        
+        # Priority order: K2-SO voice -> George voice -> Default voice -> None
+        if hasattr(config, 'K2SO_VOICE_PATH') and getattr(config, 'USE_K2SO_VOICE', False):
+            logger.debug("Using K2-SO voice from config")
+            return config.K2SO_VOICE_PATH
+        elif hasattr(config, 'GEORGE_VOICE_PATH') and getattr(config, 'USE_GEORGE_VOICE', False):
+            logger.debug("Using George voice from config")
+            return config.GEORGE_VOICE_PATH
+        else:
+            logger.debug("Using default voice path")
+            return getattr(config, 'DEFAULT_VOICE_PATH', None)
+    
+    def _synthesize_coqui(self, text: str, audio_prompt_path: str) -> Optional[np.ndarray]:
+        """Synthesise one sentence to an in-memory waveform, reusing cached phrases"""
+        cache_key = None
+        if self.phrase_cache is not None:
+            cache_key = self.phrase_cache.make_key(text, audio_prompt_path, 1.0, f"coqui:{self.coqui_model_name}")
+            cached = self.phrase_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Phrase cache hit: {text[:50]}")
+                return cached[0]
+        
+        wav = self._generate_coqui(text, audio_prompt_path)
+        
+        if cache_key is not None:
+            self.phrase_cache.put(cache_key, wav, output_sample_rate(self.coqui_tts))
+        return wav
+    
+    def _generate_coqui(self, text: str, audio_prompt_path: str) -> np.ndarray:
+        """Run Coqui synthesis for one sentence"""
+        logger.debug(f"Generating Coqui speech: {text[:50]}...")
+        
+        # Reuse cached conditioning latents instead of re-encoding the reference audio
+        model = get_xtts_model(self.coqui_tts)
+        if model is not None and self.speaker_latents is not None:
+            gpt_cond_latent, speaker_embedding = self.speaker_latents.get(model, audio_prompt_path)
+            output = model.inference(text, "en", gpt_cond_latent, speaker_embedding,
+                                     speed=1.0, enable_text_splitting=True)
+            return np.asarray(output["wav"], dtype=np.float32)
+        
+        wav = self.coqui_tts.tts(
+            text=text,
+            speaker_wav=audio_prompt_path,
+            language="en",
+            speed=1.0
+        )
+        return np.asarray(wav, dtype=np.float32)
+    
+    def _play_waveform(self, wav: np.ndarray, dump_dir: Optional[str] = None) -> bool:
+        """Play a synthesised waveform straight from memory (no temp file)"""
+        return play_waveform(wav, output_sample_rate(self.coqui_tts), dump_dir=dump_dir)
     
     def _speak_pyttsx3(self, text: str) -> bool:
-        """Speak using pyttsx3 via subprocess to avoid threading issues"""
+        """Speak using pyttsx3 in the persistent worker process to avoid threading issues"""
         try:
             if not self.tts_engine:
                 logger.error("No system TTS engine available")
                 return False
             
-            logger.debug(f"Speaking with system TTS via subprocess...")
+            logger.debug(f"Speaking with system TTS worker...")
             
             # Stop any pygame audio before using pyttsx3
             if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
                 pygame.mixer.music.stop()
                 time.sleep(0.1)
             
-            # Use subprocess to completely isolate pyttsx3 from threading issues
+            if self.system_voice and self.system_voice.speak(text):
+                logger.debug("System TTS worker completed successfully")
+                return True
+            
+            if self.system_voice and self.system_voice.interrupted:
+                # The worker may have spoken some or all of the text before it hung
+                logger.error("System TTS worker timed out; not repeating the utterance")
+                return False
+            
+            # Fallback to the in-process engine as last resort
             try:
-                import subprocess
-                import sys
-                import os
-                
-                # Create a standalone script to run TTS
-                script_content = f'''
-import pyttsx3
-import sys
-
-def speak_text(text):
-    try:
-        engine = pyttsx3.init()
-        
-        # Configure voice settings
-        voices = engine.getProperty('voices')
-        if voices:
-            # Use Samantha or first available voice
-            for voice in voices:
-                if 'samantha' in voice.name.lower():
-                    engine.setProperty('voice', voice.id)
-                    break
-            else:
-                engine.setProperty('voice', voices[0].id)
-        
-        engine.setProperty('rate', 180)
-        engine.setProperty('volume', 0.8)
-        
-        # Speak the text
-        engine.say(text)
-        engine.runAndWait()
-        return True
-        
-    except Exception as e:
-        print(f"TTS Error: {{e}}", file=sys.stderr)
-        return False
-
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        text = " ".join(sys.argv[1:])
-        success = speak_text(text)
-        sys.exit(0 if success else 1)
-'''
-                
-                # Write the script to a temporary file
-                import tempfile
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                    f.write(script_content)
-                    script_path = f.name
-                
-                try:
-                    # Run TTS in a separate process with timeout
-                    result = subprocess.run(
-                        [sys.executable, script_path, text],
-                        timeout=30,  # 30 second timeout
-                        capture_output=True,
-                        text=True
-                    )
-                    
-                    if result.returncode == 0:
-                        logger.debug("Subprocess TTS completed successfully")
-                        return True
-                    else:
-                        logger.error(f"Subprocess TTS failed: {result.stderr}")
-                        return False
-                        
-                finally:
-                    # Clean up the temporary script
-                    try:
-                        os.unlink(script_path)
-                    except:
-                        pass
-                        
-            except subprocess.TimeoutExpired:
-                logger.error("TTS subprocess timed out")
+                logger.info("Attempting direct TTS as fallback...")
+                self.tts_engine.say(text)
+                self.tts_engine.runAndWait()
+                logger.debug("Direct TTS fallback succeeded")
+                return True
+            except Exception as fallback_error:
+                logger.error(f"All TTS approaches failed: {fallback_error}")
                 return False
-            except Exception as subprocess_error:
-                logger.warning(f"Subprocess TTS failed: {subprocess_error}")
-                
-                # Fallback to the original approach as last resort
-                try:
-                    logger.info("Attempting direct TTS as fallback...")
-                    self.tts_engine.say(text)
-                    self.tts_engine.runAndWait()
-                    logger.debug("Direct TTS fallback succeeded")
-                    return True
-                except Exception as fallback_error:
-                    logger.error(f"All TTS approaches failed: {fallback_error}")
-                    return False
                     
         except Exception as e:
             logger.error(f"System TTS error: {e}")
             return False
     
+    def prewarm_phrases(self, phrases: Iterable[str], audio_prompt_path: Optional[str] = None) -> int:
+        """Synthesise canned phrases into the phrase cache ahead of time
+        
+        Returns the number of sentences that had to be synthesised.
+        """
+        if not (self.coqui_tts and self.phrase_cache is not None):
+            return 0
+        
+        audio_prompt_path = self._resolve_voice_path(audio_prompt_path)
+        if not audio_prompt_path or not os.path.exists(audio_prompt_path):
+            return 0
+        
+        engine = f"coqui:{self.coqui_model_name}"
+        synthesised = 0
+        for phrase in phrases:
+            for sentence in split_sentences(phrase):
+                cache_key = self.phrase_cache.make_key(sentence, audio_prompt_path, 1.0, engine)
+                if self.phrase_cache.get(cache_key) is not None:
+                    continue
+                # Hold the lock per sentence so live speech is never blocked for long
+                with self._lock:
+                    try:
+                        wav = self._generate_coqui(sentence, audio_prompt_path)
+                    except Exception as e:
+                        logger.warning(f"Could not pre-warm phrase '{sentence}': {e}")
+                        continue
+                self.phrase_cache.put(cache_key, wav, output_sample_rate(self.coqui_tts), persist=True)
+                synthesised += 1
+        
+        logger.info(f"✅ Phrase cache warmed ({synthesised} new sentence(s) synthesised)")
+        return synthesised
+    
     def set_voice_preference(self, preference: str):
         """Set voice preference: 'coqui' or 'system'"""
         self.voice_preference = preference
@@ -400,7 +486,7 @@ if __name__ == "__main__":
         
         if self.coqui_tts:
             logger.info("🎤 Testing Coqui TTS...")
-            success = self._speak_coqui(text)
+            success, _ = self._speak_coqui_sentences(split_sentences(text))
             if success:
                 logger.info("✅ Coqui TTS working!")
                 return True
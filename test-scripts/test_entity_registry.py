@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for room lookups in the Home Assistant entity registry
+Runs entirely in memory; no Home Assistant required
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from integrations.entity_registry import EntityRegistry
+
+def entity(entity_id, name=None):
+    attributes = {"friendly_name": name} if name else {}
+    return {"entity_id": entity_id, "state": "off", "attributes": attributes}
+
+def ids(states):
+    return [state["entity_id"] for state in states]
+
+def test_multi_word_rooms():
+    """Multi-word rooms match ids and friendly names however the room is written"""
+    registry = EntityRegistry()
+    registry.load([
+        entity("light.living_room_lamp"),
+        entity("light.lounge_main", "Living Room Main"),
+        entity("light.dining_room", "Dining Room"),
+        entity("switch.living_room_fan"),
+    ])
+    expected = ["light.living_room_lamp", "light.lounge_main"]
+    for room in ("living room", "Living Room", "living_room"):
+        assert ids(registry.entities_in_room("light", room)) == expected, room
+    assert registry.entities_in_room("light", "livingroom") == [], "unseparated words matched"
+    assert ids(registry.entities_in_room("switch", "living room")) == ["switch.living_room_fan"]
+
+def test_numeric_suffixes():
+    """Numbered entities belong to their room, and only whole words match"""
+    registry = EntityRegistry()
+    registry.load([
+        entity("light.bedroom2"),
+        entity("light.bedroom_3"),
+        entity("light.guest", "Bedroom 4"),
+        entity("light.master_bedroom_2"),
+        entity("light.bed_lamp"),
+    ])
+    assert ids(registry.entities_in_room("light", "bedroom")) == \
+        ["light.bedroom2", "light.bedroom_3", "light.guest", "light.master_bedroom_2"]
+    assert ids(registry.entities_in_room("light", "bedroom 2")) == ["light.bedroom2", "light.master_bedroom_2"]
+    assert ids(registry.entities_in_room("light", "bedroom2")) == ["light.bedroom2", "light.master_bedroom_2"]
+    assert ids(registry.entities_in_room("light", "master bedroom")) == ["light.master_bedroom_2"]
+    assert ids(registry.entities_in_room("light", "bed")) == ["light.bed_lamp"], "partial word matched"
+
+def test_ttl_and_invalidate():
+    """The index goes stale after its TTL or when invalidated"""
+    registry = EntityRegistry(ttl=0.05)
+    assert registry.is_stale(), "empty registry not stale"
+    registry.load([entity("light.kitchen")])
+    assert not registry.is_stale()
+    time.sleep(0.1)
+    assert registry.is_stale(), "TTL ignored"
+    registry.load([entity("light.kitchen")])
+    registry.invalidate()
+    assert registry.is_stale(), "invalidate ignored"
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("🗂️ Entity Registry Tests")
+    print("=" * 50)
+    tests = [
+        test_multi_word_rooms,
+        test_numeric_suffixes,
+        test_ttl_and_invalidate,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
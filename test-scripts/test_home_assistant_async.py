@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled async Home Assistant client
+Runs against a stand-in REST server on localhost; no Home Assistant required
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from aiohttp import web
+
+from integrations.home_assistant_async import AsyncHomeAssistantClient, ServiceCallBatcher
+
+TOKEN = "test-token"
+
+def light(entity_id, name):
+    return {"entity_id": entity_id, "state": "off", "attributes": {"friendly_name": name}}
+
+STATES = [
+    light("light.kitchen_ceiling", "Kitchen Ceiling"),
+    light("light.kitchen_counter", "Kitchen Counter"),
+    light("light.bedroom_lamp", "Bedroom Lamp"),
+]
+
+class FakeHomeAssistant:
+    """Answers the REST calls the client makes and records every service call"""
+
+    def __init__(self, states, delay=0.0):
+        self.states = list(states)
+        self.delay = delay
+        self.service_calls = []
+        self.peers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.loop = None
+        self.port = None
+        self._ready = threading.Event()
+        self._runner = None
+
+    @web.middleware
+    async def track(self, request, handler):
+        if request.headers.get("Authorization") != f"Bearer {TOKEN}":
+            return web.json_response({"message": "Unauthorized"}, status=401)
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Read the body first so a client that gives up doesn't break the handler
+            await request.read()
+            await asyncio.sleep(self.delay)
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def api(self, request):
+        return web.json_response({"message": "API running."})
+
+    async def states_dump(self, request):
+        return web.json_response(self.states)
+
+    async def entity_state(self, request):
+        for state in self.states:
+            if state["entity_id"] == request.match_info["entity_id"]:
+                return web.json_response(state)
+        return web.json_response({"message": "Entity not found."}, status=404)
+
+    async def service(self, request):
+        body = await request.json()
+        self.service_calls.append((request.match_info["domain"], request.match_info["service"], body))
+        return web.json_response([])
+
+    def start(self):
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self._start())
+            self._ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    async def _start(self):
+        app = web.Application(middlewares=[self.track])
+        app.router.add_get("/api/", self.api)
+        app.router.add_get("/api/states", self.states_dump)
+        app.router.add_get("/api/states/{entity_id}", self.entity_state)
+        app.router.add_post("/api/services/{domain}/{service}", self.service)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def called_entities(self, service):
+        """Every entity a service was called on, whether sent alone or in a list"""
+        entities = []
+        for _, called, body in self.service_calls:
+            if called == service:
+                entity_id = body.get("entity_id")
+                entities.extend([entity_id] if isinstance(entity_id, str) else entity_id)
+        return entities
+
+def with_client(server, work, **kwargs):
+    """Run work(client) on a fresh event loop and close the client's session afterwards"""
+    async def main():
+        client = AsyncHomeAssistantClient(f"http://127.0.0.1:{server.port}", TOKEN, **kwargs)
+        try:
+            return await work(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def test_room_lights():
+    """Room commands reach every light in the room and nothing else"""
+    server = FakeHomeAssistant(STATES).start()
+    try:
+        assert with_client(server, lambda client: client.turn_off_room_lights("kitchen"))
+        assert sorted(server.called_entities("turn_off")) == ["light.kitchen_ceiling", "light.kitchen_counter"], \
+            server.service_calls
+        assert not with_client(server, lambda client: client.turn_off_room_lights("garage")), "empty room succeeded"
+    finally:
+        server.stop()
+
+def test_connection_reused():
+    """Sequential calls on one loop reuse a single pooled connection"""
+    server = FakeHomeAssistant(STATES).start()
+
+    async def work(client):
+        return [await client.get_entity_state("light.bedroom_lamp") for _ in range(5)]
+
+    try:
+        states = with_client(server, work)
+        assert all(state["entity_id"] == "light.bedroom_lamp" for state in states), states
+        assert len(server.peers) == 1, f"{len(server.peers)} connections opened"
+    finally:
+        server.stop()
+
+def test_concurrency_cap():
+    """No more than max_concurrency requests are in flight at once"""
+    server = FakeHomeAssistant(STATES, delay=0.05).start()
+
+    async def work(client):
+        return await asyncio.gather(*[client.get_entity_state("light.bedroom_lamp") for _ in range(6)])
+
+    try:
+        assert all(with_client(server, work, max_concurrency=2))
+        assert server.max_in_flight == 2, f"{server.max_in_flight} requests in flight"
+    finally:
+        server.stop()
+
+def test_stalled_server_times_out():
+    """A stalled server makes the call fail after its timeout instead of hanging"""
+    server = FakeHomeAssistant(STATES, delay=1.0).start()
+    try:
+        start = time.monotonic()
+        assert not with_client(server, lambda client: client.turn_on_light("light.bedroom_lamp"), timeout=0.2)
+        elapsed = time.monotonic() - start
+        assert elapsed < 0.8, f"took {elapsed:.2f}s"
+    finally:
+        server.stop()
+
+def test_batcher_coalesces():
+    """Concurrent calls with the same service and data become one multi-entity request"""
+    sent = []
+
+    async def send(domain, service, entity_ids, service_data):
+        sent.append((service, list(entity_ids), service_data))
+        return True
+
+    async def work():
+        batcher = ServiceCallBatcher(send, window=0.02)
+        results = await asyncio.gather(
+            batcher.call("light", "turn_on", ["light.kitchen_ceiling"], {"brightness": 128}),
+            batcher.call("light", "turn_on", ["light.kitchen_counter", "light.kitchen_ceiling"], {"brightness": 128}),
+            batcher.call("light", "turn_on", ["light.bedroom_lamp"], {"brightness": 255}),
+            batcher.call("light", "turn_off", ["light.hallway"], {}),
+        )
+        return results, batcher.stats
+
+    results, stats = asyncio.run(work())
+    assert all(results), results
+    assert sorted(sent, key=str) == sorted([
+        ("turn_on", ["light.kitchen_ceiling", "light.kitchen_counter"], {"brightness": 128}),
+        ("turn_on", ["light.bedroom_lamp"], {"brightness": 255}),
+        ("turn_off", ["light.hallway"], {}),
+    ], key=str), sent
+    assert stats == {"calls": 4, "requests": 3, "entities": 4}, stats
+
+def test_batch_failure_reaches_every_caller():
+    """A failed batched request fails every call that joined it"""
+    async def send(domain, service, entity_ids, service_data):
+        raise RuntimeError("Home Assistant unavailable")
+
+    async def work():
+        batcher = ServiceCallBatcher(send, window=0.01)
+        return await asyncio.gather(*[batcher.call("light", "turn_off", [f"light.lamp_{i}"], {}) for i in range(3)])
+
+    assert asyncio.run(work()) == [False, False, False]
+
+def test_room_tasks_share_request():
+    """Room commands issued together reach the server as one request per service"""
+    server = FakeHomeAssistant(STATES).start()
+
+    async def work(client):
+        return await asyncio.gather(
+            client.turn_on_room_lights("kitchen", 200),
+            client.turn_on_room_lights("bedroom", 200),
+        )
+
+    try:
+        assert all(with_client(server, work))
+        assert len(server.service_calls) == 1, server.service_calls
+        assert sorted(server.called_entities("turn_on")) == \
+            ["light.bedroom_lamp", "light.kitchen_ceiling", "light.kitchen_counter"]
+
+        server.service_calls.clear()
+        assert all(with_client(server, work, batch_window=0))
+        assert len(server.service_calls) == 2, "batch_window=0 still batched"
+    finally:
+        server.stop()
+
+def test_close_sends_queued_calls():
+    """Closing the client sends calls still waiting in a batch window instead of dropping them"""
+    server = FakeHomeAssistant(STATES).start()
+
+    async def work(client):
+        call = asyncio.ensure_future(client.turn_off_light("light.bedroom_lamp"))
+        await asyncio.sleep(0.05)
+        assert not server.service_calls, "sent before the batch window ended"
+        await client.close()
+        return await call
+
+    try:
+        start = time.monotonic()
+        assert with_client(server, work, batch_window=5)
+        elapsed = time.monotonic() - start
+        assert server.called_entities("turn_off") == ["light.bedroom_lamp"], server.service_calls
+        assert elapsed < 1, f"took {elapsed:.2f}s"
+    finally:
+        server.stop()
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("🏠 Async Home Assistant Client Tests")
+    print("=" * 50)
+    tests = [
+        test_room_lights,
+        test_connection_reused,
+        test_concurrency_cap,
+        test_stalled_server_times_out,
+        test_batcher_coalesces,
+        test_batch_failure_reaches_every_caller,
+        test_room_tasks_share_request,
+        test_close_sends_queued_calls,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test script for the Home Assistant WebSocket event stream
+Runs against a stand-in WebSocket server on localhost; no Home Assistant required
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from aiohttp import web
+
+from integrations.entity_registry import EntityRegistry
+from integrations.home_assistant_events import HomeAssistantEventStream
+
+TOKEN = "test-token"
+
+def light(entity_id, state, name):
+    return {"entity_id": entity_id, "state": state, "attributes": {"friendly_name": name}}
+
+class FakeHomeAssistant:
+    """Speaks just enough of the Home Assistant WebSocket API for the event stream"""
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.sockets = []
+        self.connections = 0
+        self.loop = None
+        self.port = None
+        self._ready = threading.Event()
+        self._runner = None
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+
+        await ws.send_json({"type": "auth_required"})
+        auth = await ws.receive_json()
+        if auth.get("access_token") != TOKEN:
+            await ws.send_json({"type": "auth_invalid", "message": "Invalid access token"})
+            await ws.close()
+            return ws
+        await ws.send_json({"type": "auth_ok"})
+
+        self.sockets.append(ws)
+        async for message in ws:
+            command = message.json()
+            result = list(self.states) if command["type"] == "get_states" else None
+            await ws.send_json({"id": command["id"], "type": "result", "success": True, "result": result})
+        self.sockets.remove(ws)
+        return ws
+
+    def start(self):
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self._start())
+            self._ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/api/websocket", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(5)
+
+    def state_changed(self, entity_id, new_state):
+        """Push a state_changed event to every subscribed client"""
+        async def send():
+            for ws in list(self.sockets):
+                await ws.send_json({"type": "event", "event": {
+                    "event_type": "state_changed",
+                    "data": {"entity_id": entity_id, "new_state": new_state}
+                }})
+        self.call(send())
+
+    def drop_connections(self):
+        async def close():
+            for ws in list(self.sockets):
+                await ws.close()
+        self.call(close())
+
+    def stop(self):
+        self.call(self._runner.cleanup())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_events_update_registry():
+    """Syncs the full state dump, then applies state_changed events without polling"""
+    server = FakeHomeAssistant([light("light.kitchen", "off", "Kitchen Light")]).start()
+    registry = EntityRegistry(ttl=0.0)
+    stream = HomeAssistantEventStream(f"http://127.0.0.1:{server.port}", TOKEN, registry).start()
+    try:
+        assert stream.wait_connected(5), "never connected"
+        assert registry.live and not registry.is_stale(), "registry not marked live"
+        assert registry.get("light.kitchen")["state"] == "off"
+
+        server.state_changed("light.kitchen", light("light.kitchen", "on", "Kitchen Light"))
+        assert wait_for(lambda: registry.get("light.kitchen")["state"] == "on"), "state change not applied"
+
+        server.state_changed("light.porch", light("light.porch", "on", "Porch Light"))
+        assert wait_for(lambda: registry.entities_in_room("light", "porch")), "new entity not indexed"
+
+        server.state_changed("light.porch", None)
+        assert wait_for(lambda: registry.get("light.porch") is None), "removed entity still cached"
+        assert registry.stats["refreshes"] == 1, "registry was reloaded instead of updated"
+    finally:
+        stream.stop()
+        server.stop()
+
+def test_reconnect_resyncs():
+    """A dropped connection reconnects and resyncs changes made while it was down"""
+    server = FakeHomeAssistant([light("light.kitchen", "off", "Kitchen Light")]).start()
+    registry = EntityRegistry(ttl=60.0)
+    stream = HomeAssistantEventStream(f"http://127.0.0.1:{server.port}", TOKEN, registry,
+                                      reconnect_delay=0.1).start()
+    try:
+        assert stream.wait_connected(5), "never connected"
+
+        # Changes made while disconnected must be picked up by the resync
+        server.states = [light("light.kitchen", "on", "Kitchen Light")]
+        server.drop_connections()
+        assert wait_for(lambda: stream.stats["reconnects"] >= 1), "disconnect not noticed"
+        assert wait_for(lambda: stream.connected), "did not reconnect"
+        assert registry.get("light.kitchen")["state"] == "on", "state not resynced"
+        assert stream.stats["resyncs"] == 2 and server.connections == 2, stream.stats
+    finally:
+        stream.stop()
+        server.stop()
+
+def test_bad_token_stops():
+    """An invalid token is not retried"""
+    server = FakeHomeAssistant([]).start()
+    registry = EntityRegistry()
+    stream = HomeAssistantEventStream(f"http://127.0.0.1:{server.port}", "wrong-token", registry,
+                                      reconnect_delay=0.05)
+    try:
+        asyncio.run(asyncio.wait_for(stream.run(), timeout=5))
+        assert server.connections == 1, f"retried {server.connections - 1} times"
+        assert not registry.live
+    finally:
+        server.stop()
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("📡 Home Assistant Event Stream Tests")
+    print("=" * 50)
+    tests = [
+        test_events_update_registry,
+        test_reconnect_resyncs,
+        test_bad_token_stops,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
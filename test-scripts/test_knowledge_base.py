@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Test script for the knowledge base storage, indexes and ingestion
+Runs against temporary directories; no models or services required
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import tools.document_store as document_store
+from tools.document_store import DocumentLog
+from tools.knowledge_base import SimpleKnowledgeBase, RAGSystem
+from tools.vector_index import SparseVectorIndex
+
+def write_file(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def test_vector_scores_match_cosine():
+    """Vectorized search returns the baseline cosine scores, including for unknown query words"""
+    kb = SimpleKnowledgeBase(tempfile.mkdtemp())
+    for text in ["thermostat schedule heating", "thermostat battery", "kitchen lights dimmer"]:
+        kb.add_document(text)
+
+    query = "thermostat heating unknownword another"
+    query_embedding = kb._simple_embedding(query)
+    expected = sorted((kb._cosine_similarity(query_embedding, kb._simple_embedding(content))
+                       for content in kb.documents.values()), reverse=True)
+    expected = [score for score in expected if score > 0.1]
+    actual = [result["relevance_score"] for result in kb.search(query)]
+    assert len(actual) == len(expected), f"{actual} vs {expected}"
+    assert all(abs(a - e) < 1e-5 for a, e in zip(actual, expected)), f"{actual} vs {expected}"
+
+def test_bm25_relevance_floor():
+    """BM25 ranks matching documents first and ignores queries that only share common words"""
+    kb = SimpleKnowledgeBase(tempfile.mkdtemp(), retrieval_mode="bm25")
+    kb.add_document("the thermostat schedule heats the house to 21 degrees at night")
+    kb.add_document("what you need to know about the dishwasher rinse aid")
+    kb.add_document("you can ask what the weather will be like")
+
+    results = kb.search("what is the thermostat schedule")
+    assert results and "thermostat" in results[0]["content"], results
+    assert len(results) == 1, f"unrelated documents returned: {[r['content'] for r in results]}"
+
+    rag = RAGSystem(kb)
+    prompt = rag.enhance_query_with_context("what can you do for me", "SYSTEM")
+    assert prompt == "SYSTEM", "context injected for a query made of common words"
+
+def test_reload_pre_manifest_directory():
+    """Chunks ingested before the manifest existed survive re-loading their unchanged files"""
+    source_dir = tempfile.mkdtemp()
+    kb_dir = tempfile.mkdtemp()
+    source_file = write_file(source_dir, "manual.txt", "the boiler resets from the front panel")
+
+    # Old layout: one {doc_id}.json per chunk, no manifest
+    kb = SimpleKnowledgeBase(kb_dir)
+    doc_id = kb._generate_doc_id("the boiler resets from the front panel")
+    kb.store.close()
+    with open(os.path.join(kb_dir, f"{doc_id}.json"), 'w') as f:
+        json.dump({"content": "the boiler resets from the front panel",
+                   "metadata": {"source_file": source_file}}, f)
+
+    kb = SimpleKnowledgeBase(kb_dir)
+    rag = RAGSystem(kb)
+    before = len(kb.documents)
+    rag.load_documents_from_directory(source_dir, max_workers=1)
+    assert len(kb.documents) == before == 1, f"before: {before} / after: {len(kb.documents)}"
+    rag.load_documents_from_directory(source_dir, max_workers=1)
+    assert doc_id in kb.documents, "chunk lost on second load"
+
+def test_manifest_eviction():
+    """Modified and deleted files evict only chunks no other file produces"""
+    source_dir = tempfile.mkdtemp()
+    kb = SimpleKnowledgeBase(tempfile.mkdtemp())
+    rag = RAGSystem(kb)
+    write_file(source_dir, "a.txt", "alpha one. alpha two")
+    write_file(source_dir, "b.txt", "beta one")
+    write_file(source_dir, "c.txt", "alpha one. alpha two")
+
+    assert rag.load_documents_from_directory(source_dir, max_workers=1) == 2
+    assert rag.load_documents_from_directory(source_dir, max_workers=1) == 0, "unchanged files re-added"
+
+    time.sleep(0.01)
+    write_file(source_dir, "a.txt", "alpha three")
+    rag.load_documents_from_directory(source_dir, max_workers=1)
+    contents = set(kb.documents.values())
+    assert contents == {"alpha one. alpha two", "alpha three", "beta one"}, contents
+
+    os.remove(os.path.join(source_dir, "c.txt"))
+    rag.load_documents_from_directory(source_dir, max_workers=1)
+    contents = set(kb.documents.values())
+    assert contents == {"alpha three", "beta one"}, contents
+
+def test_log_torn_record():
+    """A record torn by a crash mid-write is truncated and later writes stay readable"""
+    path = os.path.join(tempfile.mkdtemp(), "documents.jsonl")
+    log = DocumentLog(path)
+    log.put("a", "first")
+    log.put("b", "second")
+    log.close()
+    with open(path, 'ab') as f:
+        f.write(b'{"op":"put","id":"c","cont')
+
+    log = DocumentLog(path)
+    assert set(log.offsets) == {"a", "b"}, set(log.offsets)
+    assert os.path.getsize(path) == log.size, "torn record left in the file"
+    log.put("c", "third")
+    assert log.get("c")["content"] == "third"
+    assert [doc_id for doc_id, _ in log] == ["a", "b", "c"]
+    log.close()
+
+def test_log_compaction():
+    """Compaction keeps only the latest live records and survives a reopen"""
+    path = os.path.join(tempfile.mkdtemp(), "documents.jsonl")
+    log = DocumentLog(path, min_compact_bytes=0)
+    for version in range(5):
+        log.put_many([(f"doc{i}", f"version {version}", {"i": i}) for i in range(4)])
+    log.delete_many(["doc3"])
+    assert log.dead_bytes > 0
+
+    assert log.maybe_compact(), "compaction not triggered"
+    assert log.dead_bytes == 0 and log.size == os.path.getsize(path)
+    assert not log.maybe_compact(), "compacted a file with no dead records"
+    log.put("doc4", "after compaction")
+    log.close()
+
+    log = DocumentLog(path)
+    contents = {doc_id: record["content"] for doc_id, record in log}
+    assert contents == {"doc0": "version 4", "doc1": "version 4", "doc2": "version 4",
+                        "doc4": "after compaction"}, contents
+    assert log.get("doc1")["metadata"] == {"i": 1}
+    log.close()
+
+def test_load_parses_each_body_once():
+    """Reopening the log reads ids without parsing bodies, so a load parses each live document once"""
+    kb_dir = tempfile.mkdtemp()
+    kb = SimpleKnowledgeBase(kb_dir)
+    doc_ids = kb.add_documents([(f"document number {i}", {"i": i}) for i in range(20)])
+    kb.add_document("an id with \\escapes\\", doc_id='say "hi"')
+    kb.remove_documents(doc_ids[:5])
+    kb.store.close()
+
+    parsed = []
+    def counting_loads(data, *args, **kwargs):
+        if data[:1] in (b"{", "{"):
+            parsed.append(data)
+        return json.loads(data, *args, **kwargs)
+
+    document_store.json = types.SimpleNamespace(loads=counting_loads, dumps=json.dumps)
+    try:
+        kb = SimpleKnowledgeBase(kb_dir)
+    finally:
+        document_store.json = json
+    assert len(kb.documents) == 16 and kb.documents['say "hi"'] == "an id with \\escapes\\"
+    assert len(parsed) == 16, f"{len(parsed)} records parsed for 16 live documents"
+    kb.store.close()
+
+def test_removal_compacts_log():
+    """Removing most documents compacts the log and the saved index still matches it"""
+    kb_dir = tempfile.mkdtemp()
+    kb = SimpleKnowledgeBase(kb_dir)
+    kb.store.min_compact_bytes = 0
+    doc_ids = kb.add_documents([(f"thermostat reading {i}", None) for i in range(10)])
+    kb.remove_documents(doc_ids[2:])
+    assert kb.store.dead_bytes == 0, "log not compacted after removal"
+    assert kb.store.size == os.path.getsize(kb.store.path)
+    kb.store.close()
+
+    kb = SimpleKnowledgeBase(kb_dir)
+    assert all(isinstance(part, np.memmap) for part in kb.index._base), "index rebuilt after compaction"
+    assert sorted(kb.documents) == sorted(doc_ids[:2]) and len(kb.index) == 2
+    kb.store.close()
+
+def test_index_reload():
+    """A saved index is memory-mapped on reload and documents logged after the save are embedded"""
+    kb_dir = tempfile.mkdtemp()
+    kb = SimpleKnowledgeBase(kb_dir)
+    kb.add_documents([("thermostat schedule heating", None), ("kitchen lights dimmer", None)])
+    kb.save_index()
+    kb.add_document("garage door opener battery")
+    expected = [(r["doc_id"], r["relevance_score"]) for r in kb.search("thermostat kitchen garage battery")]
+    kb.store.close()
+
+    kb = SimpleKnowledgeBase(kb_dir)
+    assert all(isinstance(part, np.memmap) for part in kb.index._base), "index was not memory-mapped"
+    assert len(kb.index) == 3, f"{len(kb.index)} rows"
+    actual = [(r["doc_id"], r["relevance_score"]) for r in kb.search("thermostat kitchen garage battery")]
+    assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected], f"{actual} vs {expected}"
+    assert all(abs(a - e) < 1e-6 for (_, a), (_, e) in zip(actual, expected))
+    kb.store.close()
+
+def test_inconsistent_index_rebuilt():
+    """An index whose sidecar doesn't match its arrays is ignored and rebuilt from the log"""
+    kb_dir = tempfile.mkdtemp()
+    kb = SimpleKnowledgeBase(kb_dir)
+    kb.add_documents([("thermostat schedule heating", None), ("kitchen lights dimmer", None)])
+    kb.save_index()
+    kb.store.close()
+
+    sidecar_path = os.path.join(kb_dir, "index", "vectors.json")
+    with open(sidecar_path) as f:
+        sidecar = json.load(f)
+    sidecar["nnz"] += 1
+    with open(sidecar_path, 'w') as f:
+        json.dump(sidecar, f)
+    assert SparseVectorIndex.load(os.path.join(kb_dir, "index")) is None, "mismatched sidecar accepted"
+
+    kb = SimpleKnowledgeBase(kb_dir)
+    assert len(kb.index) == 2 and kb.search("kitchen dimmer"), "index not rebuilt from the log"
+    kb.store.close()
+
+def test_parallel_ingest_matches_serial():
+    """Loading a directory across worker processes stores the same chunks as loading it serially"""
+    source_dir = tempfile.mkdtemp()
+    for i in range(6):
+        write_file(source_dir, f"note{i}.txt", ". ".join(f"note {i} line {j} about the boiler" for j in range(40)))
+    write_file(source_dir, "page.html", "<html><body><p>the porch light</p><script>x()</script></body></html>")
+
+    serial = SimpleKnowledgeBase(tempfile.mkdtemp())
+    parallel = SimpleKnowledgeBase(tempfile.mkdtemp())
+    added = RAGSystem(serial).load_documents_from_directory(source_dir, max_workers=1)
+    assert RAGSystem(parallel).load_documents_from_directory(source_dir, max_workers=2) == added
+    assert parallel.documents == serial.documents
+    assert "x()" not in " ".join(parallel.documents.values()), "script text ingested"
+
+def test_context_cache_invalidation():
+    """Repeat questions hit the context cache until a write changes the knowledge base"""
+    kb = SimpleKnowledgeBase(tempfile.mkdtemp())
+    kb.add_document("the boiler resets from the front panel")
+
+    first = kb.get_context_for_query("How do I reset the boiler?")
+    assert kb.get_context_for_query("how do i reset the BOILER") == first
+    assert kb.get_context_cache_stats()["hits"] == 1, kb.get_context_cache_stats()
+
+    doc_id = kb.add_document("hold the boiler reset button for ten seconds")
+    context = kb.get_context_for_query("how do I reset the boiler")
+    assert "ten seconds" in context, "stale context served after add"
+
+    kb.remove_documents([doc_id])
+    context = kb.get_context_for_query("how do I reset the boiler")
+    assert "ten seconds" not in context, "stale context served after remove"
+    assert kb.get_context_cache_stats()["hits"] == 1, kb.get_context_cache_stats()
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("📚 Knowledge Base Tests")
+    print("=" * 50)
+    tests = [
+        test_vector_scores_match_cosine,
+        test_bm25_relevance_floor,
+        test_reload_pre_manifest_directory,
+        test_manifest_eviction,
+        test_log_torn_record,
+        test_log_compaction,
+        test_load_parses_each_body_once,
+        test_removal_compacts_log,
+        test_index_reload,
+        test_inconsistent_index_rebuilt,
+        test_parallel_ingest_matches_serial,
+        test_context_cache_invalidation,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthesised phrase audio cache
+Runs against a temporary directory; no TTS model required
+"""
+
+import os
+import sys
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from src.voice.phrase_cache import PhraseAudioCache
+
+WAV = np.linspace(-1, 1, 2400, dtype=np.float32)
+
+def disk_files(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(".npz"))
+
+def test_one_off_sentences_stay_in_memory():
+    """A sentence synthesised once is served from memory but never written to disk"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PhraseAudioCache(cache_dir)
+        key = cache.make_key("The weather is sunny.", None, 1.0, "coqui:test")
+        cache.put(key, WAV, 24000)
+        assert disk_files(cache_dir) == []
+        wav, sample_rate = cache.get(key)
+        assert sample_rate == 24000 and np.array_equal(wav, WAV)
+
+def test_repeated_and_prewarmed_phrases_persist():
+    """Pre-warmed phrases and phrases used a second time survive a restart"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PhraseAudioCache(cache_dir, max_entries=1)
+        prewarmed = cache.make_key("Done.", None, 1.0, "coqui:test")
+        repeated = cache.make_key("Lights on.", None, 1.0, "coqui:test")
+        evicted = cache.make_key("Music paused.", None, 1.0, "coqui:test")
+
+        cache.put(prewarmed, WAV, 24000, persist=True)
+        cache.put(repeated, WAV, 24000)
+        assert cache.get(repeated) is not None
+        # Synthesised again after the memory tier dropped it
+        cache.put(evicted, WAV, 24000)
+        cache.put(repeated, WAV, 24000)
+        cache.put(evicted, WAV, 24000)
+        assert disk_files(cache_dir) == sorted(f"{key}.npz" for key in (prewarmed, repeated, evicted))
+
+        restarted = PhraseAudioCache(cache_dir)
+        for key in (prewarmed, repeated, evicted):
+            assert restarted.get(key) is not None, key
+        assert restarted.stats["disk_hits"] == 3, restarted.stats
+
+def test_disk_pruned_without_rescanning():
+    """The disk tier keeps the most recently used entries and never lists the directory after start-up"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = PhraseAudioCache(cache_dir, max_entries=1, max_disk_entries=2)
+        keys = [cache.make_key(f"Phrase {i}.", None, 1.0, "coqui:test") for i in range(3)]
+        cache.put(keys[0], WAV, 24000, persist=True)
+        cache.put(keys[1], WAV, 24000, persist=True)
+
+        original_glob = type(cache.cache_dir).glob
+        type(cache.cache_dir).glob = lambda self, pattern: (_ for _ in ()).throw(AssertionError("directory listed"))
+        try:
+            assert cache.get(keys[0]) is not None
+            cache.put(keys[2], WAV, 24000, persist=True)
+        finally:
+            type(cache.cache_dir).glob = original_glob
+        assert disk_files(cache_dir) == sorted(f"{key}.npz" for key in (keys[0], keys[2]))
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("💾 Phrase Cache Tests")
+    print("=" * 50)
+    tests = [
+        test_one_off_sentences_stay_in_memory,
+        test_repeated_and_prewarmed_phrases_persist,
+        test_disk_pruned_without_rescanning,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
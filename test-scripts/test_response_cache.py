@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM response cache
+Runs entirely in memory; no model required
+"""
+
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.llm.response_cache import LLMResponseCache
+
+SYSTEM_PROMPT = "You are Totoro. Current time: 2024-05-01 18:30:12. Reply with SMART_HOME_JSON."
+
+def test_keys_ignore_timestamps_and_punctuation():
+    """Near-identical requests share a key; other models and temperatures do not"""
+    cache = LLMResponseCache()
+    key = cache.make_key("llama3.1:8b", SYSTEM_PROMPT, "Turn on the kitchen lights!", 0.1)
+    later_prompt = SYSTEM_PROMPT.replace("2024-05-01 18:30:12", "2024-05-02 07:02:45")
+    assert cache.make_key("llama3.1:8b", later_prompt, "turn on the  kitchen lights", 0.1) == key
+    assert cache.make_key("llama3.1:8b", SYSTEM_PROMPT, "turn on the kitchen lights", 0.12) == key
+    assert cache.make_key("llama3.2:3b", SYSTEM_PROMPT, "turn on the kitchen lights", 0.1) != key
+    assert cache.make_key("llama3.1:8b", SYSTEM_PROMPT, "turn on the kitchen lights", 0.3) != key
+    assert cache.make_key("llama3.1:8b", SYSTEM_PROMPT, "turn off the kitchen lights", 0.1) != key
+
+def test_ttl_expiry():
+    """Entries expire after the TTL and count as misses"""
+    cache = LLMResponseCache(ttl=0.05)
+    cache.put("key", "I'll turn on the kitchen lights.")
+    assert cache.get("key") == "I'll turn on the kitchen lights."
+    time.sleep(0.1)
+    assert cache.get("key") is None, "expired entry served"
+    stats = cache.get_stats()
+    assert stats["expired"] == 1 and stats["hits"] == 1 and stats["misses"] == 1, stats
+    assert stats["entries"] == 0, stats
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first"""
+    cache = LLMResponseCache(max_entries=2)
+    cache.put("a", "response a")
+    cache.put("b", "response b")
+    assert cache.get("a") == "response a"
+    cache.put("c", "response c")
+    assert cache.get("b") is None, "recently unused entry kept"
+    assert cache.get("a") == "response a" and cache.get("c") == "response c"
+    assert cache.get_stats()["evictions"] == 1
+
+def test_time_sensitive_skipped():
+    """Time-sensitive or high-temperature requests bypass the cache and fresh answers are not stored"""
+    cache = LLMResponseCache(max_temperature=0.5)
+    assert cache.is_cacheable("turn on the kitchen lights", 0.1)
+    assert not cache.is_cacheable("what's the weather like today", 0.1)
+    assert not cache.is_cacheable("What time is it?", 0.1)
+    assert not cache.is_cacheable("write me a poem", 0.7)
+    assert cache.get_stats()["bypassed"] == 3
+
+    assert not cache.put("clock", "It's 18:30 right now.")
+    assert not cache.put("tool", "TOOL_CALL: get_weather(location=\"London\")")
+    assert not cache.put("empty", "")
+    assert cache.get_stats()["entries"] == 0
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("🗄️ LLM Response Cache Tests")
+    print("=" * 50)
+    tests = [
+        test_keys_ignore_timestamps_and_punctuation,
+        test_ttl_expiry,
+        test_lru_eviction,
+        test_time_sensitive_skipped,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for sentence-pipelined speech and its system voice fallback
+Runs with stand-in synthesis and playback; no TTS model or audio device required
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.voice.speech_pipeline import SentenceSource, SpeechPipeline
+from src.voice.text_to_speech import TextToSpeech
+
+SENTENCES = ["First sentence.", "Second sentence.", "Third sentence.", "Fourth sentence."]
+
+def slow_synthesize(sentence):
+    time.sleep(0.05)
+    return f"audio:{sentence}"
+
+def test_order_and_overlap():
+    """Sentences play in order while the next one is synthesised"""
+    played = []
+
+    def play(audio):
+        time.sleep(0.05)
+        played.append(audio)
+        return True
+
+    pipeline = SpeechPipeline(slow_synthesize, play)
+    start = time.monotonic()
+    assert pipeline.run(iter(SENTENCES + ["  "]))
+    elapsed = time.monotonic() - start
+    assert played == [f"audio:{sentence}" for sentence in SENTENCES], played
+    assert pipeline.metrics["handled"] == 4 and pipeline.metrics["failed"] == 0, pipeline.metrics
+    assert elapsed < 0.35, f"took {elapsed:.2f}s, synthesis and playback did not overlap"
+
+def test_failed_synthesis_falls_back_per_sentence():
+    """A sentence that fails to synthesise goes to the fallback and the rest still play"""
+    played, fallen_back = [], []
+
+    def synthesize(sentence):
+        if sentence.startswith("Second"):
+            raise RuntimeError("out of memory")
+        return sentence
+
+    def play(audio):
+        played.append(audio)
+        return True
+
+    def fallback(sentence):
+        fallen_back.append(sentence)
+        return True
+
+    pipeline = SpeechPipeline(synthesize, play, fallback=fallback)
+    assert pipeline.run(SENTENCES)
+    assert played == ["First sentence.", "Third sentence.", "Fourth sentence."], played
+    assert fallen_back == ["Second sentence."], fallen_back
+    assert pipeline.metrics["handled"] == 4 and pipeline.metrics["failed"] == 1, pipeline.metrics
+
+    pipeline = SpeechPipeline(lambda sentence: None, play, fallback=lambda sentence: False)
+    assert not pipeline.run(SENTENCES[:1]), "failed fallback reported as spoken"
+
+def test_handled_count_when_playback_breaks():
+    """When playback breaks, handled counts only what was spoken and the source yields the rest"""
+    calls = []
+
+    def play(audio):
+        calls.append(audio)
+        if len(calls) == 2:
+            raise RuntimeError("audio device lost")
+        return True
+
+    source = SentenceSource(iter(SENTENCES))
+    pipeline = SpeechPipeline(slow_synthesize, play)
+    try:
+        pipeline.run(source)
+        assert False, "playback error swallowed"
+    except RuntimeError:
+        pass
+    assert pipeline.metrics["handled"] == 1, pipeline.metrics
+    assert list(source.unspoken(pipeline.metrics["handled"])) == SENTENCES[1:]
+
+def stub_tts(spoken):
+    """A TextToSpeech with Coqui "loaded" whose system voice records what it says"""
+    tts = TextToSpeech.__new__(TextToSpeech)
+    tts.voice_preference = "coqui"
+    tts.coqui_tts = object()
+    tts.tts_engine = object()
+    tts.phrase_cache = None
+    tts._lock = threading.Lock()
+    tts._speak_pyttsx3 = lambda sentence: spoken.append(sentence) or True
+    return tts
+
+def test_stream_falls_back_without_voice_file():
+    """A streamed reply is spoken by the system voice when Coqui has no voice file"""
+    spoken = []
+    tts = stub_tts(spoken)
+    assert tts.speak_stream((sentence for sentence in SENTENCES), audio_prompt_path="/missing/voice.wav")
+    assert spoken == SENTENCES, spoken
+
+def test_stream_falls_back_after_pipeline_failure():
+    """If playback breaks mid-stream, only the unspoken sentences go to the system voice"""
+    spoken, played = [], []
+    tts = stub_tts(spoken)
+    voice_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
+
+    def play(wav, dump_dir=None):
+        if played:
+            raise RuntimeError("audio device lost")
+        played.append(wav)
+        return True
+
+    tts._synthesize_coqui = lambda sentence, audio_prompt_path: sentence
+    tts._play_waveform = play
+    try:
+        assert tts.speak_stream((sentence for sentence in SENTENCES), audio_prompt_path=voice_file)
+    finally:
+        os.unlink(voice_file)
+    assert played == ["First sentence."], played
+    assert spoken == SENTENCES[1:], spoken
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("🔊 Speech Pipeline Tests")
+    print("=" * 50)
+    tests = [
+        test_order_and_overlap,
+        test_failed_synthesis_falls_back_per_sentence,
+        test_handled_count_when_playback_breaks,
+        test_stream_falls_back_without_voice_file,
+        test_stream_falls_back_after_pipeline_failure,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming LLM responses sentence by sentence
+Runs against a stand-in Ollama server on localhost; no model required
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import aiohttp
+from aiohttp import web
+
+from src.llm.streaming import SentenceSplitter, split_sentences
+from src.llm.unified_processor import UnifiedLLMProcessor
+
+class FakeOllama:
+    """Streams scripted /api/generate chunks, pausing where the script says"""
+
+    def __init__(self):
+        # (seconds to wait before the chunk, chunk text)
+        self.script = []
+        self.disconnects = 0
+        self.loop = None
+        self.port = None
+        self._ready = threading.Event()
+        self._runner = None
+
+    async def tags(self, request):
+        return web.json_response({"models": []})
+
+    async def drop(self, request):
+        """Hang up without answering, as a crashed server would"""
+        request.transport.close()
+        return web.Response()
+
+    async def generate(self, request):
+        body = await request.json()
+        if not body.get("stream"):
+            return web.json_response({"response": "".join(chunk for _, chunk in self.script), "done": True})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        try:
+            for delay, chunk in self.script:
+                await asyncio.sleep(delay)
+                await response.write((json.dumps({"response": chunk, "done": False}) + "\n").encode())
+            await response.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+            await response.write_eof()
+        except ConnectionResetError:
+            self.disconnects += 1
+        return response
+
+    def start(self):
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self._start())
+            self._ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        self._ready.wait(5)
+        return self
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/api/tags", self.tags)
+        app.router.add_post("/api/generate", self.generate)
+        app.router.add_post("/api/drop", self.drop)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+def test_split_independent_of_chunking():
+    """Sentences come out the same however the text is chunked"""
+    text = 'Dr. Smith said "it works." The heating is at 21.5 degrees! Is that right? Yes'
+    expected = ['Dr. Smith said "it works."', "The heating is at 21.5 degrees!", "Is that right?", "Yes"]
+    assert split_sentences(text) == expected, split_sentences(text)
+
+    for size in (1, 2, 3, 7, 16):
+        splitter = SentenceSplitter()
+        sentences = []
+        for start in range(0, len(text), size):
+            sentences.extend(splitter.feed(text[start:start + size]))
+        sentences.extend(splitter.flush())
+        assert sentences == expected, f"chunks of {size}: {sentences}"
+
+def test_sentence_released_on_whitespace():
+    """A sentence is only released once the whitespace after its punctuation arrives"""
+    splitter = SentenceSplitter()
+    assert splitter.feed("It is 3.") == [], "split before the next character was known"
+    assert splitter.feed("5 degrees.") == [], "split inside a number"
+    assert splitter.feed(" Next") == ["It is 3.5 degrees."]
+    assert splitter.flush() == ["Next"]
+    assert splitter.flush() == []
+
+def test_first_sentence_streams_early():
+    """The first sentence is yielded while the LLM is still generating the rest"""
+    server = FakeOllama().start()
+    server.script = [(0.0, "Cats are small"), (0.0, " carnivores. "), (0.6, "They sleep a lot."), (0.0, " The end.")]
+    processor = UnifiedLLMProcessor(base_url=f"http://127.0.0.1:{server.port}")
+    try:
+        start = time.monotonic()
+        stream = processor.stream_command("describe a cat")
+        first = next(stream)
+        first_at = time.monotonic() - start
+        rest = list(stream)
+        total = time.monotonic() - start
+        assert first == "Cats are small carnivores.", first
+        assert rest == ["They sleep a lot.", "The end."], rest
+        assert first_at < 0.4 and total >= 0.6, f"first sentence after {first_at:.2f}s of {total:.2f}s"
+    finally:
+        server.stop()
+
+def test_tool_syntax_split_off_before_sentences():
+    """Tool calls are never spoken, even when split across chunks or containing sentence breaks"""
+    server = FakeOllama().start()
+    processor = UnifiedLLMProcessor(base_url=f"http://127.0.0.1:{server.port}")
+    server.stop()
+    text = 'Let me look. TOOL_CALL: web_search(query="Dr. Who. Facts")\nHere you go. TOOL_CALL: get_time('
+
+    for size in (1, 4, 9, len(text)):
+        splitter = SentenceSplitter()
+        sentences = []
+        pending = ""
+        for start in range(0, len(text), size):
+            speakable, pending = processor._split_tool_syntax(pending + text[start:start + size])
+            sentences.extend(splitter.feed(speakable))
+        speakable, _ = processor._split_tool_syntax(pending, final=True)
+        splitter.feed(speakable)
+        sentences.extend(splitter.flush())
+        assert sentences == ["Let me look.", "Here you go."], f"chunks of {size}: {sentences}"
+
+    assert processor._split_tool_syntax("It is cold. TOOL_") == ("It is cold. ", "TOOL_")
+    assert processor._split_tool_syntax("It is cold. TOOL_", final=True) == ("It is cold. TOOL_", "")
+
+def test_streamed_tool_call_not_spoken():
+    """A streamed tool call is run and its result spoken instead of the call itself"""
+    server = FakeOllama().start()
+    server.script = [(0.0, "Let me work that out. TOOL_"), (0.0, 'CALL: calculate(expression="6'),
+                     (0.0, '*7")'), (0.0, "\n")]
+    processor = UnifiedLLMProcessor(base_url=f"http://127.0.0.1:{server.port}")
+    try:
+        sentences = list(processor.stream_command("work out six times seven"))
+        assert sentences[0] == "Let me work that out.", sentences
+        assert not any("TOOL" in sentence or "calculate(" in sentence for sentence in sentences), sentences
+        assert any("42" in sentence for sentence in sentences[1:]), sentences
+    finally:
+        server.stop()
+
+async def running_tasks():
+    """Tasks on the processor's loop other than the one asking"""
+    return len(asyncio.all_tasks()) - 1
+
+def test_abandoned_stream_cancelled():
+    """A caller that stops after the first sentence cancels the rest of the generation"""
+    server = FakeOllama().start()
+    server.script = [(0.0, "First sentence. ")] + [(0.1, f"Sentence {i}. ") for i in range(20)]
+    processor = UnifiedLLMProcessor(base_url=f"http://127.0.0.1:{server.port}")
+    try:
+        stream = processor.stream_command("describe a cat")
+        assert next(stream) == "First sentence."
+        stream.close()
+        time.sleep(0.2)
+        assert processor.run_sync(running_tasks()) == 0, "generation still running after the caller left"
+        assert server.disconnects == 1, "LLM stream not closed"
+    finally:
+        processor.close()
+        server.stop()
+
+def test_abandoned_stream_with_full_queue():
+    """A caller that leaves while the sentence queue is full still ends the generation"""
+    server = FakeOllama().start()
+    server.script = [(0.0, f"Sentence {i}. ") for i in range(40)]
+    processor = UnifiedLLMProcessor(base_url=f"http://127.0.0.1:{server.port}")
+    try:
+        stream = processor.stream_command("describe a cat")
+        assert next(stream) == "Sentence 0."
+        time.sleep(0.2)
+        stream.close()
+        time.sleep(0.2)
+        assert processor.run_sync(running_tasks()) == 0, "generation blocked on the full queue"
+    finally:
+        processor.close()
+        server.stop()
+
+def test_connection_error_keeps_streams_alive():
+    """A connection error on one request replaces the pool without aborting a stream still using it"""
+    server = FakeOllama().start()
+    server.script = [(0.0, "One. "), (0.3, "Two. "), (0.0, "Three.")]
+    processor = UnifiedLLMProcessor(base_url=f"http://127.0.0.1:{server.port}")
+    transport = processor.transport
+
+    async def scenario():
+        stream = transport.stream_json("/api/generate", {"stream": True})
+        chunks = [(await stream.__anext__())["response"]]
+        failed_session = transport._sessions[asyncio.get_running_loop()]
+        try:
+            await transport.post_json("/api/drop", {})
+            assert False, "dropped connection not reported"
+        except aiohttp.ClientConnectionError:
+            pass
+        assert not failed_session.closed, "session closed under a running stream"
+
+        chunks += [chunk["response"] async for chunk in stream]
+        assert failed_session.closed, "retired session left open after its stream finished"
+        assert (await transport.post_json("/api/generate", {}))["done"]
+        return chunks, transport._sessions[asyncio.get_running_loop()]
+
+    try:
+        chunks, session = processor.run_sync(scenario())
+    finally:
+        processor.close()
+        server.stop()
+    assert "".join(chunks) == "One. Two. Three.", chunks
+    assert session.closed and not transport._sessions, "sessions left open by close()"
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("🌊 Streaming Tests")
+    print("=" * 50)
+    tests = [
+        test_split_independent_of_chunking,
+        test_sentence_released_on_whitespace,
+        test_first_sentence_streams_early,
+        test_tool_syntax_split_off_before_sentences,
+        test_streamed_tool_call_not_spoken,
+        test_abandoned_stream_cancelled,
+        test_abandoned_stream_with_full_queue,
+        test_connection_error_keeps_streams_alive,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel task execution in TaskExecutor
+Runs against an in-process stand-in for Home Assistant; no services required
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.core.task_executor import TaskExecutor
+from src.llm.command_processor import Task
+
+class FakeHome:
+    """Records when each light call starts and ends; every call takes delay seconds"""
+
+    def __init__(self, delay=0.1, failing_rooms=()):
+        self.delay = delay
+        self.failing_rooms = set(failing_rooms)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _light_call(self, action, room):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        start = time.monotonic()
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.calls.append((action, room, start, time.monotonic()))
+        if room in self.failing_rooms:
+            raise RuntimeError(f"{room} is unreachable")
+        return True
+
+    def turn_on_room_lights(self, room, brightness=None):
+        return self._light_call("on", room)
+
+    def turn_off_room_lights(self, room):
+        return self._light_call("off", room)
+
+    def call(self, action, room):
+        return next(call for call in self.calls if call[:2] == (action, room))
+
+def light_task(action, room, priority=1):
+    return Task(action=f"turn_{action}_lights", target=room, parameters={"room": room}, room=room, priority=priority)
+
+def test_tiers_run_in_priority_order():
+    """A higher-priority tier finishes before a lower one starts"""
+    home = FakeHome()
+    executor = TaskExecutor(home_assistant=home)
+    results = asyncio.run(executor.execute_tasks([
+        light_task("on", "bedroom", priority=2),
+        light_task("on", "kitchen", priority=1),
+    ]))
+    assert results["success"] and results["executed"] == 2, results["errors"]
+    assert home.call("on", "kitchen")[3] <= home.call("on", "bedroom")[2], "priority 2 started before priority 1 ended"
+    assert [entry["task"].room for entry in results["task_results"]] == ["kitchen", "bedroom"]
+
+def test_same_device_ordered_other_devices_concurrent():
+    """Tasks for one room run in order while other rooms run alongside them"""
+    home = FakeHome()
+    executor = TaskExecutor(home_assistant=home)
+    start = time.monotonic()
+    results = asyncio.run(executor.execute_tasks([
+        light_task("on", "kitchen"),
+        light_task("off", "kitchen"),
+        light_task("on", "bedroom"),
+    ]))
+    elapsed = time.monotonic() - start
+    assert results["executed"] == 3, results["errors"]
+    assert home.call("on", "kitchen")[3] <= home.call("off", "kitchen")[2], "kitchen tasks overlapped"
+    assert home.call("on", "bedroom")[2] < home.call("on", "kitchen")[3], "bedroom waited for the kitchen"
+    assert elapsed < 0.3, f"took {elapsed:.2f}s"
+
+def test_concurrency_cap():
+    """No more than max_concurrency tasks run at once"""
+    home = FakeHome(delay=0.05)
+    executor = TaskExecutor(home_assistant=home, max_concurrency=2)
+    rooms = ["kitchen", "bedroom", "office", "garage", "basement"]
+    results = asyncio.run(executor.execute_tasks([light_task("on", room) for room in rooms]))
+    assert results["executed"] == len(rooms), results["errors"]
+    assert home.max_active == 2, f"{home.max_active} tasks ran at once"
+
+def test_failure_does_not_cancel_other_groups():
+    """A failing device reports its error while the other devices still run"""
+    home = FakeHome(failing_rooms={"garage"})
+    executor = TaskExecutor(home_assistant=home)
+    results = asyncio.run(executor.execute_tasks([
+        light_task("on", "garage"),
+        light_task("on", "kitchen"),
+        light_task("on", "bedroom", priority=2),
+    ]))
+    assert not results["success"] and results["executed"] == 2, results
+    assert len(results["errors"]) == 1 and "garage is unreachable" in results["errors"][0], results["errors"]
+    assert {call[1] for call in home.calls} == {"garage", "kitchen", "bedroom"}, home.calls
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("⚙️ Task Executor Tests")
+    print("=" * 50)
+    tests = [
+        test_tiers_run_in_priority_order,
+        test_same_device_ordered_other_devices_concurrent,
+        test_concurrency_cap,
+        test_failure_does_not_cancel_other_groups,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
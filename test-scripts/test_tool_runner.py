@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent tool execution
+Runs with stand-in tools; no network or model required
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.llm.tool_runner import run_tool_calls
+from src.tools.tool_cache import ToolResultCache
+
+async def slow_weather(location):
+    await asyncio.sleep(0.3)
+    return f"Sunny in {location}"
+
+def slow_search(query):
+    time.sleep(0.3)
+    return f"Results for {query}"
+
+async def stalled(**parameters):
+    await asyncio.sleep(5)
+    return "too late"
+
+def stalled_sync(**parameters):
+    time.sleep(1)
+    return "too late"
+
+def broken(**parameters):
+    raise ValueError("division by zero")
+
+def call(tool, **parameters):
+    return {"tool": tool, "parameters": parameters}
+
+def timed_run(tool_calls, tools, **kwargs):
+    """Run the calls and time them inside the loop, since asyncio.run waits for stalled worker threads"""
+    async def main():
+        start = time.monotonic()
+        results = await run_tool_calls(tool_calls, tools, **kwargs)
+        return results, time.monotonic() - start
+    return asyncio.run(main())
+
+def test_tools_run_concurrently():
+    """Async and sync tools run at the same time"""
+    tools = {"get_weather": {"function": slow_weather}, "web_search": {"function": slow_search}}
+    results, elapsed = timed_run([call("get_weather", location="Paris"), call("web_search", query="otters")], tools)
+    assert results == {"get_weather": "Sunny in Paris", "web_search": "Results for otters"}, results
+    assert elapsed < 0.5, f"took {elapsed:.2f}s"
+
+def test_per_tool_timeouts():
+    """A stalled tool returns a timeout error after its own timeout, async or sync"""
+    tools = {
+        "get_weather": {"function": slow_weather},
+        "calculate": {"function": stalled, "timeout": 0.1},
+        "get_time": {"function": stalled_sync},
+    }
+    results, elapsed = timed_run([call("get_weather", location="Oslo"), call("calculate"), call("get_time")],
+                                 tools, default_timeout=0.2)
+    assert results["get_weather"] == "Error: get_weather timed out", "default timeout not applied"
+    assert results["calculate"] == "Error: calculate timed out", results
+    assert results["get_time"] == "Error: get_time timed out", results
+    assert elapsed < 0.5, f"took {elapsed:.2f}s"
+
+def test_failure_isolated():
+    """A failing tool yields an error string and the other results are still returned"""
+    tools = {"calculate": {"function": broken}, "web_search": {"function": slow_search}}
+    results = asyncio.run(run_tool_calls([call("calculate", expression="1/0"), call("web_search", query="tea")], tools))
+    assert results == {"calculate": "Error: division by zero", "web_search": "Results for tea"}, results
+
+def test_unknown_and_repeated_calls():
+    """Unknown tools are skipped and the last call of a repeated tool wins"""
+    tools = {"web_search": {"function": slow_search}}
+    results = asyncio.run(run_tool_calls([call("web_search", query="first"), call("launch_rocket"),
+                                          call("web_search", query="second")], tools))
+    assert results == {"web_search": "Results for second"}, results
+
+def test_cache_hits_between_turns():
+    """Cached tools run once per TTL for equivalent parameters; uncached tools run every time"""
+    calls = []
+
+    def weather(location):
+        calls.append(("get_weather", location))
+        return f"Rainy in {location}"
+
+    def clock():
+        calls.append(("get_time",))
+        return "12:00"
+
+    cache = ToolResultCache(ttls={"get_weather": 60})
+    tools = {"get_weather": {"function": weather}, "get_time": {"function": clock}}
+    for location in ("London", "  london ", "LONDON"):
+        results = asyncio.run(run_tool_calls([call("get_weather", location=location), call("get_time")], tools,
+                                             cache=cache))
+        assert results["get_weather"] == "Rainy in London", results
+    assert calls.count(("get_weather", "London")) == 1 and calls.count(("get_time",)) == 3, calls
+    assert cache.get_stats()["hits"] == 2, cache.get_stats()
+
+def test_negative_caching():
+    """Failures are remembered only for the negative TTL"""
+    cache = ToolResultCache(ttls={"web_search": 60}, negative_ttl=0.05)
+    attempts = []
+
+    def failing_search(query):
+        attempts.append(query)
+        return "Search error: service unavailable"
+
+    tools = {"web_search": {"function": failing_search}}
+    for _ in range(2):
+        asyncio.run(run_tool_calls([call("web_search", query="otters")], tools, cache=cache))
+    assert len(attempts) == 1, "failure not cached"
+    assert cache.get_stats()["negative_hits"] == 1, cache.get_stats()
+
+    time.sleep(0.1)
+    asyncio.run(run_tool_calls([call("web_search", query="otters")], tools, cache=cache))
+    assert len(attempts) == 2, "failure cached past the negative TTL"
+
+def test_disk_tier():
+    """Successful results survive a restart through the disk tier; failures and expired entries do not"""
+    cache_dir = tempfile.mkdtemp()
+    cache = ToolResultCache(ttls={"get_weather": 60, "web_search": 0.05}, cache_dir=cache_dir)
+    cache.put("get_weather", {"location": "Paris"}, "Sunny in Paris")
+    cache.put("get_weather", {"location": "Nowhere"}, "Weather error: unknown place")
+    cache.put("web_search", {"query": "otters"}, "Results for otters")
+    assert len(os.listdir(cache_dir)) == 2, os.listdir(cache_dir)
+
+    time.sleep(0.1)
+    restarted = ToolResultCache(ttls={"get_weather": 60, "web_search": 0.05}, cache_dir=cache_dir)
+    assert restarted.get("get_weather", {"location": "paris"}) == (True, "Sunny in Paris")
+    assert restarted.get("get_weather", {"location": "Nowhere"}) == (False, None), "failure persisted"
+    assert restarted.get("web_search", {"query": "otters"}) == (False, None), "expired entry served"
+    assert len(os.listdir(cache_dir)) == 1, "expired entry left on disk"
+    assert restarted.get_stats()["disk_hits"] == 1, restarted.get_stats()
+
+def run(test):
+    try:
+        test()
+        print(f"✓ {test.__doc__}")
+        return True
+    except Exception as e:
+        print(f"✗ {test.__doc__}: {e}")
+        return False
+
+def main():
+    print("🧰 Tool Runner Tests")
+    print("=" * 50)
+    tests = [
+        test_tools_run_concurrently,
+        test_per_tool_timeouts,
+        test_failure_isolated,
+        test_unknown_and_repeated_calls,
+        test_cache_hits_between_turns,
+        test_negative_caching,
+        test_disk_tier,
+    ]
+    results = [run(test) for test in tests]
+    print(f"\n{sum(results)}/{len(results)} passed")
+    return all(results)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)